@@ -0,0 +1,176 @@
+"""Bulk create routes: many rows in one request, one transaction and one `executemany`.
+
+Creating rows one by one costs an HTTP request, a validation, a transaction and an `fsync` per row.
+The bulk routes take all the rows at once:
+
+1. `bulk_body` reads the body, a JSON array or newline-delimited JSON (`Content-Type: application/x-ndjson`),
+   and validates every row in one batch with the `TypeAdapter` of `list[Schema]`. An invalid row rejects
+   the whole request with a `422`, and the location of each error starts with the index of its row.
+   Bodies larger than `Settings.bulk_max_bytes` are rejected while they are read, and NDJSON bodies with more
+   than `Settings.bulk_max_rows` lines before they are validated, both with a `413`.
+2. `bulk_insert` sends the rows in a single Core `INSERT ... RETURNING` with a list of parameters, which
+   SQLAlchemy runs as an `executemany` (batched in multi-row `VALUES` by "insertmanyvalues"), and commits once.
+3. The generated ids are returned as inclusive ranges, `[[1, 50000]]` instead of 50,000 numbers.
+
+How to use it in your routes:
+```python
+    from app.bulk import BulkCreated, bulk_body, bulk_insert
+
+    @api_router.post("/bulk", status_code=status.HTTP_201_CREATED)
+    def create_ventas(ventas: Annotated[list[SaleCreate], bulk_body(SaleCreate)], db: DbWriteSession) -> BulkCreated:
+        return bulk_insert(db, Sale, ventas)
+```
+
+From an `async def` route, run it in the thread of the session: `await db.run_sync(bulk_insert, Sale, ventas)`.
+
+See `benchmarks/bulk_insert.py` for the rows per second of both paths.
+"""
+
+from collections.abc import Sequence
+from typing import Any
+
+from fastapi import Depends, HTTPException, Request, status
+from fastapi.exceptions import RequestValidationError
+from fastapi.params import Depends as DependsParam
+from pydantic import BaseModel, ValidationError
+from sqlalchemy import insert
+from sqlalchemy.exc import IntegrityError
+from sqlmodel import Session, SQLModel
+
+from app.config import settings
+from app.pagination import NDJSON_MEDIA_TYPE, primary_key_of
+from app.serialization import type_adapter
+
+
+class BulkCreated(BaseModel):
+    """Result of a bulk create."""
+
+    created: int
+    """Number of rows created."""
+    ids: list[tuple[int, int]]
+    """Generated ids, as inclusive `[first, last]` ranges, in the order of the rows of the request."""
+
+
+def id_ranges(ids: Sequence[int]) -> list[tuple[int, int]]:
+    """Compress a sequence of ids into inclusive ranges of consecutive ids."""
+    ranges: list[tuple[int, int]] = []
+    for id_ in ids:
+        if ranges and ranges[-1][1] + 1 == id_:
+            ranges[-1] = (ranges[-1][0], id_)
+        else:
+            ranges.append((id_, id_))
+    return ranges
+
+
+def check_row_count(count: int):
+    """Raise a `413 Content Too Large` if `count` is more than `Settings.bulk_max_rows`."""
+    if count > settings.bulk_max_rows:
+        raise HTTPException(
+            status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+            detail=f"Se aceptan hasta {settings.bulk_max_rows} registros por petición",
+        )
+
+
+async def read_limited_body(request: Request, max_bytes: int) -> bytes:
+    """Read the body of a request, or raise a `413 Content Too Large` as soon as it is larger than `max_bytes`.
+
+    A `Content-Length` over the limit is rejected without reading the body. Bodies without it (chunked)
+    are counted while they arrive, so a large body is never kept in memory.
+    """
+    too_large = HTTPException(
+        status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+        detail=f"Se aceptan hasta {max_bytes} bytes por petición",
+    )
+    length = request.headers.get("content-length", "")
+    if length.isdigit() and int(length) > max_bytes:
+        raise too_large
+    body = bytearray()
+    async for chunk in request.stream():
+        body += chunk
+        if len(body) > max_bytes:
+            raise too_large
+    return bytes(body)
+
+
+def bulk_body(schema: type[BaseModel]) -> DependsParam:
+    """Build a dependency that reads and validates a bulk body of `schema` rows.
+
+    Args:
+        schema (type[BaseModel]): The schema of each row, the same one as the single-row create route.
+
+    Returns:
+        Depends: A dependency that returns the validated rows. It raises `413 Content Too Large` for a body of
+        more than `Settings.bulk_max_bytes` bytes or more than `Settings.bulk_max_rows` rows, and the usual
+        `422` of FastAPI for invalid rows.
+
+    """
+    adapter = type_adapter(list[schema])
+
+    async def read_bulk_body(request: Request) -> list[BaseModel]:
+        body = await read_limited_body(request, settings.bulk_max_bytes)
+        if NDJSON_MEDIA_TYPE in request.headers.get("content-type", ""):
+            lines = [line for line in body.splitlines() if line.strip()]
+            check_row_count(len(lines))
+            body = b"[" + b",".join(lines) + b"]"
+        try:
+            rows = adapter.validate_json(body)
+        except ValidationError as e:
+            errors = e.errors(include_url=False)
+            raise RequestValidationError([{**error, "loc": ("body", *error["loc"])} for error in errors]) from e
+        check_row_count(len(rows))
+        return rows
+
+    return Depends(read_bulk_body)
+
+
+def column_values(model: type[SQLModel], rows: Sequence[BaseModel]) -> list[dict[str, Any]]:
+    """Return the values of the columns of `model` for each row, as `model(**row)` would set them.
+
+    The primary key is left out, so the database generates it. The columns that the rows do not have
+    get the default of the field of `model`, for example `created_at`.
+    """
+    if not rows:
+        return []
+    columns = set(model.__table__.columns.keys()) - {primary_key_of(model).key}
+    given = columns & set(type(rows[0]).model_fields)
+    defaults = {
+        name: field
+        for name, field in model.model_fields.items()
+        if name in columns - given and not field.is_required()
+    }
+    values = []
+    for row in rows:
+        row_values = row.model_dump(include=given)
+        for name, field in defaults.items():
+            row_values[name] = field.get_default(call_default_factory=True)
+        values.append(row_values)
+    return values
+
+
+def bulk_insert(db: Session, model: type[SQLModel], rows: Sequence[BaseModel]) -> BulkCreated:
+    """Insert `rows` in the table of `model` with one `executemany`, and commit.
+
+    Args:
+        db (Session): The database session.
+        model (type[SQLModel]): The table model.
+        rows (Sequence[BaseModel]): The validated rows, with the fields of the columns of `model`.
+
+    Returns:
+        BulkCreated: The number of rows and their generated ids.
+
+    Raises:
+        HTTPException: A `409 Conflict` if a row breaks a constraint of the table. Nothing is inserted.
+
+    """
+    values = column_values(model, rows)
+    if not values:
+        return BulkCreated(created=0, ids=[])
+    table = model.__table__
+    pk = table.columns[primary_key_of(model).key]
+    try:
+        ids = db.execute(insert(table).returning(pk, sort_by_parameter_order=True), values).scalars().all()
+        db.commit()
+    except IntegrityError as e:
+        db.rollback()
+        raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail=str(e.orig)) from e
+    return BulkCreated(created=len(ids), ids=id_ranges(ids))
@@ -0,0 +1,319 @@
+"""HTTP conditional requests and in-process caches of aggregates, both driven by the commits.
+
+## Conditional requests
+
+Frontends poll the list endpoints to see if something changed. With `conditional`, a route answers
+with the `ETag` and `Last-Modified` headers of the tables it reads (see `app.table_versions`). When the
+client sends them back in `If-None-Match` or `If-Modified-Since` and no transaction wrote to those tables
+since, the route answers `304 Not Modified` with an empty body, without running the handler or its query.
+
+How to use it in your routes:
+```python
+    from app.caching import conditional
+
+    @api_router.get("/transactions", dependencies=[conditional(Transaction)])
+    def transactions_list(db: DbReadSession, page: Pagination) -> list[Transaction]:
+        return page.fetch(db, Transaction)
+```
+
+The `ETag` only depends on the tables, not on the query parameters: the browsers keep one `ETag` per URL,
+so every page of a list is validated on its own. Routes that return a `Response` of their own (for example
+the NDJSON streams of `app.pagination`) do not get the headers, but still answer `304`.
+
+## Aggregates
+
+Dependencies like `calcular_inventario` run a `SUM` or a `COUNT` over a whole table on every request.
+`cached_aggregate` keeps their results in memory, by the versions of the tables they read:
+
+```python
+    @cached_aggregate(Car)
+    async def calcular_inventario(db: AsyncDbSession) -> int:
+        ...
+```
+
+- The results are kept by arguments, the database session counts as the database it is bound to.
+- Each lookup reads the versions of the tables (see `app.table_versions`, one primary key read per table)
+  with the session of the call, and a result is only used for the versions it was computed with. So the
+  commits of the other worker processes are seen by the next lookup, like the ones of this process, which
+  also empty the cache right away. An aggregate without a session argument only sees the commits of this process.
+- Each cache keeps at most `maxsize` results (the least recently used are dropped first), for at most
+  `Settings.aggregate_cache_ttl` seconds: the TTL bounds how long the writes that do not bump the versions
+  (raw SQL, other programs) go unnoticed.
+- A session with uncommitted writes to the tables does not use the cache, it sees its own writes.
+- The hits, misses and invalidations of each cache are counted in `/metrics` and listed, with the
+  hit rate, at `GET /api/v1/_internal/cache`.
+"""
+
+import functools
+import hashlib
+import inspect
+import threading
+import time
+from collections import OrderedDict
+from collections.abc import Callable, Hashable, Sequence
+from email.utils import formatdate, parsedate_to_datetime
+from itertools import chain
+from typing import Any
+
+from fastapi import Depends, HTTPException, Request, Response, status
+from fastapi.params import Depends as DependsParam
+from sqlalchemy import Table
+from sqlalchemy import inspect as inspect_instance
+from sqlalchemy.orm import Session
+from sqlmodel import SQLModel
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+from app.config import settings
+from app.db import DbReadSession
+from app.metrics import CACHE_HITS, CACHE_INVALIDATIONS, CACHE_MISSES
+from app.table_versions import TOUCHED_TABLES, TableVersion, on_commit, read_versions
+
+CACHE_CONTROL = "no-cache"
+"""Lets the clients keep the responses, but they must validate them (with `If-None-Match`) before using them.
+
+Without it, a browser may reuse a response with `Last-Modified` for a while without asking the server."""
+
+
+def entity_tag(versions: Sequence[TableVersion]) -> str:
+    """Return the weak `ETag` of the data of some tables, from their versions."""
+    state = ";".join(f"{v.name}:{v.version}:{v.modified!r}" for v in versions)
+    return f'W/"{hashlib.blake2s(state.encode(), digest_size=8).hexdigest()}"'
+
+
+def is_not_modified(request: Request, etag: str, modified: float) -> bool:
+    """Return whether the copy of the client is still valid, following RFC 9110 (section 13.2.2).
+
+    `If-None-Match` is compared with the weak comparison. `If-Modified-Since` is only used when the
+    request has no `If-None-Match`, and HTTP dates have a resolution of one second.
+    """
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match is not None:
+        tags = {tag.strip().removeprefix("W/") for tag in if_none_match.split(",")}
+        return "*" in tags or etag.removeprefix("W/") in tags
+    if_modified_since = request.headers.get("if-modified-since")
+    if if_modified_since is None or not modified:
+        return False
+    try:
+        since = parsedate_to_datetime(if_modified_since).timestamp()
+    except (TypeError, ValueError):
+        return False
+    return int(modified) <= since
+
+
+def conditional(*models: type[SQLModel]) -> DependsParam:
+    """Build a dependency that answers conditional requests for the data of `models`.
+
+    Args:
+        *models (type[SQLModel]): The table models read by the route.
+
+    Returns:
+        Depends: A dependency for the `dependencies` of a route. It sets the `ETag`, `Last-Modified` and
+        `Cache-Control` headers of the response, or raises a `304 Not Modified` if the client already has the data.
+
+    """
+    tables = [model.__table__ for model in models]
+
+    def check_conditional(request: Request, response: Response, db: DbReadSession):
+        versions = read_versions(db, tables)
+        etag = entity_tag(versions)
+        modified = max(version.modified for version in versions)
+        headers = {"ETag": etag, "Cache-Control": CACHE_CONTROL}
+        if modified:
+            headers["Last-Modified"] = formatdate(modified, usegmt=True)
+        if is_not_modified(request, etag, modified):
+            raise HTTPException(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+        response.headers.update(headers)
+
+    return Depends(check_conditional)
+
+
+def _sync_session(value: Any) -> Session | None:
+    if isinstance(value, AsyncSession):
+        return value.sync_session
+    return value if isinstance(value, Session) else None
+
+
+def has_pending_writes(session: Session, tables: frozenset[str]) -> bool:
+    """Return whether `session` wrote to `tables` (or is about to) in a transaction that is not committed yet."""
+    if tables & session.info.get(TOUCHED_TABLES, set()):
+        return True
+    pending = chain(session.new, session.dirty, session.deleted)
+    return any(tables.intersection(t.name for t in inspect_instance(instance).mapper.tables) for instance in pending)
+
+
+def database_session(arguments: dict[str, Any]) -> Session | AsyncSession | None:
+    """Return the first database session among the arguments of a call, if any."""
+    for value in arguments.values():
+        if _sync_session(value) is not None:
+            return value
+    return None
+
+
+class AggregateCache:
+    """The results of an aggregate, by the versions of its tables (see `cached_aggregate`).
+
+    Args:
+        name (str): Name of the cache in the metrics.
+        tables (Sequence[Table]): The tables the aggregate reads.
+        maxsize (int): Most results kept. The least recently used are dropped first.
+        ttl (float | None): Seconds a result is kept, `None` to keep it until the next write.
+
+    """
+
+    def __init__(self, name: str, tables: Sequence[Table], maxsize: int, ttl: float | None):
+        self.name = name
+        self.sources = tuple(tables)
+        self.tables = frozenset(table.name for table in self.sources)
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.hits = self.misses = self.invalidations = 0
+        self._lock = threading.Lock()
+        self._entries: OrderedDict[Hashable, tuple[float, Any]] = OrderedDict()
+        # Incremented by every invalidation, so a result computed before a commit is not stored after it
+        self._generation = 0
+        on_commit(self.invalidate)
+
+    def key(self, arguments: dict[str, Any]) -> Hashable | None:
+        """Return the key of the arguments of a call, or `None` if that call must not use the cache.
+
+        A session counts as the database it is bound to. The cache is not used when it is disabled,
+        when a session has uncommitted writes to the tables, or when an argument cannot be hashed.
+        """
+        if not settings.aggregate_cache:
+            return None
+        key = []
+        for value in arguments.values():
+            session = _sync_session(value)
+            if session is not None and has_pending_writes(session, self.tables):
+                return None
+            key.append(value if session is None else value.bind)
+        try:
+            hash(tuple(key))
+        except TypeError:
+            return None
+        return tuple(key)
+
+    def versions(self, session: Session | None) -> tuple[int, ...]:
+        """Return the committed versions of the tables, as seen by `session` (see `app.table_versions`).
+
+        Without a session there is nothing to read, only the commits of this process empty the cache.
+        """
+        if session is None:
+            return ()
+        return tuple(version.version for version in read_versions(session, self.sources))
+
+    def get(self, key: Hashable) -> tuple[bool, Any, int]:
+        """Return whether `key` is cached, its value, and the generation to pass to `put`."""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and (self.ttl is None or time.monotonic() - entry[0] < self.ttl):
+                self._entries.move_to_end(key)
+                self.hits += 1
+                CACHE_HITS.inc(self.name)
+                return True, entry[1], self._generation
+            self.misses += 1
+            CACHE_MISSES.inc(self.name)
+            return False, None, self._generation
+
+    def put(self, key: Hashable, value: Any, generation: int):
+        """Keep `value`, unless the tables were written since `get` returned `generation`."""
+        with self._lock:
+            if generation != self._generation:
+                return
+            self._entries[key] = (time.monotonic(), value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+
+    def invalidate(self, tables: frozenset[str] | None = None):
+        """Forget every result if `tables` (all of them by default) include a table of the aggregate."""
+        if tables is not None and not tables & self.tables:
+            return
+        with self._lock:
+            self._generation += 1
+            self._entries.clear()
+            self.invalidations += 1
+        CACHE_INVALIDATIONS.inc(self.name)
+
+    def stats(self) -> dict[str, Any]:
+        """Return the counters of the cache and its hit rate."""
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "tables": sorted(self.tables),
+                "size": len(self._entries),
+                "maxsize": self.maxsize,
+                "ttl": self.ttl,
+                "hits": self.hits,
+                "misses": self.misses,
+                "invalidations": self.invalidations,
+                "hit_rate": self.hits / lookups if lookups else 0.0,
+            }
+
+
+caches: dict[str, AggregateCache] = {}
+"""Every `AggregateCache`, by name."""
+
+
+def cached_aggregate(
+    *models: type[SQLModel],
+    maxsize: int = 128,
+    ttl: float | None = None,
+) -> Callable[[Callable], Callable]:
+    """Cache the results of an aggregate of the tables of `models` (see the module documentation).
+
+    Works with `def` and `async def` functions, and keeps the signature, so the decorated function
+    is still a FastAPI dependency.
+
+    Args:
+        *models (type[SQLModel]): The table models the aggregate reads.
+        maxsize (int): Most results kept, one per combination of arguments.
+        ttl (float | None): Seconds a result is kept. Defaults to `Settings.aggregate_cache_ttl`.
+
+    Returns:
+        Callable: The decorator.
+
+    """
+    tables = [model.__table__ for model in models]
+
+    def decorator(function: Callable) -> Callable:
+        name = f"{function.__module__}.{function.__qualname__}"
+        cache = caches[name] = AggregateCache(name, tables, maxsize, settings.aggregate_cache_ttl if ttl is None else ttl)
+        signature = inspect.signature(function)
+
+        if inspect.iscoroutinefunction(function):
+
+            @functools.wraps(function)
+            async def cached(*args, **kwargs):
+                arguments = signature.bind(*args, **kwargs).arguments
+                key = cache.key(arguments)
+                if key is None:
+                    return await function(*args, **kwargs)
+                db = database_session(arguments)
+                versions = await db.run_sync(cache.versions) if isinstance(db, AsyncSession) else cache.versions(db)
+                key = (key, versions)
+                found, value, generation = cache.get(key)
+                if not found:
+                    value = await function(*args, **kwargs)
+                    cache.put(key, value, generation)
+                return value
+
+        else:
+
+            @functools.wraps(function)
+            def cached(*args, **kwargs):
+                arguments = signature.bind(*args, **kwargs).arguments
+                key = cache.key(arguments)
+                if key is None:
+                    return function(*args, **kwargs)
+                key = (key, cache.versions(_sync_session(database_session(arguments))))
+                found, value, generation = cache.get(key)
+                if not found:
+                    value = function(*args, **kwargs)
+                    cache.put(key, value, generation)
+                return value
+
+        cached.cache = cache
+        return cached
+
+    return decorator
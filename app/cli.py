@@ -0,0 +1,126 @@
+"""Command line interface for the application.
+
+Run `soa --help` to see the available commands.
+
+Each project can add its own commands by defining a [Typer](https://typer.tiangolo.com/) application named
+`cli` in `app/proyectos/<proyecto>/cli.py`. They are installed as `soa <proyecto> <comando>`, the same way
+`app.main.load_routes` installs the routers of every project.
+
+Commands:
+    - `soa db status`: List the schema migrations and whether they were applied.
+    - `soa db migrate`: Create the missing tables and apply the pending schema migrations.
+    - `soa data tables`: List the tables of the projects and their databases.
+    - `soa data export`: Write tables to (gzip compressed) CSV or NDJSON files, see `app.data_io`.
+    - `soa data import`: Load CSV or NDJSON files in their tables, see `app.data_io`.
+    - `soa serve`: Run the server with several worker processes, see `app.server`. Also installed as `serve`.
+"""
+
+import importlib
+from pathlib import Path
+from typing import Annotated
+
+import typer
+from sqlalchemy.exc import IntegrityError
+
+from app.data_io import CHUNK_SIZE, Format, export_table, import_file, project_tables
+from app.db import get_engine, initialize_database, project_database_url
+from app.discovery import discover_projects
+from app.migrations import applied_versions, discover_migrations, run_migrations
+from app.server import serve
+
+cli = typer.Typer(help="Herramientas de línea de comandos de la Unidad 3.", no_args_is_help=True)
+db_cli = typer.Typer(help="Esquema de la base de datos.", no_args_is_help=True)
+cli.add_typer(db_cli, name="db")
+data_cli = typer.Typer(help="Importar y exportar los datos de las tablas.", no_args_is_help=True)
+cli.add_typer(data_cli, name="data")
+cli.command("serve")(serve)
+
+
+@db_cli.command("status")
+def db_status():
+    """List the schema migrations and whether they were applied."""
+    for migration in discover_migrations():
+        applied = applied_versions(get_engine(migration.project))
+        mark = "x" if (migration.project, migration.version) in applied else " "
+        typer.echo(f"[{mark}] {migration.project} {migration.version}_{migration.name}")
+
+
+@db_cli.command("migrate")
+def db_migrate(
+    project: Annotated[str | None, typer.Option(help="Sólo aplicar las migraciones de este proyecto")] = None,
+):
+    """Create the missing tables and apply the pending schema migrations."""
+    initialize_database()
+    applied = run_migrations(project=project)
+    for migration in applied:
+        typer.echo(f"Aplicada: {migration.project} {migration.version}_{migration.name}")
+    typer.echo(f"{len(applied)} migraciones aplicadas")
+
+
+@data_cli.command("tables")
+def data_tables():
+    """List the tables of the projects and their databases."""
+    for name, (project, _) in sorted(project_tables().items()):
+        typer.echo(f"{name} ({project}): {project_database_url(project)}")
+
+
+@data_cli.command("export")
+def data_export(
+    tables: Annotated[list[str] | None, typer.Argument(help="Tablas a exportar. Por omisión, todas")] = None,
+    *,
+    directory: Annotated[Path, typer.Option("--dir", help="Directorio de los archivos")] = Path("export"),
+    format_: Annotated[Format, typer.Option("--format", help="Formato de los archivos")] = Format.ndjson,
+    compress: Annotated[bool, typer.Option("--gzip/--no-gzip", help="Comprimir los archivos con gzip")] = True,
+    chunk_size: Annotated[int, typer.Option(help="Filas leídas y escritas a la vez")] = CHUNK_SIZE,
+):
+    """Write tables to `<dir>/<table>.<format>[.gz]`, streaming the rows from the database."""
+    for table in tables or sorted(project_tables()):
+        path = directory / f"{table}.{format_.value}{'.gz' if compress else ''}"
+        try:
+            rows = export_table(table, path, chunk_size=chunk_size)
+        except ValueError as e:
+            typer.echo(str(e), err=True)
+            raise typer.Exit(code=1) from e
+        typer.echo(f"{table}: {rows} filas en {path}")
+
+
+@data_cli.command("import")
+def data_import(
+    files: Annotated[list[Path], typer.Argument(help="Archivos .csv, .ndjson o .jsonl, con .gz opcional", exists=True)],
+    table: Annotated[str | None, typer.Option(help="Tabla destino. Por omisión, el nombre de cada archivo")] = None,
+    chunk_size: Annotated[int, typer.Option(help="Filas leídas e insertadas a la vez")] = CHUNK_SIZE,
+):
+    """Load CSV or NDJSON files in their tables, each file in one transaction.
+
+    Exits with status 1 at the first file that cannot be imported; the files before it stay imported.
+    """
+    initialize_database()
+    for path in files:
+        try:
+            rows = import_file(
+                path,
+                table,
+                chunk_size=chunk_size,
+                progress=lambda inserted, path=path: typer.echo(f"{path}: {inserted} filas...", err=True),
+            )
+        except (ValueError, IntegrityError) as e:
+            typer.echo(f"{path}: {e}", err=True)
+            raise typer.Exit(code=1) from e
+        typer.echo(f"{path}: {rows} filas importadas")
+
+
+def load_commands(app: typer.Typer):
+    """Load and register the command groups of all modules in the 'app.proyectos' package.
+
+    Args:
+        app (typer.Typer): The Typer application instance.
+
+    """
+    for project in discover_projects().values():
+        if not project.cli:
+            continue
+        commands = importlib.import_module(project.module("cli"))
+        if hasattr(commands, "cli"):
+            app.add_typer(commands.cli, name=project.name)
+
+load_commands(cli)
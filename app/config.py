@@ -19,16 +19,66 @@ class Settings(BaseSettings):
     Attributes:
         model_config (SettingsConfigDict): Configuration for loading environment variables.
         verbose (bool): Flag to enable verbose logging.
+        log_format (str): `rich` for colored logs in development, `json` for queued JSON lines in production
+            (see `app.log_utils`).
+        log_sample_rate (float): Fraction of the repeated `DEBUG` and `INFO` log messages to keep.
         database_url (str): URL for the database connection.
+        project_database_dir (str | None): If set, each project stores its tables in `<dir>/<project>.db`
+            instead of `database_url` (see `app.db.project_database_url`).
+        project_databases (dict[str, str]): Database URL of specific projects, for example
+            `{"nnieto": "sqlite:///./alcancia.db"}`.
         site_title (str): Title of the site.
         site_description (str): Description of the site.
         site_version (str): Version of the site.
+        page_size_max (int): Largest `limit` accepted by the paginated list endpoints.
+        bulk_max_rows (int): Most rows accepted by a bulk create route (see `app.bulk`).
+        bulk_max_bytes (int): Largest body accepted by a bulk create route, checked before parsing it.
+        stream_batch_size (int): Rows fetched per round-trip when streaming NDJSON responses.
+        profiling (bool): Profile the requests that carry the `X-Profile` header (see `app.profiling`).
+            Do not enable it on a public server.
+        profiling_dir (str): Directory where the profile reports are stored.
+        collect_metrics (bool): Record the request and SQL metrics served at `/metrics` (see `app.metrics`).
+        aggregate_cache (bool): Keep the results of the aggregates decorated with `app.caching.cached_aggregate`.
+        aggregate_cache_ttl (float | None): Seconds an aggregate is kept. The commits of every worker are seen
+            right away through the table versions, the TTL bounds how long the writes that skip them go unnoticed.
+        profile_middleware (bool): Record latency histograms of each middleware and route (see `app.metrics`).
+        lazy_routes (bool): Import the routes of each project on its first request instead of at startup.
+        migrate_on_startup (bool): Apply the pending schema migrations when the server starts (see `app.migrations`).
+        pool_size (int): Connections kept open by the database pool.
+        max_overflow (int): Extra connections the pool may open when all of `pool_size` are in use.
+        pool_timeout (float): Seconds a request waits for a free connection before failing.
+        pool_recycle (int): Seconds after which a connection is replaced, -1 to never replace it.
+        pool_pre_ping (bool): Test each connection with a lightweight query before using it.
+        read_pool_size (int): Read-only connections kept open for `DbReadSession` (see `app.db.read_engine`).
+        sqlite_single_writer (bool): Write to a SQLite file through a single connection, so the writes queue
+            in order instead of waiting on the lock of the database.
+        sqlite_busy_timeout (int | None): Milliseconds a SQLite connection waits for a lock before failing.
+        sqlite_journal_mode (str | None): SQLite journal mode. `WAL` lets readers run while a write is in progress.
+        sqlite_synchronous (str | None): SQLite fsync policy. `NORMAL` is safe with WAL and does not fsync
+            on every commit.
+        sqlite_mmap_size (int | None): Bytes of the database file SQLite reads through memory mapping.
+        sqlite_cache_size (int | None): SQLite page cache per connection. Negative values are KiB.
+        sqlite_temp_store (str | None): Where SQLite keeps temporary tables and indices.
+        workers (int): Worker processes of `serve` (see `app.server`).
+        graceful_timeout (float): Seconds a stopping worker waits for the requests in progress.
+        thread_pool_size (int): Threads of each worker that run the `def` routes and dependencies
+            (the AnyIO default thread limiter).
+        bulkhead_size (int | None): Requests of one project whose `def` endpoints may wait for or hold a thread
+            at once, so a project cannot take the whole pool (see `app.threadpool`). `None` disables the limit.
+        bulkheads (dict[str, int]): Bulkhead size of specific projects, for example `{"dramos": 4}`.
+
+    Every `sqlite_*` setting is applied as a `PRAGMA` to each new connection (see `app.db.set_sqlite_pragmas`).
+    Set one to an empty value in the environment to keep the SQLite default.
 
     """
 
     model_config = SettingsConfigDict(env_file=".env", env_file_encoding="utf-8")
     verbose: bool = True
+    log_format: str = "rich"
+    log_sample_rate: float = 1.0
     database_url: str = "sqlite:///./database.db"
+    project_database_dir: str | None = None
+    project_databases: dict[str, str] = {}
     site_title: str = "Unidad 3 - Aplicaciones web con REST"
     site_summary: str = "Esta aplicación reune todos los proyectos de los estudiantes de la unidad 3"
     site_description: str = """
@@ -37,6 +87,50 @@ class Settings(BaseSettings):
         proyecto asigado.
     """
     site_version: str = "0.1"
+    page_size_max: int = 1000
+    bulk_max_rows: int = 100_000
+    bulk_max_bytes: int = 64 * 1024 * 1024
+    stream_batch_size: int = 500
+    profiling: bool = False
+    profiling_dir: str = "profiles"
+    collect_metrics: bool = True
+    aggregate_cache: bool = True
+    aggregate_cache_ttl: float | None = 30.0
+    profile_middleware: bool = True
+    lazy_routes: bool = False
+    migrate_on_startup: bool = True
+    pool_size: int = 5
+    max_overflow: int = 10
+    pool_timeout: float = 30.0
+    pool_recycle: int = -1
+    pool_pre_ping: bool = False
+    read_pool_size: int = 8
+    sqlite_single_writer: bool = True
+    sqlite_busy_timeout: int | None = 5000
+    sqlite_journal_mode: str | None = "WAL"
+    sqlite_synchronous: str | None = "NORMAL"
+    sqlite_mmap_size: int | None = 256 * 1024 * 1024
+    sqlite_cache_size: int | None = -64 * 1024
+    sqlite_temp_store: str | None = "MEMORY"
+    workers: int = 1
+    graceful_timeout: float = 30.0
+    thread_pool_size: int = 40
+    bulkhead_size: int | None = 16
+    bulkheads: dict[str, int] = {}
+
+    @property
+    def sqlite_pragmas(self) -> dict[str, str | int]:
+        """PRAGMA statements applied to every new SQLite connection, in order."""
+        pragmas = {
+            # First, so the other statements wait for locks instead of failing
+            "busy_timeout": self.sqlite_busy_timeout,
+            "journal_mode": self.sqlite_journal_mode,
+            "synchronous": self.sqlite_synchronous,
+            "mmap_size": self.sqlite_mmap_size,
+            "cache_size": self.sqlite_cache_size,
+            "temp_store": self.sqlite_temp_store,
+        }
+        return {name: value for name, value in pragmas.items() if value not in (None, "")}
 
 
 settings = Settings()
@@ -0,0 +1,252 @@
+"""Streaming import and export of the tables of the projects, as CSV or newline-delimited JSON.
+
+The tables are found the same way as `initialize_database` does: the projects with a `models.py` in the
+discovery manifest (see `app.discovery`). Each table is read from and written to the database of its
+project (see `app.db.get_engine`).
+
+Neither direction keeps the whole table in memory, so tables of tens of millions of rows take the same
+memory as a table of a thousand:
+
+- `export_table` runs one `SELECT` through a server-side cursor (`yield_per`), and writes the rows to the
+  file as they arrive, in chunks of `chunk_size` rows.
+- `import_file` reads the file line by line, and inserts chunks of `chunk_size` rows with one `executemany`
+  each, in a single transaction: if a row is rejected, the table stays as it was.
+
+The format comes from the name of the file: `ventas.csv`, `ventas.ndjson` (or `.jsonl`), and a `.gz` at the
+end for gzip. The columns of a CSV file are named in its header. CSV values are text, so they are converted
+to the type of each column; an empty value is `NULL` in nullable columns. Columns missing from the file get
+the default of the model, like `created_at`, and the ids are kept when the file has them.
+
+How to use it, from the command line (see `app.cli`):
+```
+soa data tables
+soa data export ventas productos --dir respaldo --format csv
+soa data import respaldo/ventas.csv.gz respaldo/productos.csv.gz
+```
+"""
+
+import csv
+import gzip
+import importlib
+import json
+from collections.abc import Callable, Iterator
+from datetime import date, datetime, time
+from decimal import Decimal
+from enum import StrEnum
+from itertools import batched, chain
+from pathlib import Path
+from typing import IO, Any, Literal
+
+from pydantic_core import to_json
+from sqlalchemy import Column, Table, insert, select
+from sqlmodel import SQLModel
+
+from app.db import get_engine, get_read_engine
+from app.discovery import discover_projects
+from app.table_versions import bump_versions
+
+
+class Format(StrEnum):
+    """Formats of the files, and their extension."""
+
+    csv = "csv"
+    ndjson = "ndjson"
+
+
+FORMATS: dict[str, Format] = {".csv": Format.csv, ".ndjson": Format.ndjson, ".jsonl": Format.ndjson}
+"""Formats by file extension."""
+
+CHUNK_SIZE = 10_000
+"""Rows read, inserted or written at a time."""
+
+COMPRESS_LEVEL = 6
+"""Level of gzip. The default of `gzip` (9) is several times slower for files a few percent smaller."""
+
+TRUE_VALUES = frozenset({"1", "true", "t", "yes", "y", "si", "sí"})
+
+
+def project_tables() -> dict[str, tuple[str, Table]]:
+    """Return the project and the table of every table of the projects, by table name."""
+    tables = {}
+    for project in discover_projects().values():
+        if not project.models:
+            continue
+        importlib.import_module(project.module("models"))
+        for name in project.tables:
+            tables[name] = (project.name, SQLModel.metadata.tables[name])
+    return tables
+
+
+def _table(name: str) -> tuple[str, Table]:
+    tables = project_tables()
+    if name not in tables:
+        raise ValueError(f"La tabla {name} no existe. Tablas: {', '.join(sorted(tables))}")
+    return tables[name]
+
+
+def file_format(path: Path) -> Format:
+    """Return the format of a file from its extension, ignoring a final `.gz`."""
+    suffixes = path.suffixes[:-1] if path.suffix == ".gz" else path.suffixes
+    if not suffixes or suffixes[-1] not in FORMATS:
+        raise ValueError(f"Formato desconocido: {path.name}. Usa {', '.join(FORMATS)} (y .gz opcional)")
+    return FORMATS[suffixes[-1]]
+
+
+def table_of(path: Path) -> str:
+    """Return the name of the table of a file, the name of the file without its extensions."""
+    return path.name.split(".", 1)[0]
+
+
+def open_file(path: Path, mode: Literal["r", "w"]) -> IO[str]:
+    """Open a text file for reading or writing, through gzip if its name ends with `.gz`."""
+    if path.suffix == ".gz":
+        return gzip.open(path, f"{mode}t", encoding="utf-8", newline="", compresslevel=COMPRESS_LEVEL)
+    return path.open(mode, encoding="utf-8", newline="")
+
+
+def _python_type(column: Column) -> type | None:
+    try:
+        return column.type.python_type
+    except NotImplementedError:
+        return None
+
+
+def converter(column: Column) -> Callable[[Any], Any]:
+    """Return the function that converts a value read from a file to the type of `column`."""
+    python_type = _python_type(column)
+    parsers: dict[type | None, Callable[[str], Any]] = {
+        int: int,
+        float: float,
+        Decimal: Decimal,
+        bool: lambda value: value.strip().lower() in TRUE_VALUES,
+        datetime: datetime.fromisoformat,
+        date: date.fromisoformat,
+        time: time.fromisoformat,
+    }
+    parse = parsers.get(python_type)
+
+    def convert(value: Any) -> Any:
+        if value is None or (value == "" and column.nullable):
+            return None
+        if parse is not None and isinstance(value, str):
+            return parse(value)
+        return value
+
+    return convert
+
+
+def _model_defaults(table: Table, missing: set[str]) -> dict[str, Any]:
+    """Return the fields of the model of `table` that have a default, among the `missing` columns."""
+    for mapper in SQLModel._sa_registry.mappers:
+        if mapper.local_table is table:
+            fields = mapper.class_.model_fields
+            return {name: fields[name] for name in missing if name in fields and not fields[name].is_required()}
+    return {}
+
+
+def read_rows(path: Path) -> Iterator[dict[str, Any]]:
+    """Yield the rows of a CSV or NDJSON file, one at a time."""
+    with open_file(path, "r") as file:
+        if file_format(path) == Format.csv:
+            yield from csv.DictReader(file)
+            return
+        for line in file:
+            if line.strip():
+                yield json.loads(line)
+
+
+def import_file(
+    path: Path,
+    table_name: str | None = None,
+    *,
+    chunk_size: int = CHUNK_SIZE,
+    progress: Callable[[int], None] | None = None,
+) -> int:
+    """Insert the rows of a CSV or NDJSON file in a table, in one transaction.
+
+    Args:
+        path (Path): The file, optionally compressed with gzip.
+        table_name (str | None): The table. Defaults to the name of the file (see `table_of`).
+        chunk_size (int): Rows read and inserted at a time.
+        progress (Callable[[int], None] | None): Called with the rows inserted so far after every chunk.
+
+    Returns:
+        int: The number of rows inserted.
+
+    Raises:
+        ValueError: If the table does not exist, the file names columns the table does not have,
+            or a value cannot be converted to the type of its column.
+        sqlalchemy.exc.IntegrityError: If a row breaks a constraint of the table. Nothing is inserted.
+
+    """
+    project, table = _table(table_name or table_of(path))
+    rows = read_rows(path)
+    first = next(rows, None)
+    if first is None:
+        return 0
+    columns = list(first)
+    unknown = set(columns) - set(table.columns.keys())
+    if unknown:
+        raise ValueError(f"La tabla {table.name} no tiene las columnas: {', '.join(sorted(unknown))}")
+    converters = {name: converter(table.columns[name]) for name in columns}
+    defaults = _model_defaults(table, set(table.columns.keys()) - set(columns) - {c.key for c in table.primary_key})
+
+    def values(row: dict[str, Any]) -> dict[str, Any]:
+        converted = {name: convert(row.get(name)) for name, convert in converters.items()}
+        for name, field in defaults.items():
+            converted[name] = field.get_default(call_default_factory=True)
+        return converted
+
+    inserted = 0
+    with get_engine(project).begin() as connection:
+        for chunk in batched(chain([first], rows), chunk_size):
+            connection.execute(insert(table), [values(row) for row in chunk])
+            inserted += len(chunk)
+            if progress is not None:
+                progress(inserted)
+        bump_versions(connection, [table.name])
+    return inserted
+
+
+def export_table(
+    table_name: str,
+    path: Path,
+    *,
+    chunk_size: int = CHUNK_SIZE,
+    progress: Callable[[int], None] | None = None,
+) -> int:
+    """Write the rows of a table, in the order of its primary key, to a CSV or NDJSON file.
+
+    Args:
+        table_name (str): The table.
+        path (Path): The file. Its format comes from its name, and it is compressed if it ends with `.gz`.
+        chunk_size (int): Rows fetched from the cursor and written at a time.
+        progress (Callable[[int], None] | None): Called with the rows written so far after every chunk.
+
+    Returns:
+        int: The number of rows written.
+
+    Raises:
+        ValueError: If the table does not exist or the format of the file is unknown.
+
+    """
+    project, table = _table(table_name)
+    format_ = file_format(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    written = 0
+    with get_read_engine(project).connect() as connection, open_file(path, "w") as file:
+        result = connection.execution_options(yield_per=chunk_size).execute(
+            select(table).order_by(*table.primary_key.columns),
+        )
+        writer = csv.writer(file) if format_ == Format.csv else None
+        if writer is not None:
+            writer.writerow(result.keys())
+        for chunk in result.partitions():
+            if writer is not None:
+                writer.writerows(chunk)
+            else:
+                file.writelines(to_json(row._asdict()).decode() + "\n" for row in chunk)
+            written += len(chunk)
+            if progress is not None:
+                progress(written)
+    return written
@@ -3,50 +3,480 @@
 It includes the following components:
 - `engine`: The SQLAlchemy engine created using the database URL from the settings.
 - `initialize_database`: An asynchronous function to create the database and tables by importing models from the `app.proyectos` package.
+- `read_engine`: The pool of read-only connections to the same database.
 - `get_session`: An asynchronous generator function to provide a database session.
 - `DbSession`: A dependency that provides a database session using FastAPI's `Depends`.
+- `get_read_session`: Provides a read-only session on `read_engine`.
+- `async_engine`: The asynchronous engine for the same database (`aiosqlite` for SQLite).
+- `async_read_engine`: The pool of read-only asynchronous connections.
+- `get_async_session`: Provides an `AsyncSession` for `async def` routes.
+- `AsyncDbSession`: A dependency that provides an asynchronous database session.
+- `get_async_read_session`: Provides a read-only `AsyncSession` on `async_read_engine`.
 
 Functions:
 - `initialize_database()`: Imports models from the `app.proyectos` package and creates the database tables.
+- `engine_options(url, is_async)`: Pool arguments for `create_engine` built from the settings.
+- `pool_status(db_engine)`: Describes the connection pool of an engine.
+- `set_sqlite_pragmas(db_engine, pragmas)`: Applies the SQLite tuning of the settings to every new connection.
+  Every engine is also measured by `app.metrics.instrument_engine`.
+- `project_database_url(project)`, `get_engine(project)`, `get_async_engine(project)`: The database of a project.
+- `get_read_engine(project)`, `get_async_read_engine(project)`: The read-only engines of the database of a project.
+- `table_binds()`: Maps the tables of each project to the engine of its database.
+- `new_session(read_only)`: Opens a session outside of a request, for example in a command.
 - `get_session()`: Provides a database session for dependency injection in FastAPI routes.
+- `get_async_session()`: Provides an asynchronous database session for dependency injection in FastAPI routes.
+- `get_async_read_session()`: Provides a read-only asynchronous database session for FastAPI routes.
+- `async_database_url(url)`: Returns the URL of the asynchronous driver for a database URL.
+
+Classes:
+- `PoolStats`: Checkout counters and wait times of a connection pool.
+- `InstrumentedQueuePool`, `InstrumentedAsyncQueuePool`: Queue pools that keep `PoolStats`.
 
 Dependencies:
-- `DbSession`: Annotated dependency for injecting a database session into FastAPI routes.
+- `DbSession`, `DbWriteSession`: Annotated dependency for injecting a database session into FastAPI routes.
+- `DbReadSession`: Annotated dependency for injecting a read-only database session into FastAPI routes.
+- `AsyncDbSession`: Annotated dependency for injecting an asynchronous database session into FastAPI routes.
+- `AsyncDbReadSession`: Annotated dependency for injecting a read-only asynchronous database session into FastAPI routes.
+
+One database per project:
+    By default every project shares `settings.database_url`. A write-heavy project holds the only
+    writer lock of that SQLite file and the writes of every other project wait for it. With
+    `settings.project_database_dir`, each project gets its own SQLite file, and `settings.project_databases`
+    gives a URL to specific projects. The sessions of `get_session` and `get_async_session` bind the tables
+    of each project to its engine, so the routes do not change, and `initialize_database` creates each table
+    in its database.
+
+Readers and the writer:
+    SQLite allows a single writer per file. When several connections write at the same time, all but one
+    wait on the lock (`busy_timeout`) and retry. With `settings.sqlite_single_writer`, `engine` and
+    `async_engine` keep a single connection each for a SQLite file, so the writes queue in their pools, in order,
+    instead of fighting for the lock. The reads go through `read_engine` and `async_read_engine`, pools of
+    `settings.read_pool_size` connections opened with `PRAGMA query_only`. In WAL mode each read transaction
+    sees a snapshot of the database and never waits for the writer, so the readers scale with the server.
+
+    Routes that only read use `DbReadSession` (or `AsyncDbReadSession`); routes that write use `DbWriteSession`
+    (or `DbSession`, the same dependency) and `AsyncDbSession`. For other databases, and for in-memory SQLite,
+    `read_engine` is `engine` and `async_read_engine` is `async_engine`.
+
+Which one should I use?
+    Use `DbSession` in routes declared with `def`, FastAPI runs them in a thread pool. Use `AsyncDbSession`
+    in routes declared with `async def` and `await` every query, otherwise the query blocks the event loop
+    and every other request of the server waits for it:
+
+    ```python
+    @api_router.get("/{animal_id}")
+    async def get_animal(animal_id: int, db: AsyncDbSession) -> AnimalResponse:
+        animal = await db.get(Register, animal_id)
+        ...
+    ```
 """
 
 import importlib
-import pkgutil
-from typing import Annotated
+import threading
+import time
+from pathlib import Path
+from typing import Annotated, Any
 
 from fastapi import Depends
-from sqlalchemy import Engine
+from sqlalchemy import Engine, Table, event, exc, make_url
+from sqlalchemy.ext.asyncio import AsyncEngine, create_async_engine
+from sqlalchemy.pool import AsyncAdaptedQueuePool, QueuePool
 from sqlmodel import Session, SQLModel, create_engine
+from sqlmodel.ext.asyncio.session import AsyncSession
 
 from app.config import settings
+from app.discovery import discover_projects
 from app.log_utils import logger
+from app.metrics import instrument_engine
+from app.table_versions import TableVersion
+
+ASYNC_DRIVERS = {
+    "sqlite": "sqlite+aiosqlite",
+    "postgresql": "postgresql+asyncpg",
+}
+"""Asynchronous driver used for each database backend."""
+
+
+def async_database_url(url: str) -> str:
+    """Return the URL of the asynchronous driver for a database URL.
+
+    Args:
+        url (str): A database URL, for example `sqlite:///./database.db`.
+
+    Returns:
+        str: The same URL using the asynchronous driver, for example `sqlite+aiosqlite:///./database.db`.
+
+    """
+    parsed = make_url(url)
+    driver = ASYNC_DRIVERS.get(parsed.get_backend_name())
+    if driver is None or parsed.drivername != parsed.get_backend_name():
+        # Either an unknown backend or the URL already names its driver
+        return url
+    return parsed.set(drivername=driver).render_as_string(hide_password=False)
+
+
+class PoolStats:
+    """Checkout counters and wait times of a connection pool.
+
+    The wait time of a checkout is the time between asking the pool for a connection and getting it,
+    including the time spent opening a new connection.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.checkouts = 0
+        self.timeouts = 0
+        self.wait_seconds_total = 0.0
+        self.wait_seconds_max = 0.0
+        self.checked_out_max = 0
+
+    def record(self, wait: float, checked_out: int, *, timed_out: bool = False):
+        """Record one checkout (or a failed one, if `timed_out`)."""
+        with self._lock:
+            if timed_out:
+                self.timeouts += 1
+            else:
+                self.checkouts += 1
+            self.wait_seconds_total += wait
+            self.wait_seconds_max = max(self.wait_seconds_max, wait)
+            self.checked_out_max = max(self.checked_out_max, checked_out)
+
+    def as_dict(self) -> dict[str, Any]:
+        """Return the counters as a dictionary."""
+        with self._lock:
+            attempts = self.checkouts + self.timeouts
+            return {
+                "checkouts": self.checkouts,
+                "timeouts": self.timeouts,
+                "checked_out_max": self.checked_out_max,
+                "wait_seconds_total": self.wait_seconds_total,
+                "wait_seconds_avg": self.wait_seconds_total / attempts if attempts else 0.0,
+                "wait_seconds_max": self.wait_seconds_max,
+            }
+
+
+class InstrumentedQueuePool(QueuePool):
+    """A `QueuePool` that keeps `PoolStats` of its checkouts in `stats`."""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.stats = PoolStats()
+
+    def connect(self):
+        """Check out a connection, recording how long it took."""
+        start = time.perf_counter()
+        try:
+            connection = super().connect()
+        except exc.TimeoutError:
+            self.stats.record(time.perf_counter() - start, self.checkedout(), timed_out=True)
+            raise
+        self.stats.record(time.perf_counter() - start, self.checkedout())
+        return connection
+
+    def recreate(self):
+        """Recreate the pool (for example in `Engine.dispose`) keeping the counters."""
+        pool = super().recreate()
+        pool.stats = self.stats
+        return pool
+
+
+class InstrumentedAsyncQueuePool(InstrumentedQueuePool, AsyncAdaptedQueuePool):
+    """The `InstrumentedQueuePool` for asynchronous engines."""
+
+
+def is_sqlite_file(url: str) -> bool:
+    """Return whether `url` is a SQLite database stored in a file (not in memory)."""
+    parsed = make_url(url)
+    return parsed.get_backend_name() == "sqlite" and parsed.database not in (None, "", ":memory:")
+
+
+def engine_options(url: str, *, is_async: bool = False, read_only: bool = False) -> dict[str, Any]:
+    """Build the pool arguments of `create_engine` from the settings.
+
+    In-memory SQLite databases live in a single connection, so they keep the default pool of SQLAlchemy.
+    The writers of a SQLite file, synchronous and asynchronous, keep a single connection if
+    `settings.sqlite_single_writer` is enabled, and the readers keep `settings.read_pool_size` connections.
+
+    Args:
+        url (str): The database URL.
+        is_async (bool): Whether the options are for `create_async_engine`.
+        read_only (bool): Whether the options are for the readers of `get_read_engine` and `get_async_read_engine`.
+
+    Returns:
+        dict[str, Any]: Keyword arguments for `create_engine` or `create_async_engine`.
+
+    """
+    parsed = make_url(url)
+    if parsed.get_backend_name() == "sqlite" and not is_sqlite_file(url):
+        return {}
+    pool_size, max_overflow = settings.pool_size, settings.max_overflow
+    if read_only:
+        pool_size = settings.read_pool_size
+    elif settings.sqlite_single_writer and is_sqlite_file(url):
+        pool_size, max_overflow = 1, 0
+    return {
+        "poolclass": InstrumentedAsyncQueuePool if is_async else InstrumentedQueuePool,
+        "pool_size": pool_size,
+        "max_overflow": max_overflow,
+        "pool_timeout": settings.pool_timeout,
+        "pool_recycle": settings.pool_recycle,
+        "pool_pre_ping": settings.pool_pre_ping,
+    }
+
+
+def pool_status(db_engine: Engine) -> dict[str, Any]:
+    """Describe the connection pool of an engine.
+
+    Args:
+        db_engine (Engine): The engine. For an `AsyncEngine`, pass its `sync_engine`.
+
+    Returns:
+        dict[str, Any]: The pool class and, for queue pools, its size, the connections in use,
+        the overflow connections and the `PoolStats` counters.
+
+    """
+    pool = db_engine.pool
+    status: dict[str, Any] = {"pool": type(pool).__name__}
+    if isinstance(pool, QueuePool):
+        status |= {
+            "size": pool.size(),
+            "max_overflow": pool._max_overflow,
+            "checked_in": pool.checkedin(),
+            "checked_out": pool.checkedout(),
+            "overflow": max(pool.overflow(), 0),
+        }
+    if isinstance(pool, InstrumentedQueuePool):
+        status |= pool.stats.as_dict()
+    return status
+
+
+def set_sqlite_pragmas(db_engine: Engine, pragmas: dict[str, str | int] | None = None):
+    """Run `PRAGMA` statements on every connection that the engine opens.
+
+    SQLite settings such as the journal mode or the page cache are per connection, so they
+    are applied from a `connect` event. Engines for other databases are left untouched.
+
+    Args:
+        db_engine (Engine): The engine to configure. For an `AsyncEngine`, pass its `sync_engine`.
+        pragmas (dict[str, str | int] | None): Pragma names and values. Defaults to `settings.sqlite_pragmas`.
+
+    Raises:
+        ValueError: If a pragma name or value is not a plain word or number.
+
+    """
+    if db_engine.dialect.name != "sqlite":
+        return
+    pragmas = settings.sqlite_pragmas if pragmas is None else pragmas
+    for name, value in pragmas.items():
+        if not name.isidentifier() or not str(value).removeprefix("-").isalnum():
+            raise ValueError(f"Invalid SQLite pragma: {name}={value}")
+
+    @event.listens_for(db_engine, "connect")
+    def apply_pragmas(dbapi_connection, connection_record):  # noqa: ARG001
+        cursor = dbapi_connection.cursor()
+        for name, value in pragmas.items():
+            cursor.execute(f"PRAGMA {name}={value}")
+        cursor.close()
+
+
+def create_database_engine(url: str, *, read_only: bool = False) -> Engine:
+    """Create an engine with the pool, the SQLite pragmas and the metrics configured in the settings.
+
+    The connections of a `read_only` engine also run `PRAGMA query_only`, so a write fails instead of
+    taking the lock of the writer.
+    """
+    is_sqlite = make_url(url).get_backend_name() == "sqlite"
+    db_engine = create_engine(
+        url,
+        connect_args={"check_same_thread": False} if is_sqlite else {},
+        **engine_options(url, read_only=read_only),
+    )
+    set_sqlite_pragmas(db_engine, settings.sqlite_pragmas | {"query_only": 1} if read_only else None)
+    instrument_engine(db_engine)
+    return db_engine
+
+
+def create_async_database_engine(url: str, *, read_only: bool = False) -> AsyncEngine:
+    """Create the asynchronous engine of `url`, configured like `create_database_engine`."""
+    is_sqlite = make_url(url).get_backend_name() == "sqlite"
+    db_engine = create_async_engine(
+        async_database_url(url),
+        connect_args={"check_same_thread": False} if is_sqlite else {},
+        **engine_options(url, is_async=True, read_only=read_only),
+    )
+    set_sqlite_pragmas(db_engine.sync_engine, settings.sqlite_pragmas | {"query_only": 1} if read_only else None)
+    instrument_engine(db_engine.sync_engine)
+    return db_engine
+
+
+engine = create_database_engine(settings.database_url)
+read_engine = (
+    create_database_engine(settings.database_url, read_only=True) if is_sqlite_file(settings.database_url) else engine
+)
+async_engine = create_async_database_engine(settings.database_url)
+async_read_engine = (
+    create_async_database_engine(settings.database_url, read_only=True)
+    if is_sqlite_file(settings.database_url)
+    else async_engine
+)
+
+
+def project_database_url(project: str | None) -> str:
+    """Return the URL of the database of a project.
+
+    In order: the URL of the project in `settings.project_databases`, a SQLite file named after the project
+    in `settings.project_database_dir`, or the shared `settings.database_url`.
+
+    Args:
+        project (str | None): The name of the project in `app.proyectos`, `None` for the shared database.
+
+    Returns:
+        str: The database URL.
+
+    """
+    if project is None:
+        return settings.database_url
+    if project in settings.project_databases:
+        return settings.project_databases[project]
+    if settings.project_database_dir is not None:
+        directory = Path(settings.project_database_dir)
+        directory.mkdir(parents=True, exist_ok=True)
+        return f"sqlite:///{directory / project}.db"
+    return settings.database_url
 
-engine = create_engine(settings.database_url, connect_args={"check_same_thread": False})
 
+_engines: dict[str, Engine] = {}
+_read_engines: dict[str, Engine] = {}
+_async_engines: dict[str, AsyncEngine] = {}
+_async_read_engines: dict[str, AsyncEngine] = {}
+_table_binds: dict[tuple[str, bool], dict] = {}
+_engines_lock = threading.Lock()
 
-def initialize_database(db_engine: Engine = engine):
-    """Import SQLModel models from the `app.proyectos` package to create database tables."""
-    package = importlib.import_module("app.proyectos")
-    for _, module_name, is_pkg in pkgutil.iter_modules(package.__path__):
-        if not is_pkg:
+
+def get_engine(project: str | None = None) -> Engine:
+    """Return the engine of the database of a project (see `project_database_url`).
+
+    The engines are created the first time they are needed and shared by the projects with the same URL.
+    """
+    url = project_database_url(project)
+    if url == settings.database_url:
+        return engine
+    with _engines_lock:
+        if url not in _engines:
+            _engines[url] = create_database_engine(url)
+        return _engines[url]
+
+
+def get_read_engine(project: str | None = None) -> Engine:
+    """Return the read-only engine of the database of a project (see `get_engine` and `read_engine`)."""
+    url = project_database_url(project)
+    if url == settings.database_url:
+        return read_engine
+    if not is_sqlite_file(url):
+        return get_engine(project)
+    with _engines_lock:
+        if url not in _read_engines:
+            _read_engines[url] = create_database_engine(url, read_only=True)
+        return _read_engines[url]
+
+
+def get_async_engine(project: str | None = None) -> AsyncEngine:
+    """Return the asynchronous engine of the database of a project (see `get_engine`)."""
+    url = project_database_url(project)
+    if url == settings.database_url:
+        return async_engine
+    with _engines_lock:
+        if url not in _async_engines:
+            _async_engines[url] = create_async_database_engine(url)
+        return _async_engines[url]
+
+
+def get_async_read_engine(project: str | None = None) -> AsyncEngine:
+    """Return the asynchronous read-only engine of the database of a project (see `get_read_engine`)."""
+    url = project_database_url(project)
+    if url == settings.database_url:
+        return async_read_engine
+    if not is_sqlite_file(url):
+        return get_async_engine(project)
+    with _engines_lock:
+        if url not in _async_read_engines:
+            _async_read_engines[url] = create_async_database_engine(url, read_only=True)
+        return _async_read_engines[url]
+
+
+def table_binds(*, is_async: bool = False, read_only: bool = False) -> dict[Table, Engine | AsyncEngine]:
+    """Map the tables of every project that has its own database to the engine of that database.
+
+    Sessions created with these `binds` send each query to the database of the tables it uses, whatever
+    the route that runs it. The tables of the projects that use the shared database are not listed.
+    With `read_only`, the tables are mapped to the read-only engines (see `get_read_engine`).
+    """
+    key = ("async" if is_async else "sync", read_only)
+    if key in _table_binds:
+        return _table_binds[key]
+    engines = {
+        ("sync", False): get_engine,
+        ("sync", True): get_read_engine,
+        ("async", False): get_async_engine,
+        ("async", True): get_async_read_engine,
+    }
+    binds = {}
+    for project in discover_projects().values():
+        if not project.tables or project_database_url(project.name) == settings.database_url:
             continue
-        models_module = f"app.proyectos.{module_name}.models"
-        spec = importlib.util.find_spec(f"app.proyectos.{module_name}.models")
-        if spec is None or spec.loader is None:
+        project_engine = engines[key](project.name)
+        importlib.import_module(project.module("models"))
+        for table in project.tables:
+            binds[SQLModel.metadata.tables[table]] = project_engine
+    _table_binds[key] = binds
+    return binds
+
+
+async def dispose_engines():
+    """Close the connections of every engine, for example when the server stops."""
+    await async_engine.dispose()
+    await async_read_engine.dispose()
+    engine.dispose()
+    read_engine.dispose()
+    with _engines_lock:
+        engines = [*_engines.values(), *_read_engines.values()]
+        async_engines = [*_async_engines.values(), *_async_read_engines.values()]
+        _engines.clear()
+        _read_engines.clear()
+        _async_engines.clear()
+        _async_read_engines.clear()
+        _table_binds.clear()
+    for db_engine in engines:
+        db_engine.dispose()
+    for db_engine in async_engines:
+        await db_engine.dispose()
+
+
+def initialize_database(db_engine: Engine | None = None):
+    """Import SQLModel models from the `app.proyectos` package to create database tables.
+
+    The projects that have a `models.py` are read from the discovery manifest (see `app.discovery`).
+    Each project's tables are created in its own database (see `project_database_url`), unless
+    `db_engine` is given: then every table is created there. Every database also gets the `table_version`
+    table of `app.table_versions`.
+    """
+    for project in discover_projects().values():
+        if not project.models:
             logger.warning(
-                f"El módulo {module_name} no tiene un archivo models.py. Ignorando...",
+                f"El módulo {project.name} no tiene un archivo models.py. Ignorando...",
             )
             continue
         # Import the module to populate the metadata from SQLModel
         # See https://sqlmodel.tiangolo.com/tutorial/create-db-and-table/?h=metadat#sqlmodel-metadata-order-matters
-        importlib.import_module(models_module)
-    SQLModel.metadata.create_all(
-        db_engine,
-    )
+        importlib.import_module(project.module("models"))
+    if db_engine is not None:
+        SQLModel.metadata.create_all(db_engine)
+        return
+    binds = table_binds()
+    for project_engine in set(binds.values()):
+        tables = [table for table, table_engine in binds.items() if table_engine is project_engine]
+        SQLModel.metadata.create_all(project_engine, tables=[*tables, TableVersion.__table__])
+    SQLModel.metadata.create_all(engine, tables=[t for t in SQLModel.metadata.sorted_tables if t not in binds])
 
 
 def drop_database(db_engine: Engine = engine):
@@ -59,10 +489,55 @@ def drop_database(db_engine: Engine = engine):
     SQLModel.metadata.drop_all(db_engine)
 
 
+def new_session(*, read_only: bool = False) -> Session:
+    """Open a database session that sends the queries of each project to its database.
+
+    Args:
+        read_only (bool): Use the read-only connections (see `read_engine`) instead of the writer.
+
+    Returns:
+        Session: The session. Use it as a context manager to close it.
+
+    """
+    if read_only:
+        return Session(read_engine, binds=table_binds(read_only=True), autoflush=False)
+    return Session(engine, binds=table_binds())
+
+
 def get_session():
     """Provide a database session for dependency injection in FastAPI routes."""
-    with Session(engine) as session:
+    with new_session() as session:
+        yield session
+
+
+def get_read_session():
+    """Provide a read-only database session for dependency injection in FastAPI routes."""
+    with new_session(read_only=True) as session:
         yield session
 
 
 DbSession = Annotated[Session, Depends(get_session)]
+DbWriteSession = DbSession
+DbReadSession = Annotated[Session, Depends(get_read_session)]
+
+
+async def get_async_session():
+    """Provide an asynchronous database session for dependency injection in FastAPI routes.
+
+    The objects are not expired on commit, so their attributes can be read after `await db.commit()`
+    without another (implicit and blocking) query.
+    """
+    async with AsyncSession(async_engine, binds=table_binds(is_async=True), expire_on_commit=False) as session:
+        yield session
+
+
+async def get_async_read_session():
+    """Provide a read-only asynchronous database session for dependency injection in FastAPI routes."""
+    async with AsyncSession(
+        async_read_engine, binds=table_binds(is_async=True, read_only=True), autoflush=False, expire_on_commit=False,
+    ) as session:
+        yield session
+
+
+AsyncDbSession = Annotated[AsyncSession, Depends(get_async_session)]
+AsyncDbReadSession = Annotated[AsyncSession, Depends(get_async_read_session)]
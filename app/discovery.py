@@ -0,0 +1,218 @@
+"""Discovery of the student projects in `app.proyectos`.
+
+Every project is a package in `app/proyectos/` that may contain `routes.py`, `models.py`, `cli.py`
+and a `migrations` package. Finding them used to take a `pkgutil.iter_modules` walk plus one
+`importlib.util.find_spec` per module on every boot, in `app.main`, `app.db`, `app.cli` and
+`app.migrations`.
+
+`discover_projects` does that walk once and stores the result in a manifest,
+`app/proyectos/__pycache__/manifest.json`, together with the table names declared by each project.
+The manifest is rebuilt when the modification time of any project directory or module changes,
+so adding a project or editing its models is picked up without doing anything.
+
+The manifest also allows mounting the routers lazily (see `Settings.lazy_routes` and
+`LazyRoutesMiddleware`): a project is only imported when it receives its first request.
+"""
+
+import importlib
+import importlib.util
+import json
+import os
+import pkgutil
+import threading
+from pathlib import Path
+from typing import Any, NamedTuple
+
+from starlette.types import ASGIApp, Receive, Scope, Send
+
+from app.log_utils import logger
+
+PROJECTS_PACKAGE = "app.proyectos"
+MANIFEST_VERSION = 1
+PROJECT_MODULES = ("routes.py", "models.py", "cli.py", "migrations")
+"""Files and directories whose modification time invalidates the manifest."""
+
+
+class Project(NamedTuple):
+    """A student project found in `app.proyectos`."""
+
+    name: str
+    routes: bool
+    """Whether the project has a `routes.py` module."""
+    models: bool
+    """Whether the project has a `models.py` module."""
+    cli: bool
+    """Whether the project has a `cli.py` module."""
+    migrations: bool
+    """Whether the project has a `migrations` package."""
+    tables: tuple[str, ...]
+    """Names of the tables declared in `models.py`."""
+
+    def module(self, name: str) -> str:
+        """Return the full name of a module of the project, for example `app.proyectos.nnieto.routes`."""
+        return f"{PROJECTS_PACKAGE}.{self.name}.{name}"
+
+
+def projects_path() -> Path:
+    """Return the directory of the `app.proyectos` package."""
+    return Path(importlib.import_module(PROJECTS_PACKAGE).__path__[0])
+
+
+def manifest_path() -> Path:
+    """Return the path of the manifest, next to the bytecode cache of `app.proyectos`."""
+    return projects_path() / "__pycache__" / "manifest.json"
+
+
+def fingerprint() -> dict[str, int]:
+    """Return the modification times of the project directories and modules, without importing them."""
+    root = projects_path()
+    stamps = {".": root.stat().st_mtime_ns}
+    for _, name, is_pkg in pkgutil.iter_modules([str(root)]):
+        if not is_pkg:
+            continue
+        stamps[name] = (root / name).stat().st_mtime_ns
+        for module in PROJECT_MODULES:
+            path = root / name / module
+            if path.exists():
+                stamps[f"{name}/{module}"] = path.stat().st_mtime_ns
+    return stamps
+
+
+def _tables_of(models_module: str) -> tuple[str, ...]:
+    module = importlib.import_module(models_module)
+    return tuple(
+        sorted(
+            value.__table__.name
+            for value in vars(module).values()
+            if isinstance(value, type) and hasattr(value, "__table__") and value.__module__ == models_module
+        ),
+    )
+
+
+def scan_projects() -> dict[str, Project]:
+    """Walk `app.proyectos` and build the manifest. This imports the `models.py` of every project."""
+    projects = {}
+    root = projects_path()
+    for _, name, is_pkg in pkgutil.iter_modules([str(root)]):
+        if not is_pkg:
+            continue
+        has = {module: (root / name / module).exists() for module in PROJECT_MODULES}
+        project = Project(
+            name=name,
+            routes=has["routes.py"],
+            models=has["models.py"],
+            cli=has["cli.py"],
+            migrations=has["migrations"],
+            tables=(),
+        )
+        if project.models:
+            try:
+                project = project._replace(tables=_tables_of(project.module("models")))
+            except ImportError:
+                logger.warning(f"No se pueden importar los modelos de {name}. Ignorando...")
+                project = project._replace(models=False)
+        projects[name] = project
+    return projects
+
+
+_cache: dict[str, Any] = {}
+_cache_lock = threading.Lock()
+
+
+def _read_manifest(stamps: dict[str, int]) -> dict[str, Project] | None:
+    try:
+        manifest = json.loads(manifest_path().read_text())
+    except (OSError, ValueError):
+        return None
+    if manifest.get("version") != MANIFEST_VERSION or manifest.get("fingerprint") != stamps:
+        return None
+    return {
+        name: Project(name=name, **{**data, "tables": tuple(data["tables"])})
+        for name, data in manifest["projects"].items()
+    }
+
+
+def _write_manifest(stamps: dict[str, int], projects: dict[str, Project]):
+    manifest = {
+        "version": MANIFEST_VERSION,
+        "fingerprint": stamps,
+        "projects": {
+            name: {field: value for field, value in project._asdict().items() if field != "name"}
+            for name, project in projects.items()
+        },
+    }
+    path = manifest_path()
+    # Written next to it and renamed, so another process (a server worker, a test worker) never reads half a file
+    partial = path.with_name(f"{path.name}.{os.getpid()}.tmp")
+    try:
+        path.parent.mkdir(exist_ok=True)
+        partial.write_text(json.dumps(manifest, indent=2))
+        partial.replace(path)
+    except OSError as e:
+        logger.warning(f"No se puede guardar el manifiesto de proyectos en {path}: {e}")
+
+
+def discover_projects() -> dict[str, Project]:
+    """Return the projects of `app.proyectos`, from the manifest if it is up to date.
+
+    Returns:
+        dict[str, Project]: The projects, by name, in alphabetical order.
+
+    """
+    stamps = fingerprint()
+    with _cache_lock:
+        if _cache.get("fingerprint") == stamps:
+            return _cache["projects"]
+        projects = _read_manifest(stamps)
+        if projects is None:
+            logger.info("Generando el manifiesto de proyectos")
+            projects = scan_projects()
+            _write_manifest(stamps, projects)
+        _cache.update(fingerprint=stamps, projects=projects)
+        return projects
+
+
+class LazyRoutesMiddleware:
+    """Mount the routers of a project when it receives its first request.
+
+    `app.main.load_routes` registers the URL prefixes of every project in `app.state.lazy_routes`
+    instead of importing them when `Settings.lazy_routes` is enabled. Requests to `/docs` or
+    `/openapi.json` mount every pending project, so the documentation stays complete.
+    """
+
+    ALL_ROUTES_PATHS = ("/docs", "/redoc", "/openapi.json")
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+        self.lock = threading.Lock()
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        """Mount the project of the request path, if it is pending, and continue."""
+        if scope["type"] in ("http", "websocket"):
+            fastapi_app = scope["app"]
+            pending: dict[str, str] = getattr(fastapi_app.state, "lazy_routes", {})
+            if pending:
+                path = scope["path"]
+                load_all = path.startswith(self.ALL_ROUTES_PATHS)
+                projects = {
+                    name
+                    for prefix, name in pending.items()
+                    if load_all or path == prefix or path.startswith(f"{prefix}/")
+                }
+                if projects:
+                    self.mount(fastapi_app, projects)
+        await self.app(scope, receive, send)
+
+    def mount(self, fastapi_app, projects: set[str]):
+        """Import and install the routers of `projects`."""
+        from app.main import install_routes
+
+        with self.lock:
+            pending = fastapi_app.state.lazy_routes
+            for name in sorted(projects):
+                if name not in pending.values():
+                    continue  # Another request mounted it first
+                for prefix in [prefix for prefix, project in pending.items() if project == name]:
+                    del pending[prefix]
+                install_routes(fastapi_app, name)
+            fastapi_app.openapi_schema = None
@@ -0,0 +1,182 @@
+"""Internal endpoints to observe the REST server.
+
+These routes are mounted at `/api/v1/_internal` by `app.main`. They are meant for the people
+running the server (to size the workers and the database), not for the frontends.
+
+`metrics_router` is mounted at the root instead, so Prometheus finds `GET /metrics` where it expects it.
+
+Routes:
+    - `GET /metrics`: Request and SQL metrics in the Prometheus text format (see `app.metrics`).
+    - `GET /db/pool`: Connection pool usage of the writer, reader and asynchronous engines.
+    - `GET /metrics/middleware`: Latency histograms of each middleware layer and each route.
+    - `DELETE /metrics/middleware`: Reset those histograms, for example before a load test.
+    - `GET /cache`: Size and hit rate of the aggregate caches (see `app.caching`).
+    - `DELETE /cache`: Empty the aggregate caches.
+    - `GET /threadpool`: Use of the thread pool of the `def` routes and of the bulkhead of each project.
+"""
+
+from typing import Any
+
+from fastapi import APIRouter, status
+from fastapi.responses import PlainTextResponse
+from pydantic import BaseModel, Field
+
+from app.caching import caches
+from app.db import async_engine, async_read_engine, engine, pool_status, read_engine
+from app.metrics import profiler, render_metrics
+from app.threadpool import threadpool_status
+
+api_router = APIRouter(tags=["Internal"])
+metrics_router = APIRouter(tags=["Internal"])
+
+PROMETHEUS_CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+
+class PoolStatus(BaseModel):
+    """Usage of a database connection pool."""
+
+    pool: str
+    """Class of the pool."""
+    size: int | None = None
+    """Connections kept open by the pool."""
+    max_overflow: int | None = None
+    """Extra connections allowed when all of `size` are in use."""
+    checked_in: int | None = None
+    """Idle connections."""
+    checked_out: int | None = None
+    """Connections in use."""
+    overflow: int | None = None
+    """Connections in use beyond `size`."""
+    checkouts: int | None = None
+    """Connections handed out since the server started."""
+    timeouts: int | None = None
+    """Requests that gave up waiting for a connection after `pool_timeout` seconds."""
+    checked_out_max: int | None = None
+    """Highest number of connections in use at the same time."""
+    wait_seconds_total: float | None = None
+    wait_seconds_avg: float | None = None
+    wait_seconds_max: float | None = None
+
+
+class DatabasePools(BaseModel):
+    """Pools of the writers (`DbSession`, `AsyncDbSession`) and readers (`DbReadSession`, `AsyncDbReadSession`)."""
+
+    sync: PoolStatus
+    read: PoolStatus
+    async_: PoolStatus = Field(alias="async")
+    async_read: PoolStatus
+
+
+@api_router.get("/db/pool")
+def db_pool() -> DatabasePools:
+    """Report the connection pool usage of the database engines.
+
+    Compare `checked_out_max` and the wait times with `pool_size` and `max_overflow` (see `app.config`)
+    to size the workers against the real database.
+    """
+    status: dict[str, Any] = {
+        "sync": pool_status(engine),
+        "read": pool_status(read_engine),
+        "async": pool_status(async_engine.sync_engine),
+        "async_read": pool_status(async_read_engine.sync_engine),
+    }
+    return DatabasePools.model_validate(status)
+
+
+class LatencyHistogram(BaseModel):
+    """Latency observations, in seconds."""
+
+    count: int
+    sum: float
+    avg: float
+    max: float
+    buckets: dict[str, int]
+    """Observations less than or equal to each bound, in seconds. The last bound is `+Inf`."""
+
+
+class MiddlewareProfile(BaseModel):
+    """Latency of the layers of the ASGI stack and of the routes."""
+
+    layers: dict[str, LatencyHistogram]
+    """Time spent in each middleware alone. `app` is the router and the endpoint."""
+    routes: dict[str, LatencyHistogram]
+    """Time spent in the router and the endpoint, by method and path template."""
+
+
+@api_router.get("/metrics/middleware")
+def middleware_metrics() -> MiddlewareProfile:
+    """Report the latency histograms of the middleware stack and of the routes.
+
+    Compare the `layers` under load to see what each middleware costs. They are only recorded
+    if `profile_middleware` is enabled (see `app.config`).
+    """
+    return MiddlewareProfile.model_validate(profiler.as_dict())
+
+
+@api_router.delete("/metrics/middleware", status_code=status.HTTP_204_NO_CONTENT)
+def reset_middleware_metrics():
+    """Forget the latency observations of the middleware stack and of the routes."""
+    profiler.reset()
+
+
+class CacheStats(BaseModel):
+    """Use of an aggregate cache."""
+
+    tables: list[str]
+    """Tables whose commits empty the cache."""
+    size: int
+    """Results kept."""
+    maxsize: int
+    ttl: float | None
+    """Seconds a result is kept."""
+    hits: int
+    misses: int
+    invalidations: int
+    """Commits that emptied the cache."""
+    hit_rate: float
+    """Fraction of the calls served from memory."""
+
+
+@api_router.get("/cache")
+def cache_stats() -> dict[str, CacheStats]:
+    """Report the size and the hit rate of each aggregate cache, by function name."""
+    return {name: CacheStats.model_validate(cache.stats()) for name, cache in caches.items()}
+
+
+@api_router.delete("/cache", status_code=status.HTTP_204_NO_CONTENT)
+def clear_caches():
+    """Empty every aggregate cache, for example after changing the database by hand."""
+    for cache in caches.values():
+        cache.invalidate()
+
+
+class ThreadPoolStatus(BaseModel):
+    """Use of the thread pool of the `def` routes, or of the bulkhead of a project."""
+
+    size: int
+    """Tokens: threads of the pool, or requests of the project that may use it at once."""
+    busy: int
+    """Tokens in use."""
+    waiting: int
+    """Calls waiting for a token."""
+    saturation: float
+    """Fraction of the tokens in use."""
+
+
+@api_router.get("/threadpool")
+def threadpool() -> dict[str, ThreadPoolStatus]:
+    """Report the use of the thread pool (`default`) and of the bulkhead of each project (see `app.threadpool`).
+
+    This route runs in the pool too, so `default` always has at least one busy token.
+    """
+    return {name: ThreadPoolStatus.model_validate(stats) for name, stats in threadpool_status().items()}
+
+
+@metrics_router.get("/metrics", response_class=PlainTextResponse)
+def metrics() -> PlainTextResponse:
+    """Report the request and SQL metrics in the Prometheus text format.
+
+    Latency by route template, requests by status code, errors, requests in progress, and the time and
+    number of SQL statements of the requests. See `app.metrics` for the list.
+    """
+    return PlainTextResponse(render_metrics(), media_type=PROMETHEUS_CONTENT_TYPE)
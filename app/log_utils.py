@@ -10,40 +10,183 @@ How to use in your module:
     logger.error("This is an error message")
     logger.critical("This is a critical message")
 ```
+
+There are two logging formats, chosen with `Settings.log_format`:
+- `rich` (default): Colored messages and tracebacks with the local variables, for development.
+  They are rendered and written to the console by the thread that logs.
+- `json`: One compact JSON object per line, for production. The thread that logs only puts the record
+  in a queue (`QueueHandler`); a `QueueListener` thread formats and writes it.
+
+`Settings.log_sample_rate` keeps only a fraction of the repeated `DEBUG` and `INFO` messages,
+for example `0.1` keeps 1 of every 10 messages logged by each line of code. Warnings and errors are always kept.
 """
 
+import atexit
+import json
 import logging
+import logging.handlers
+import queue
+import sys
+import threading
+from collections import OrderedDict
+from datetime import UTC, datetime
+from typing import TextIO
 
 from rich.console import Console
 from rich.logging import RichHandler
 
 from app.config import settings
 
+LOG_FORMATS = ("rich", "json")
+
+
+class JsonFormatter(logging.Formatter):
+    """Format a record as one compact JSON object per line."""
+
+    def format(self, record: logging.LogRecord) -> str:
+        """Return the record as JSON, with the traceback in `exc` if there is one."""
+        entry = {
+            "ts": datetime.fromtimestamp(record.created, UTC).isoformat(timespec="milliseconds"),
+            "level": record.levelname,
+            "logger": record.name,
+            "msg": record.getMessage(),
+        }
+        if record.exc_info:
+            entry["exc"] = self.formatException(record.exc_info)
+        elif record.exc_text:
+            entry["exc"] = record.exc_text
+        return json.dumps(entry, ensure_ascii=False, separators=(",", ":"), default=str)
+
+
+class SamplingFilter(logging.Filter):
+    """Keep 1 of every `1 / rate` messages of each call site up to `level`.
+
+    The messages are counted by logger and by the line of code that logs them, not by their text:
+    `logger.info(f"Instalando ruta de API en {path}")` counts as one message for every path.
+
+    Args:
+        rate (float): Fraction of the messages to keep, between 0 (exclusive) and 1.
+        level (int): Messages above this level are always kept.
+        maxsize (int): Most call sites counted. The least recently used are forgotten first.
+
+    Raises:
+        ValueError: If `rate` is not in (0, 1].
+
+    """
+
+    def __init__(self, rate: float, level: int = logging.INFO, maxsize: int = 1024):
+        super().__init__()
+        if not 0 < rate <= 1:
+            raise ValueError(f"La tasa de muestreo debe estar entre 0 y 1, no {rate}")
+        self.every = round(1 / rate)
+        self.level = level
+        self.maxsize = maxsize
+        self._lock = threading.Lock()
+        self._seen: OrderedDict[tuple[str, str, int], int] = OrderedDict()
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        """Return whether the record is kept."""
+        if record.levelno > self.level or self.every == 1:
+            return True
+        key = (record.name, record.pathname, record.lineno)
+        with self._lock:
+            seen = self._seen.get(key, 0)
+            self._seen[key] = seen + 1
+            self._seen.move_to_end(key)
+            if len(self._seen) > self.maxsize:
+                self._seen.popitem(last=False)
+        return seen % self.every == 0
+
+
+class QueueHandler(logging.handlers.QueueHandler):
+    """A `QueueHandler` that remembers its `QueueListener`, so `setup_logging` can stop it."""
+
+    def __init__(self, records: queue.SimpleQueue, listener: logging.handlers.QueueListener):
+        super().__init__(records)
+        self.listener = listener
+
+
+_listeners: dict[str, logging.handlers.QueueListener] = {}
+"""The running `QueueListener` of each logger configured with the `json` format."""
+
+
+@atexit.register
+def stop_listeners():
+    """Stop the `QueueListener` threads, writing their pending messages. Runs when the interpreter exits."""
+    while _listeners:
+        _, listener = _listeners.popitem()
+        listener.stop()
+
 
 def setup_logging(
     level: int = logging.INFO,
-) -> None:
-    """Set up logging configuration with RichHandler.
+    *,
+    log_format: str = "rich",
+    sample_rate: float = 1.0,
+    name: str = "app",
+    stream: TextIO | None = None,
+) -> logging.handlers.QueueListener | None:
+    """Set up logging configuration with RichHandler, or with a queue of JSON lines.
+
+    Calling it again replaces the handlers of the logger, and stops the `QueueListener` of the previous one.
 
     Args:
         level (int): Logging level. Default is logging.INFO.
+        log_format (str): `rich` for development, `json` for production (see the module documentation).
+        sample_rate (float): Fraction of the repeated `DEBUG` and `INFO` messages to keep.
+        name (str): Name of the logger to configure.
+        stream (TextIO | None): Where to write the messages. The standard error by default.
+
+    Returns:
+        QueueListener | None: The thread that writes the messages in `json` format. It is stopped,
+            flushing the pending messages, when the interpreter exits.
+
+    Raises:
+        ValueError: If `log_format` is not one of `LOG_FORMATS`.
 
     """
-    logger = logging.getLogger("app")
-    console = Console()
-    rich_handler = RichHandler(
-        show_time=False,
-        rich_tracebacks=True,
-        tracebacks_show_locals=True,
-        markup=True,
-        show_path=False,
-        console=console,
-    )
-    rich_handler.setFormatter(logging.Formatter("%(message)s"))
-    logger.addHandler(rich_handler)
+    if log_format not in LOG_FORMATS:
+        raise ValueError(f"Formato de log desconocido {log_format!r}, use uno de {LOG_FORMATS}")
+    logger = logging.getLogger(name)
+    for handler in list(logger.handlers):
+        logger.removeHandler(handler)
+        if isinstance(handler, QueueHandler):
+            handler.listener.stop()
+            if _listeners.get(name) is handler.listener:
+                del _listeners[name]
+
+    listener = None
+    if log_format == "rich":
+        console = Console(file=stream)
+        handler = RichHandler(
+            show_time=False,
+            rich_tracebacks=True,
+            tracebacks_show_locals=True,
+            markup=True,
+            show_path=False,
+            console=console,
+        )
+        handler.setFormatter(logging.Formatter("%(message)s"))
+    else:
+        output = logging.StreamHandler(stream or sys.stderr)
+        output.setFormatter(JsonFormatter())
+        records = queue.SimpleQueue()
+        listener = logging.handlers.QueueListener(records, output, respect_handler_level=True)
+        handler = QueueHandler(records, listener)
+        listener.start()
+        _listeners[name] = listener
+    if sample_rate < 1:
+        handler.addFilter(SamplingFilter(sample_rate))
+    logger.addHandler(handler)
 
     logger.setLevel(level)
     logger.propagate = False
+    return listener
+
 
-setup_logging(level=logging.DEBUG if settings.verbose else logging.INFO)
+setup_logging(
+    level=logging.DEBUG if settings.verbose else logging.INFO,
+    log_format=settings.log_format,
+    sample_rate=settings.log_sample_rate,
+)
 logger = logging.getLogger("app")
@@ -4,13 +4,16 @@ This module is responsible for setting up and running the FastAPI application.
 It includes the following key functionalities:
 
 - Loading and registering routes from all modules in the 'app.proyectos' package.
-- Creating the database and tables on startup using lifecycle events.
+- Creating the database and tables, and applying schema migrations, on startup using lifecycle events.
 
 Functions:
     - `load_routes(app: FastAPI)`: Loads and registers routes from all modules in
       the 'app.proyectos' package. This function is responsible for locating the
       routes you define in your project modules and including them in the main
       application.
+    - `install_routes(app: FastAPI, module_name: str)`: Imports the routes of a single
+      project and includes them in the application, once.
+    - `installed_routes(app: FastAPI)`: The projects whose routes are installed in the application.
     - `lifespan_cycle(app: FastAPI)`: Lifecycle event handler for the FastAPI
       application. This function locates all the database models in your project
       and creates the tables in the database when the server starts up.
@@ -21,10 +24,13 @@ Classes:
 Dependencies:
     - `fastapi`: FastAPI framework for building APIs.
     - `importlib`: Standard library module for importing modules.
-    - `pkgutil`: Standard library module for working with packages.
+    - `app.discovery`: Module containing the discovery manifest of the projects.
     - `app.config`: Module containing application settings.
     - `app.db`: Module containing database setup functions.
     - `app.log_utils`: Module containing logging configuration.
+    - `app.profiling`: Module containing the on-demand profiler of single requests.
+    - `app.metrics`: Module containing the request metrics and the latency histograms of the middleware stack.
+    - `app.threadpool`: Module containing the size, the bulkheads and the metrics of the thread pool of the `def` routes.
 
 Author:
     - Noe Nieto <noemisael.nieto@itmexicali.edu.mx>
@@ -34,14 +40,63 @@ License:
 """
 
 import importlib
-import pkgutil
 
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 
+from app import internal
 from app.config import settings
-from app.db import initialize_database
+from app.db import dispose_engines, initialize_database
+from app.discovery import LazyRoutesMiddleware, discover_projects
 from app.log_utils import logger
+from app.metrics import MetricsMiddleware, profile_middleware
+from app.migrations import run_migrations
+from app.pagination import NEXT_CURSOR_HEADER
+from app.profiling import ProfilerMiddleware
+from app.threadpool import configure_thread_pool, install_bulkheads
+
+
+def installed_routes(app: FastAPI) -> set[str]:
+    """Return the names of the projects whose routers are installed in `app`."""
+    if not hasattr(app.state, "installed_routes"):
+        app.state.installed_routes = set()
+    return app.state.installed_routes
+
+
+def install_routes(app: FastAPI, module_name: str):
+    """Import the `routes.py` module of a project and include its routers.
+
+    The `api_router` is installed at `/api/v1/<module_name>` and the `frontend_router`
+    at `/<module_name>`. A project that is already installed in `app` is skipped, so calling
+    it again (for example from every test) does not add the same routes twice. The `def` endpoints
+    of the project go through its bulkhead (see `app.threadpool`).
+
+    Args:
+        app (FastAPI): The FastAPI application instance.
+        module_name (str): The name of the project in 'app.proyectos'.
+
+    """
+    installed = installed_routes(app)
+    if module_name in installed:
+        return
+    routes_module = f"app.proyectos.{module_name}.routes"
+    try:
+        routes = importlib.import_module(routes_module)
+        first_route = len(app.router.routes)
+        if hasattr(routes, "api_router"):
+            app_path = f"/api/v1/{module_name}"
+            logger.info(f"Instalando ruta de API en {app_path}")
+            app.include_router(routes.api_router, prefix=app_path)
+        if hasattr(routes, "frontend_router"):
+            app_path = f"/{module_name}"
+            logger.info(f"Instalando ruta de frontend en  {app_path}")
+            app.include_router(routes.frontend_router, prefix=app_path)
+        install_bulkheads(app.router.routes[first_route:], module_name)
+        installed.add(module_name)
+    except ImportError:
+        logger.warning(
+            f"El módulo {module_name} no tiene un archivo routes.py o no se puede importar. Ignorando...",
+        )
 
 
 def load_routes(app: FastAPI):
@@ -51,37 +106,37 @@ def load_routes(app: FastAPI):
     from all modules in the 'app.proyectos' package. It looks for 'routes.py'
     files in each module and includes the routers defined in them.
 
+    The projects are read from the discovery manifest (see `app.discovery`). If
+    `settings.lazy_routes` is enabled, the routers are not imported here: each
+    project is mounted by `LazyRoutesMiddleware` when it receives its first request.
+    It can be called more than once, the projects already installed are skipped.
+
     Args:
         app (FastAPI): The FastAPI application instance.
 
     """
-    package = importlib.import_module("app.proyectos")
-
-    for _, module_name, is_pkg in pkgutil.iter_modules(package.__path__):
-        if not is_pkg:
+    installed = installed_routes(app)
+    for project in discover_projects().values():
+        if project.name in installed:
+            continue
+        if not project.routes:
+            logger.warning(f"El módulo {project.name} no tiene un archivo routes.py. Ignorando...")
             continue
-        routes_module = f"app.proyectos.{module_name}.routes"
-        try:
-            routes = importlib.import_module(routes_module)
-            if hasattr(routes, "api_router"):
-                app_path = f"/api/v1/{module_name}"
-                logger.info(f"Instalando ruta de API en {app_path}")
-                app.include_router(routes.api_router, prefix=app_path)
-            if hasattr(routes, "frontend_router"):
-                app_path = f"/{module_name}"
-                logger.info(f"Instalando ruta de frontend en  {app_path}")
-                app.include_router(routes.frontend_router, prefix=app_path)
-        except ImportError:
-            logger.warning(
-                f"El módulo {module_name} no tiene un archivo routes.py o no se puede importar. Ignorando...",
-            )
+        if settings.lazy_routes:
+            app.state.lazy_routes[f"/api/v1/{project.name}"] = project.name
+            app.state.lazy_routes[f"/{project.name}"] = project.name
+        else:
+            install_routes(app, project.name)
 
 
 async def lifespan_cycle(app: FastAPI):
     """Lifecycle event handler for the FastAPI application.
 
     This function is called during the startup and shutdown of the FastAPI
-    application. It creates the database and tables, and loads the routes.
+    application. It creates the database and tables, applies the pending schema
+    migrations (see `app.migrations`), and loads the routes. The workers of `app.server`
+    skip the first two, the main process already did them before forking (`app.state.preloaded`).
+    It also sizes the thread pool of the `def` routes to `settings.thread_pool_size`.
 
     Args:
         app (FastAPI): The FastAPI application instance.
@@ -94,10 +149,15 @@ async def lifespan_cycle(app: FastAPI):
 
     """
     logger.info("lifespan_cycle setup")
-    initialize_database()
+    configure_thread_pool(settings.thread_pool_size)
+    if not getattr(app.state, "preloaded", False):
+        initialize_database()
+        if settings.migrate_on_startup:
+            run_migrations()
     load_routes(app)
     yield
     logger.info("lifespan_cycle teardown")
+    await dispose_engines()
 
 
 app = FastAPI(
@@ -121,28 +181,35 @@ app = FastAPI(
         },
     ],
 )
-# Agrega el middleware de CORS a la aplicación
+app.state.lazy_routes = {}
+app.add_middleware(LazyRoutesMiddleware)
+app.include_router(internal.api_router, prefix="/api/v1/_internal")
+app.include_router(internal.metrics_router)
+
+# Agrega el middleware de CORS a la aplicación.
+# El front end de CONTACTOS corre en el puerto 3000.
 origins = [
     "http://localhost:3000",
     "http://127.0.0.1:3000",
     "http://localhost:5090",
-    
 ]
 
 app.add_middleware(
     CORSMiddleware,
-    allow_origins=origins,
+    allow_origins=origins,  # Evita usar "*"
     allow_credentials=True,
-    allow_methods=["*"],
-    allow_headers=["*"],
+    allow_methods=["*"],  # Permite todos los métodos HTTP (GET, POST, PUT, DELETE, etc.)
+    allow_headers=["*"],  # Permite todos los encabezados.
+    # Permite leer el cursor de la siguiente página y la versión de los datos (`ETag`).
+    expose_headers=[NEXT_CURSOR_HEADER, "ETag", "Last-Modified"],
 )
 
+if settings.collect_metrics:
+    app.add_middleware(MetricsMiddleware)
 
+if settings.profiling:
+    app.add_middleware(ProfilerMiddleware)
 
-app.add_middleware(
-    CORSMiddleware,
-    allow_origins=["http://127.0.0.1:3000", "http://localhost:3000","http://localhost:5090"],  # Evita usar "*" # front end de CONTACTOS corre en el puerto 3000
-    allow_credentials=True,
-    allow_methods=["*"],  # Permite todos los métodos HTTP (GET, POST, PUT, DELETE, etc.)
-    allow_headers=["*"],  # Permite todos los encabezados.
-)
\ No newline at end of file
+# Debe ir después del último `app.add_middleware`, ver `app.metrics`.
+if settings.profile_middleware:
+    profile_middleware(app)
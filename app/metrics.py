@@ -0,0 +1,473 @@
+"""Request metrics and latency histograms, for `/metrics` and for the middleware stack.
+
+`MetricsMiddleware` measures every request and `instrument_engine` measures every SQL statement
+of an engine. The metrics are labelled by method and route template, for example
+`PUT /api/v1/nnieto/alcancia/transaction/{txn_type}/{quantity}`, and served in the Prometheus text
+format at `GET /metrics` (see `app.internal`):
+
+- `http_requests_total`: Requests, by method, route and status code.
+- `http_request_errors_total`: Requests that failed with a 5xx status or an unhandled exception.
+- `http_request_duration_seconds`: Latency histogram of the requests.
+- `http_requests_in_progress`: Requests being handled right now, by method.
+- `db_request_duration_seconds`: Histogram of the time each request spent running SQL statements.
+- `db_statements_total`: SQL statements run by the requests.
+- `http_middleware_duration_seconds`: Time spent in each middleware alone (see below).
+- `cache_hits_total`, `cache_misses_total`, `cache_invalidations_total`: Use of each aggregate cache of `app.caching`.
+- `threadpool_*`: Queue wait and saturation of the thread pool of the `def` routes and of its bulkheads
+  (see `app.threadpool`).
+
+Every request goes through the ASGI stack that Starlette builds from `app.user_middleware`:
+`ServerErrorMiddleware`, then our middlewares (CORS, lazy routes, ...), then `ExceptionMiddleware`
+and the router. `profile_middleware(app)` wraps each of our middlewares in a `TimedMiddleware`
+that records how long the request spent *in that layer alone*: the time of the layer minus the time
+of the layers below it. What is left below the last middleware is recorded as the `app` layer
+(the router and the endpoint), and also by route, for example `GET /api/v1/nnieto/alcancia/transactions`.
+
+The middleware histograms are also served as JSON at `GET /api/v1/_internal/metrics/middleware`.
+
+How to use it (`profile_middleware` must be the last change to the middleware stack):
+```python
+    app.add_middleware(CORSMiddleware, ...)
+    app.add_middleware(MetricsMiddleware)
+    profile_middleware(app)
+```
+
+Recording an observation takes a lock and a few additions, so the metrics can stay enabled in production.
+"""
+
+import bisect
+import threading
+import time
+from collections.abc import Callable, Iterator
+from contextvars import ContextVar
+from typing import Any
+
+from fastapi import FastAPI
+from sqlalchemy import Engine, event
+from starlette.middleware import Middleware
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+LATENCY_BUCKETS = (0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0)
+"""Upper bounds, in seconds, of the histogram buckets. Slower observations go to `+Inf`."""
+
+APP_LAYER = "app"
+"""Name of the layer below the last middleware: `ExceptionMiddleware`, the router and the endpoint."""
+
+_DOWNSTREAM = "app.metrics.downstream"
+"""Scope key with the seconds each `TimedMiddleware` spent waiting for the layers below it."""
+
+
+class LatencyHistogram:
+    """Count, sum, maximum and bucket counts of latency observations, in seconds."""
+
+    def __init__(self, buckets: tuple[float, ...] = LATENCY_BUCKETS):
+        self._lock = threading.Lock()
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)
+        self.count = 0
+        self.sum = 0.0
+        self.max = 0.0
+
+    def observe(self, seconds: float):
+        """Record one observation."""
+        with self._lock:
+            self.counts[bisect.bisect_left(self.buckets, seconds)] += 1
+            self.count += 1
+            self.sum += seconds
+            self.max = max(self.max, seconds)
+
+    def as_dict(self) -> dict[str, Any]:
+        """Return the histogram as a dictionary. Bucket counts are cumulative, like in Prometheus."""
+        with self._lock:
+            cumulative, buckets = 0, {}
+            for bound, count in zip([*map(str, self.buckets), "+Inf"], self.counts, strict=True):
+                cumulative += count
+                buckets[bound] = cumulative
+            return {
+                "count": self.count,
+                "sum": self.sum,
+                "avg": self.sum / self.count if self.count else 0.0,
+                "max": self.max,
+                "buckets": buckets,
+            }
+
+
+class MiddlewareProfiler:
+    """Latency histograms by middleware layer and by route."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.layers: dict[str, LatencyHistogram] = {}
+        self.routes: dict[str, LatencyHistogram] = {}
+
+    def _histogram(self, histograms: dict[str, LatencyHistogram], name: str) -> LatencyHistogram:
+        histogram = histograms.get(name)
+        if histogram is None:
+            with self._lock:
+                histogram = histograms.setdefault(name, LatencyHistogram())
+        return histogram
+
+    def record_layer(self, name: str, seconds: float):
+        """Record the time a request spent in a layer of the stack, without the layers below it."""
+        self._histogram(self.layers, name).observe(seconds)
+
+    def record_route(self, name: str, seconds: float):
+        """Record the time a request spent in the router and the endpoint of a route."""
+        self._histogram(self.routes, name).observe(seconds)
+
+    def reset(self):
+        """Forget every observation, for example before a load test."""
+        with self._lock:
+            self.layers.clear()
+            self.routes.clear()
+
+    def as_dict(self) -> dict[str, Any]:
+        """Return the histograms of the layers and the routes as a dictionary."""
+        with self._lock:
+            layers, routes = dict(self.layers), dict(self.routes)
+        return {
+            "layers": {name: histogram.as_dict() for name, histogram in layers.items()},
+            "routes": {name: histogram.as_dict() for name, histogram in sorted(routes.items())},
+        }
+
+
+profiler = MiddlewareProfiler()
+
+
+def route_name(scope: Scope) -> str | None:
+    """Return the method and the path template of the route that handled a request, if any."""
+    route = scope.get("route")
+    path = getattr(route, "path", None)
+    if path is None:
+        return None
+    return f"{scope.get('method', 'WS')} {path}"
+
+
+class _DownstreamTimer:
+    """Measure the time the middleware named `name` waits for the layers below it."""
+
+    def __init__(self, app: ASGIApp, name: str, *, innermost: bool):
+        self.app = app
+        self.name = name
+        self.innermost = innermost
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        if scope["type"] not in ("http", "websocket"):
+            await self.app(scope, receive, send)
+            return
+        start = time.perf_counter()
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            elapsed = time.perf_counter() - start
+            downstream = scope.setdefault(_DOWNSTREAM, {})
+            downstream[self.name] = downstream.get(self.name, 0.0) + elapsed
+            if self.innermost:
+                profiler.record_layer(APP_LAYER, elapsed)
+                route = route_name(scope)
+                if route is not None:
+                    profiler.record_route(route, elapsed)
+
+
+class TimedMiddleware:
+    """Wrap a middleware and record the time requests spend in it (see `MiddlewareProfiler`).
+
+    Args:
+        app (ASGIApp): The next layer of the stack.
+        middleware (type): The middleware class to wrap.
+        name (str): Name of the layer in the histograms.
+        innermost (bool): Whether this is the last middleware before the router.
+        *args: Positional arguments of the middleware.
+        **kwargs: Keyword arguments of the middleware.
+
+    """
+
+    def __init__(self, app: ASGIApp, middleware: type, *args, name: str, innermost: bool = False, **kwargs):
+        self.name = name
+        self.app = middleware(_DownstreamTimer(app, name, innermost=innermost), *args, **kwargs)
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        """Call the wrapped middleware and record its own time."""
+        if scope["type"] not in ("http", "websocket"):
+            await self.app(scope, receive, send)
+            return
+        start = time.perf_counter()
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            elapsed = time.perf_counter() - start
+            downstream = scope.get(_DOWNSTREAM, {}).get(self.name, 0.0)
+            profiler.record_layer(self.name, max(elapsed - downstream, 0.0))
+
+
+def profile_middleware(app: FastAPI):
+    """Wrap every middleware of `app` in a `TimedMiddleware`.
+
+    Call it after the last `app.add_middleware`: middlewares added later are not profiled.
+
+    Args:
+        app (FastAPI): The FastAPI application instance.
+
+    """
+    wrapped = []
+    names: dict[str, int] = {}
+    for position, (cls, args, kwargs) in enumerate(app.user_middleware):
+        if cls is TimedMiddleware:
+            wrapped.append(Middleware(cls, *args, **kwargs))
+            continue
+        name = cls.__name__
+        names[name] = names.get(name, 0) + 1
+        if names[name] > 1:
+            name = f"{name}_{names[name]}"
+        innermost = position == len(app.user_middleware) - 1
+        wrapped.append(Middleware(TimedMiddleware, cls, *args, name=name, innermost=innermost, **kwargs))
+    app.user_middleware = wrapped
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _sample(name: str, labels: dict[str, str], value: float) -> str:
+    if not labels:
+        return f"{name} {value}"
+    rendered = ",".join(f'{key}="{_escape(label)}"' for key, label in labels.items())
+    return f"{name}{{{rendered}}} {value}"
+
+
+class Metric:
+    """A metric with labels, in the Prometheus text format.
+
+    Args:
+        name (str): Name of the metric, for example `http_requests_total`.
+        documentation (str): The `# HELP` text.
+        labels (tuple[str, ...]): Names of the labels, in the order of the values given to `labels`.
+
+    """
+
+    type = "untyped"
+
+    def __init__(self, name: str, documentation: str, labels: tuple[str, ...] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.label_names = labels
+        self._lock = threading.Lock()
+        self._values: dict[tuple[str, ...], Any] = {}
+
+    def samples(self, labels: dict[str, str], value: Any) -> Iterator[str]:
+        """Render the samples of one set of label values."""
+        yield _sample(self.name, labels, value)
+
+    def render(self) -> Iterator[str]:
+        """Render the metric, with its `# HELP` and `# TYPE` lines."""
+        yield f"# HELP {self.name} {self.documentation}"
+        yield f"# TYPE {self.name} {self.type}"
+        with self._lock:
+            values = sorted(self._values.items())
+        for label_values, value in values:
+            yield from self.samples(dict(zip(self.label_names, label_values, strict=True)), value)
+
+    def reset(self):
+        """Forget every value."""
+        with self._lock:
+            self._values.clear()
+
+
+class Counter(Metric):
+    """A value that only goes up."""
+
+    type = "counter"
+
+    def inc(self, *labels: str, amount: float = 1):
+        """Add `amount` to the counter of `labels`."""
+        with self._lock:
+            self._values[labels] = self._values.get(labels, 0) + amount
+
+
+class Gauge(Metric):
+    """A value that goes up and down."""
+
+    type = "gauge"
+
+    def inc(self, *labels: str, amount: float = 1):
+        """Add `amount` to the gauge of `labels`."""
+        with self._lock:
+            self._values[labels] = self._values.get(labels, 0) + amount
+
+    def dec(self, *labels: str, amount: float = 1):
+        """Subtract `amount` from the gauge of `labels`."""
+        self.inc(*labels, amount=-amount)
+
+    def set(self, *labels: str, value: float):
+        """Set the gauge of `labels` to `value`."""
+        with self._lock:
+            self._values[labels] = value
+
+    def value(self, *labels: str) -> float:
+        """Return the gauge of `labels`, 0 if it was never set."""
+        with self._lock:
+            return self._values.get(labels, 0)
+
+
+class Histogram(Metric):
+    """A `LatencyHistogram` for each set of labels."""
+
+    type = "histogram"
+
+    def observe(self, *labels: str, seconds: float):
+        """Record one observation for `labels`."""
+        histogram = self._values.get(labels)
+        if histogram is None:
+            with self._lock:
+                histogram = self._values.setdefault(labels, LatencyHistogram())
+        histogram.observe(seconds)
+
+    def samples(self, labels: dict[str, str], value: LatencyHistogram) -> Iterator[str]:
+        """Render the `_bucket`, `_sum` and `_count` samples of a histogram."""
+        histogram = value.as_dict()
+        for bound, count in histogram["buckets"].items():
+            yield _sample(f"{self.name}_bucket", {**labels, "le": bound}, count)
+        yield _sample(f"{self.name}_sum", labels, histogram["sum"])
+        yield _sample(f"{self.name}_count", labels, histogram["count"])
+
+
+UNMATCHED_ROUTE = "<unmatched>"
+"""Route label of the requests that did not match any route, so 404s do not create a label per URL."""
+
+REQUESTS = Counter("http_requests_total", "Requests handled.", ("method", "route", "status"))
+ERRORS = Counter("http_request_errors_total", "Requests that failed with a 5xx status.", ("method", "route"))
+LATENCY = Histogram("http_request_duration_seconds", "Time to handle a request.", ("method", "route"))
+IN_PROGRESS = Gauge("http_requests_in_progress", "Requests being handled.", ("method",))
+DB_LATENCY = Histogram("db_request_duration_seconds", "Time a request spent running SQL.", ("method", "route"))
+DB_STATEMENTS = Counter("db_statements_total", "SQL statements run by the requests.", ("method", "route"))
+CACHE_HITS = Counter("cache_hits_total", "Results served from an aggregate cache (see app.caching).", ("cache",))
+CACHE_MISSES = Counter("cache_misses_total", "Results computed because they were not in the cache.", ("cache",))
+CACHE_INVALIDATIONS = Counter("cache_invalidations_total", "Commits that emptied an aggregate cache.", ("cache",))
+THREADPOOL_QUEUE_WAIT = Histogram(
+    "threadpool_queue_wait_seconds", "Time a def endpoint waited for its bulkhead and a thread.", ("project",),
+)
+THREADPOOL_SIZE = Gauge("threadpool_size", "Tokens of the thread pool and of each bulkhead.", ("pool",))
+THREADPOOL_BUSY = Gauge("threadpool_busy", "Tokens in use of the thread pool and of each bulkhead.", ("pool",))
+THREADPOOL_WAITING = Gauge("threadpool_waiting", "Calls waiting for a token of the pool or a bulkhead.", ("pool",))
+THREADPOOL_SATURATED = Counter("threadpool_saturated_total", "Calls that found no free token and waited.", ("pool",))
+
+METRICS: tuple[Metric, ...] = (
+    REQUESTS,
+    ERRORS,
+    LATENCY,
+    IN_PROGRESS,
+    DB_LATENCY,
+    DB_STATEMENTS,
+    CACHE_HITS,
+    CACHE_MISSES,
+    CACHE_INVALIDATIONS,
+    THREADPOOL_QUEUE_WAIT,
+    THREADPOOL_SIZE,
+    THREADPOOL_BUSY,
+    THREADPOOL_WAITING,
+    THREADPOOL_SATURATED,
+)
+
+COLLECTORS: list[Callable[[], None]] = []
+"""Functions called before rendering the metrics, to update the gauges that are read instead of counted."""
+
+
+def render_metrics() -> str:
+    """Render every metric, and the middleware histograms, in the Prometheus text format."""
+    for collect in COLLECTORS:
+        collect()
+    lines = [line for metric in METRICS for line in metric.render()]
+    middleware = Histogram(
+        "http_middleware_duration_seconds",
+        "Time a request spent in a middleware, without the layers below it.",
+        ("layer",),
+    )
+    middleware._values = {(name,): histogram for name, histogram in profiler.layers.copy().items()}
+    lines.extend(middleware.render())
+    return "\n".join(lines) + "\n"
+
+
+class RequestStats:
+    """SQL statements run while handling a request."""
+
+    __slots__ = ("db_seconds", "statements")
+
+    def __init__(self):
+        self.statements = 0
+        self.db_seconds = 0.0
+
+
+_request_stats: ContextVar[RequestStats | None] = ContextVar("request_stats", default=None)
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):  # noqa: ARG001
+    if _request_stats.get() is not None:
+        conn.info.setdefault("query_start", []).append(time.perf_counter())
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):  # noqa: ARG001
+    stats = _request_stats.get()
+    starts = conn.info.get("query_start")
+    if stats is not None and starts:
+        stats.statements += 1
+        stats.db_seconds += time.perf_counter() - starts.pop()
+
+
+def _handle_error(exception_context):
+    starts = exception_context.connection.info.get("query_start") if exception_context.connection else None
+    if starts:
+        starts.pop()
+
+
+def instrument_engine(db_engine: Engine):
+    """Count the SQL statements of `db_engine` and their time in the metrics of the current request.
+
+    Statements run outside a request (for example, when the server starts) are not measured.
+
+    Args:
+        db_engine (Engine): The engine. For an `AsyncEngine`, pass its `sync_engine`.
+
+    """
+    event.listen(db_engine, "before_cursor_execute", _before_cursor_execute)
+    event.listen(db_engine, "after_cursor_execute", _after_cursor_execute)
+    event.listen(db_engine, "handle_error", _handle_error)
+
+
+class MetricsMiddleware:
+    """Record the request metrics of `http` requests (see the module documentation)."""
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        """Handle the request and record its latency, status and SQL time."""
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        method = scope["method"]
+        status_code = 500
+
+        async def send_with_status(message: Message):
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+            await send(message)
+
+        stats = RequestStats()
+        token = _request_stats.set(stats)
+        IN_PROGRESS.inc(method)
+        start = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            elapsed = time.perf_counter() - start
+            IN_PROGRESS.dec(method)
+            _request_stats.reset(token)
+            route = getattr(scope.get("route"), "path", UNMATCHED_ROUTE)
+            REQUESTS.inc(method, route, str(status_code))
+            if status_code >= 500:
+                ERRORS.inc(method, route)
+            LATENCY.observe(method, route, seconds=elapsed)
+            DB_LATENCY.observe(method, route, seconds=stats.db_seconds)
+            if stats.statements:
+                DB_STATEMENTS.inc(method, route, amount=stats.statements)
@@ -0,0 +1,225 @@
+"""Versioned schema migrations for the projects in `app.proyectos`.
+
+`app.db.initialize_database` creates the tables that do not exist yet, but it cannot change a table
+that is already in a live database: a new index or a new column never reaches it. Migrations do.
+
+Each project keeps its migrations in a `migrations` package next to its `models.py`:
+
+```
+app/proyectos/<proyecto>/migrations/__init__.py
+app/proyectos/<proyecto>/migrations/0001_index_nombre.py
+app/proyectos/<proyecto>/migrations/0002_...
+```
+
+A migration is a module named `<version>_<description>.py` with an `upgrade` function. Use the helpers
+of this module, they do nothing if the change is already there (for example, because the table was just
+created by `initialize_database` with the current models):
+
+```python
+\"\"\"Index the names of the contacts.\"\"\"
+
+from app.migrations import create_index
+
+online = True
+
+
+def upgrade(connection):
+    create_index(connection, "ix_contactos_agenda_nombre", "contactos_agenda", ["nombre"])
+```
+
+Migrations run inside a transaction, unless the module sets `online = True`. Online migrations run
+in autocommit mode, so `create_index` can use `CREATE INDEX CONCURRENTLY` in PostgreSQL and the table
+keeps accepting writes while the index is built.
+
+The applied versions are stored in the `schema_migrations` table. Migrations run when the server
+starts (see `Settings.migrate_on_startup`) or from the command line:
+
+```
+soa db status
+soa db migrate
+```
+"""
+
+import importlib
+import pkgutil
+import re
+from collections.abc import Callable, Sequence
+from datetime import UTC, datetime
+from typing import NamedTuple
+
+from sqlalchemy import Connection, Engine, inspect, text
+from sqlalchemy.exc import IntegrityError
+from sqlmodel import Field, Session, SQLModel, select
+
+from app.db import get_engine
+from app.discovery import discover_projects
+from app.log_utils import logger
+
+MIGRATION_MODULE = re.compile(r"^(?P<version>\d+)_(?P<name>\w+)$")
+"""Name of a migration module: a version number, an underscore and a description."""
+
+
+def now_utc() -> datetime:
+    """Get the current UTC datetime."""
+    return datetime.now(UTC)
+
+
+class SchemaMigration(SQLModel, table=True):
+    """A migration that was applied to the database."""
+
+    __tablename__ = "schema_migrations"
+    project: str = Field(primary_key=True)
+    version: str = Field(primary_key=True)
+    name: str = Field(nullable=False)
+    applied_at: datetime = Field(default_factory=now_utc, nullable=False)
+
+
+class Migration(NamedTuple):
+    """A migration script found in `app.proyectos.<project>.migrations`."""
+
+    project: str
+    version: str
+    name: str
+    upgrade: Callable[[Connection], None]
+    online: bool
+
+
+def discover_migrations() -> list[Migration]:
+    """Import the migration scripts of every project.
+
+    Returns:
+        list[Migration]: The migrations, sorted by project and version.
+
+    """
+    migrations = []
+    for project in discover_projects().values():
+        if not project.migrations:
+            continue
+        migrations_package = project.module("migrations")
+        scripts = importlib.import_module(migrations_package)
+        for _, module_name, _ in pkgutil.iter_modules(scripts.__path__):
+            match = MIGRATION_MODULE.match(module_name)
+            if match is None:
+                logger.warning(f"{migrations_package}.{module_name} no es una migración. Ignorando...")
+                continue
+            module = importlib.import_module(f"{migrations_package}.{module_name}")
+            migrations.append(
+                Migration(
+                    project=project.name,
+                    version=match["version"],
+                    name=match["name"],
+                    upgrade=module.upgrade,
+                    online=getattr(module, "online", False),
+                ),
+            )
+    return sorted(migrations, key=lambda m: (m.project, int(m.version)))
+
+
+def applied_versions(db_engine: Engine) -> set[tuple[str, str]]:
+    """Return the `(project, version)` pairs recorded in `schema_migrations`."""
+    SchemaMigration.metadata.create_all(db_engine, tables=[SchemaMigration.__table__])
+    with Session(db_engine) as db:
+        return {(m.project, m.version) for m in db.exec(select(SchemaMigration))}
+
+
+def pending_migrations(db_engine: Engine) -> list[Migration]:
+    """Return the migrations that were not applied to the database yet."""
+    applied = applied_versions(db_engine)
+    return [m for m in discover_migrations() if (m.project, m.version) not in applied]
+
+
+def run_migrations(db_engine: Engine | None = None, project: str | None = None) -> list[Migration]:
+    """Apply the pending migrations, in order.
+
+    If several processes start at the same time, they may run the same migration. The helpers of this
+    module are idempotent, and only the first process records it.
+
+    Args:
+        db_engine (Engine | None): The database engine. By default, the migrations of each project run
+            in the database of the project (see `app.db.get_engine`).
+        project (str | None): Only apply the migrations of this project.
+
+    Returns:
+        list[Migration]: The migrations that were applied.
+
+    """
+    if db_engine is None:
+        projects = sorted({m.project for m in discover_migrations() if project in (None, m.project)})
+        return [migration for name in projects for migration in run_migrations(get_engine(name), project=name)]
+    applied = []
+    for migration in pending_migrations(db_engine):
+        if project is not None and migration.project != project:
+            continue
+        logger.info(f"Aplicando migración {migration.project} {migration.version}_{migration.name}")
+        if migration.online:
+            with db_engine.connect() as connection:
+                migration.upgrade(connection.execution_options(isolation_level="AUTOCOMMIT"))
+        else:
+            with db_engine.begin() as connection:
+                migration.upgrade(connection)
+        try:
+            with Session(db_engine) as db:
+                db.add(SchemaMigration(project=migration.project, version=migration.version, name=migration.name))
+                db.commit()
+        except IntegrityError:
+            logger.info(f"La migración {migration.project} {migration.version} ya fue registrada por otro proceso")
+        applied.append(migration)
+    return applied
+
+
+def create_index(
+    connection: Connection,
+    name: str,
+    table: str,
+    columns: Sequence[str],
+    *,
+    unique: bool = False,
+):
+    """Create an index if it does not exist.
+
+    In PostgreSQL, if the connection is in autocommit mode (see `online`), the index is built with
+    `CREATE INDEX CONCURRENTLY`, which does not block writes to the table.
+
+    Args:
+        connection (Connection): The connection given to `upgrade`.
+        name (str): Name of the index.
+        table (str): Name of the table.
+        columns (Sequence[str]): Columns of the index, in order.
+        unique (bool): Whether to create a unique index.
+
+    """
+    preparer = connection.dialect.identifier_preparer
+    concurrently = (
+        connection.dialect.name == "postgresql"
+        and connection.get_execution_options().get("isolation_level") == "AUTOCOMMIT"
+    )
+    statement = " ".join(
+        [
+            "CREATE",
+            "UNIQUE" if unique else "",
+            "INDEX",
+            "CONCURRENTLY" if concurrently else "",
+            "IF NOT EXISTS",
+            preparer.quote(name),
+            "ON",
+            preparer.quote(table),
+            "(" + ", ".join(preparer.quote(c) for c in columns) + ")",
+        ],
+    )
+    connection.execute(text(re.sub(r"\s+", " ", statement)))
+
+
+def add_column(connection: Connection, table: str, column_ddl: str):
+    """Add a column to a table if it does not exist.
+
+    Args:
+        connection (Connection): The connection given to `upgrade`.
+        table (str): Name of the table.
+        column_ddl (str): Definition of the column, for example `"notas VARCHAR"`. The first word is its name.
+
+    """
+    column = column_ddl.split()[0]
+    if column in {c["name"] for c in inspect(connection).get_columns(table)}:
+        return
+    preparer = connection.dialect.identifier_preparer
+    connection.execute(text(f"ALTER TABLE {preparer.quote(table)} ADD COLUMN {column_ddl}"))
@@ -0,0 +1,214 @@
+"""Keyset pagination and NDJSON streaming for the list endpoints of `app.proyectos`.
+
+All the list routes share the same problem: `db.exec(select(Model)).all()` loads the whole
+table in memory and renders a single JSON array. This module provides a dependency that every
+project router can use to page through a table by its primary key instead.
+
+How to use in your routes:
+```python
+    from app.db import DbReadSession
+    from app.pagination import Pagination
+
+    @api_router.get("/transactions")
+    def transactions_list(db: DbReadSession, page: Pagination) -> list[Transaction]:
+        return page.fetch(db, Transaction)
+```
+
+Query parameters understood by `Pagination`:
+- `limit`: Maximum number of rows to return. If omitted, the whole table is returned (legacy behavior).
+- `after_id`: Only return rows whose primary key is greater than this value.
+- `cursor`: The opaque value of the `X-Next-Cursor` header of a previous page. Takes precedence over `after_id`.
+
+The response body is still a JSON array. When there are more rows, the `X-Next-Cursor` response header
+contains the cursor for the next page. Clients that send `Accept: application/x-ndjson` get the rows as
+newline-delimited JSON, streamed from a server-side cursor so the table is never fully loaded in memory.
+
+For big tables, pass the `response_model` of the route to `fetch`: the page is then encoded directly to
+bytes by `app.serialization.FastJSONResponse` instead of going through the validation of FastAPI.
+"""
+
+import base64
+import binascii
+import json
+from collections.abc import Callable, Iterator
+from typing import Annotated, Any, get_args
+
+from fastapi import Depends, Header, HTTPException, Query, Response, status
+from fastapi.responses import StreamingResponse
+from pydantic import BaseModel
+from sqlalchemy import inspect
+from sqlalchemy.orm import InstrumentedAttribute
+from sqlmodel import Session, SQLModel, select
+from sqlmodel.sql.expression import SelectOfScalar
+
+from app.config import settings
+from app.serialization import FastJSONResponse, dump_json
+
+NEXT_CURSOR_HEADER = "X-Next-Cursor"
+"""Name of the response header that carries the cursor of the next page."""
+
+NDJSON_MEDIA_TYPE = "application/x-ndjson"
+"""Media type for newline-delimited JSON responses."""
+
+
+def encode_cursor(last_id: int) -> str:
+    """Encode the primary key of the last row of a page into an opaque cursor.
+
+    Args:
+        last_id (int): Primary key of the last row that was returned.
+
+    Returns:
+        str: A URL-safe cursor.
+
+    """
+    payload = json.dumps({"after_id": last_id}, separators=(",", ":")).encode()
+    return base64.urlsafe_b64encode(payload).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> int:
+    """Decode a cursor created by `encode_cursor`.
+
+    Args:
+        cursor (str): The opaque cursor sent by the client.
+
+    Returns:
+        int: The primary key of the last row of the previous page.
+
+    Raises:
+        HTTPException: If the cursor is malformed, a 400 Bad Request error is raised.
+
+    """
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        after_id = json.loads(base64.urlsafe_b64decode(padded))["after_id"]
+    except (binascii.Error, UnicodeDecodeError, ValueError, KeyError, TypeError) as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Invalid cursor") from e
+    if not isinstance(after_id, int):
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Invalid cursor")
+    return after_id
+
+
+def primary_key_of(model: type[SQLModel]) -> InstrumentedAttribute:
+    """Return the (single) primary key column of a table model, used as the keyset column."""
+    return getattr(model, inspect(model).primary_key[0].key)
+
+
+def _to_json(row: Any) -> str:
+    if isinstance(row, BaseModel):
+        return row.model_dump_json()
+    return json.dumps(row, default=str)
+
+
+class Page:
+    """Pagination parameters of a single request.
+
+    Do not instantiate this class directly, use the `Pagination` dependency instead.
+    """
+
+    def __init__(self, response: Response, limit: int | None, after_id: int | None, *, stream: bool):
+        self.response = response
+        self.limit = limit
+        self.after_id = after_id
+        self.stream = stream
+
+    def statement(self, model: type[SQLModel], statement: SelectOfScalar | None = None) -> SelectOfScalar:
+        """Apply the keyset condition and ordering to a `select` statement.
+
+        Args:
+            model (type[SQLModel]): The table model being listed.
+            statement (SelectOfScalar | None): An optional statement to paginate. Defaults to `select(model)`.
+
+        Returns:
+            SelectOfScalar: The statement ordered by primary key, filtered by `after_id`.
+
+        """
+        pk = primary_key_of(model)
+        statement = select(model) if statement is None else statement
+        if self.after_id is not None:
+            statement = statement.where(pk > self.after_id)
+        return statement.order_by(pk)
+
+    def fetch(
+        self,
+        db: Session,
+        model: type[SQLModel],
+        statement: SelectOfScalar | None = None,
+        transform: Callable[[Any], Any] | None = None,
+        response_model: Any = None,
+    ) -> list | StreamingResponse | FastJSONResponse:
+        """Run a paginated query for `model`.
+
+        Args:
+            db (Session): The database session of the request.
+            model (type[SQLModel]): The table model being listed.
+            statement (SelectOfScalar | None): An optional statement to paginate. Defaults to `select(model)`.
+            transform (Callable | None): Optional function applied to every row before returning it.
+            response_model (Any): The response model of the route, for example `list[BookRead]`. If given,
+                the rows are returned in a `FastJSONResponse`, skipping the validation and encoding of FastAPI
+                (see `app.serialization`).
+
+        Returns:
+            list | StreamingResponse | FastJSONResponse: The rows of the page, or a streaming NDJSON response
+            if the client asked for one.
+
+        """
+        statement = self.statement(model, statement)
+        if self.stream:
+            return self._stream(db, statement, transform, response_model)
+        if self.limit is None:
+            rows = db.exec(statement).all()
+        else:
+            rows = db.exec(statement.limit(self.limit + 1)).all()
+            if len(rows) > self.limit:
+                rows = rows[: self.limit]
+                last_id = getattr(rows[-1], primary_key_of(model).key)
+                self.response.headers[NEXT_CURSOR_HEADER] = encode_cursor(last_id)
+        rows = [transform(row) for row in rows] if transform else rows
+        if response_model is not None:
+            # FastAPI does not copy the headers of `self.response` into a returned response
+            return FastJSONResponse(rows, response_model, headers=self.response.headers)
+        return rows
+
+    def _stream(
+        self,
+        db: Session,
+        statement: SelectOfScalar,
+        transform: Callable[[Any], Any] | None,
+        response_model: Any = None,
+    ) -> StreamingResponse:
+        if self.limit is not None:
+            statement = statement.limit(self.limit)
+        statement = statement.execution_options(yield_per=settings.stream_batch_size)
+        # The request session may be closed before the body is sent, so the rows
+        # are read with a session of their own bound to the engine of the table.
+        bind = db.get_bind(clause=statement)
+        item_model = get_args(response_model)[0] if get_args(response_model) else None
+
+        def rows() -> Iterator[str | bytes]:
+            with Session(bind) as stream_session:
+                for row in stream_session.exec(statement):
+                    item = transform(row) if transform else row
+                    if item_model is None:
+                        yield _to_json(item) + "\n"
+                    else:
+                        yield dump_json(item, item_model) + b"\n"
+                    stream_session.expunge(row)
+
+        return StreamingResponse(rows(), media_type=NDJSON_MEDIA_TYPE)
+
+
+def get_page(
+    response: Response,
+    limit: Annotated[int | None, Query(ge=1, le=settings.page_size_max)] = None,
+    after_id: int | None = None,
+    cursor: str | None = None,
+    accept: Annotated[str | None, Header()] = None,
+) -> Page:
+    """Build the `Page` of the current request from its query parameters and headers."""
+    if cursor is not None:
+        after_id = decode_cursor(cursor)
+    stream = accept is not None and NDJSON_MEDIA_TYPE in accept
+    return Page(response, limit, after_id, stream=stream)
+
+
+Pagination = Annotated[Page, Depends(get_page)]
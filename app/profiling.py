@@ -0,0 +1,158 @@
+"""On-demand profiling of a single request.
+
+When `Settings.profiling` is enabled, `ProfilerMiddleware` runs every request that carries the
+`X-Profile` header under `cProfile`. The profile covers the whole request: the middlewares, the
+dependencies (for example `calcular_inventario`), the handler, the SQLAlchemy execution and the
+serialization of the response.
+
+Values of the `X-Profile` header:
+- `text`: The response body is replaced by the profile report, sorted by cumulative time.
+- Anything else (for example `1`): The response is returned as usual, and the report is stored in
+  `Settings.profiling_dir` as `<id>.txt` and `<id>.pstats`. The `X-Profile-Report` response header has the id.
+
+The `.pstats` file can be opened with `python -m pstats` or turned into a call tree or a flame graph
+with tools like `snakeviz` or `gprof2dot`.
+
+```
+curl -H "X-Profile: text" -X PUT http://localhost:8000/api/v1/nnieto/alcancia/transaction/deposit/100
+```
+
+Since Python 3.12, `cProfile` sees every thread, so the routes declared with `def` (which run in the thread
+pool) are covered. It also sees the other requests handled at the same time: profile on a quiet server.
+Only one request is profiled at a time, the others run without the profiler.
+"""
+
+import cProfile
+import io
+import pstats
+import re
+import threading
+import time
+import uuid
+from pathlib import Path
+
+from starlette.datastructures import Headers
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from app.config import settings
+from app.log_utils import logger
+
+PROFILE_HEADER = "X-Profile"
+"""Request header that asks for a profile."""
+
+PROFILE_REPORT_HEADER = "X-Profile-Report"
+"""Response header with the id of the stored report."""
+
+REPORT_LIMIT = 60
+"""Number of functions listed in each section of the text report."""
+
+APP_CODE = re.escape(str(Path(__file__).parent))
+"""Restriction of `pstats` that keeps the functions of the `app` package: routes, dependencies, ..."""
+
+
+def profile_report(profile: cProfile.Profile, title: str) -> str:
+    """Render a profile as text, sorted by cumulative time.
+
+    The report has three sections: the slowest functions, the functions of the `app` package
+    (the handler, its dependencies and the project modules), and the callees of the slowest functions.
+    """
+    stream = io.StringIO()
+    stream.write(f"{title}\n\n")
+    stats = pstats.Stats(profile, stream=stream)
+    stats.sort_stats(pstats.SortKey.CUMULATIVE).print_stats(REPORT_LIMIT)
+    stream.write("Application code:\n")
+    stats.print_stats(APP_CODE, REPORT_LIMIT)
+    stats.print_callees(REPORT_LIMIT // 3)
+    return stream.getvalue()
+
+
+def report_id(scope: Scope) -> str:
+    """Return a unique and readable id for the report of a request."""
+    path = re.sub(r"[^\w-]+", "_", scope["path"]).strip("_") or "root"
+    return f"{time.strftime('%Y%m%d-%H%M%S')}-{scope['method']}-{path}-{uuid.uuid4().hex[:8]}"
+
+
+class ProfilerMiddleware:
+    """Profile the requests that carry the `X-Profile` header (see the module documentation).
+
+    Args:
+        app (ASGIApp): The next layer of the stack.
+        directory (str | Path | None): Where to store the reports, `Settings.profiling_dir` by default.
+
+    """
+
+    def __init__(self, app: ASGIApp, directory: str | Path | None = None):
+        self.app = app
+        self.directory = Path(directory or settings.profiling_dir)
+        self.lock = threading.Lock()
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        """Run the request under the profiler if it asks for it."""
+        mode = Headers(scope=scope).get(PROFILE_HEADER) if scope["type"] == "http" else None
+        if mode is None:
+            await self.app(scope, receive, send)
+            return
+        if not self.lock.acquire(blocking=False):
+            logger.warning(f"Ya se está perfilando otra petición, {scope['path']} se ejecuta sin perfilar")
+            await self.app(scope, receive, send)
+            return
+        try:
+            if mode == "text":
+                await self.respond_with_report(scope, receive, send)
+            else:
+                await self.store_report(scope, receive, send)
+        finally:
+            self.lock.release()
+
+    async def run(self, scope: Scope, receive: Receive, send: Send) -> cProfile.Profile:
+        """Run the request under `cProfile` and return the profile."""
+        profile = cProfile.Profile()
+        profile.enable()
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            profile.disable()
+        return profile
+
+    async def respond_with_report(self, scope: Scope, receive: Receive, send: Send):
+        """Run the request and send the profile report instead of its response."""
+        status_code = None
+
+        async def discard(message: Message):
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+
+        start = time.perf_counter()
+        profile = await self.run(scope, receive, discard)
+        title = f"{scope['method']} {scope['path']} -> {status_code} in {time.perf_counter() - start:.4f}s"
+        body = profile_report(profile, title).encode()
+        await send(
+            {
+                "type": "http.response.start",
+                "status": 200,
+                "headers": [
+                    (b"content-type", b"text/plain; charset=utf-8"),
+                    (b"content-length", str(len(body)).encode()),
+                ],
+            },
+        )
+        await send({"type": "http.response.body", "body": body})
+
+    async def store_report(self, scope: Scope, receive: Receive, send: Send):
+        """Run the request and store its profile in `directory`."""
+        name = report_id(scope)
+
+        async def send_with_report_header(message: Message):
+            if message["type"] == "http.response.start":
+                headers = [*message.get("headers", []), (PROFILE_REPORT_HEADER.lower().encode(), name.encode())]
+                message = {**message, "headers": headers}
+            await send(message)
+
+        start = time.perf_counter()
+        profile = await self.run(scope, receive, send_with_report_header)
+        title = f"{scope['method']} {scope['path']} in {time.perf_counter() - start:.4f}s"
+        self.directory.mkdir(parents=True, exist_ok=True)
+        profile.dump_stats(self.directory / f"{name}.pstats")
+        (self.directory / f"{name}.txt").write_text(profile_report(profile, title))
+        logger.info(f"Perfil de {scope['method']} {scope['path']} guardado en {self.directory / name}.txt")
@@ -3,6 +3,7 @@
 Routes:
     - `GET /animales`: Retrieve the list of all registered animals.
     - `POST /animales`: Register a new animal.
+    - `POST /animales/bulk`: Register many animals in one request.
     - `GET /animales/{animal_id}`: Retrieve details of a specific animal.
     - `PUT /animales/{animal_id}`: Update details of a specific animal.
     - `DELETE /animales/{animal_id}`: Delete a specific animal registration.
@@ -10,6 +11,7 @@ Routes:
 Functions:
     - `animals_list`: Retrieve the list of all registered animals.
     - `create_animal`: Register a new animal.
+    - `create_animales`: Register many animals in one request.
     - `get_animal`: Retrieve details of a specific animal.
     - `update_animal`: Update details of a specific animal.
     - `delete_animal`: Delete a specific animal registration.
@@ -24,10 +26,14 @@ Dependencies:
     - `.schemas`: Module containing the response schemas (`AnimalResponse`, `AnimalUpdate`).
 """
 
+from typing import Annotated
+
 from fastapi import APIRouter, HTTPException, status
-from sqlmodel import select
 
-from app.db import DbSession
+from app.bulk import BulkCreated, bulk_body, bulk_insert
+from app.caching import conditional
+from app.db import AsyncDbReadSession, AsyncDbSession, DbReadSession
+from app.pagination import Pagination
 
 from .models import Register
 from .schemas import AnimalCreate, AnimalResponse, AnimalUpdate
@@ -39,9 +45,10 @@ api_router = APIRouter(
 )
 
 
-@api_router.get("/", tags=["Animales"])
+@api_router.get("/", tags=["Animales"], dependencies=[conditional(Register)])
 def animals_list(
-    db: DbSession,
+    db: DbReadSession,
+    page: Pagination,
 ) -> list[Register]:
     """Obtiene la lista de todos los animales registrados.
 
@@ -49,19 +56,20 @@ def animals_list(
     sin aplicar ningún filtro.
 
     Args:
-        db (DbSession): Sesión de base de datos inyectada por FastAPI.
+        db (DbReadSession): Sesión de base de datos inyectada por FastAPI.
+        page (Pagination): Parámetros de paginación (`limit`, `after_id`, `cursor`).
 
     Returns:
         list[Register]: Una lista con todos los registros de animales.
 
     """
-    return db.exec(select(Register)).all()
+    return page.fetch(db, Register)
 
 
 @api_router.post("/", tags=["Animales"], status_code=status.HTTP_201_CREATED)
 async def create_animal(
     animal: AnimalCreate,
-    db: DbSession,
+    db: AsyncDbSession,
 ) -> AnimalResponse:
     """Registra un nuevo animal en la base de datos.
 
@@ -70,7 +78,7 @@ async def create_animal(
 
     Args:
         animal (AnimalCreate): Los detalles del animal a registrar.
-        db (DbSession): Sesión de base de datos inyectada por FastAPI.
+        db (AsyncDbSession): Sesión de base de datos inyectada por FastAPI.
 
     Returns:
         AnimalResponse: La respuesta que contiene los detalles del animal registrado,
@@ -79,15 +87,21 @@ async def create_animal(
     """
     db_animal = Register(**animal.dict())
     db.add(db_animal)
-    db.commit()
-    db.refresh(db_animal)
+    await db.commit()
+    await db.refresh(db_animal)
     return AnimalResponse.from_orm(db_animal)
 
 
-@api_router.get("/{animal_id}", tags=["Animales"])
+@api_router.post("/bulk", tags=["Animales"], status_code=status.HTTP_201_CREATED)
+async def create_animales(animales: Annotated[list[AnimalCreate], bulk_body(AnimalCreate)], db: AsyncDbSession) -> BulkCreated:
+    """Registra varios animales en la base de datos."""
+    return await db.run_sync(bulk_insert, Register, animales)
+
+
+@api_router.get("/{animal_id}", tags=["Animales"], dependencies=[conditional(Register)])
 async def get_animal(
     animal_id: int,
-    db: DbSession,
+    db: AsyncDbReadSession,
 ) -> AnimalResponse:
     """Obtiene los detalles de un animal específico.
 
@@ -96,7 +110,7 @@ async def get_animal(
 
     Args:
         animal_id (int): El ID del animal a consultar.
-        db (DbSession): Sesión de base de datos inyectada por FastAPI.
+        db (AsyncDbReadSession): Sesión de base de datos inyectada por FastAPI.
 
     Returns:
         AnimalResponse: La respuesta que contiene los detalles del animal.
@@ -105,7 +119,7 @@ async def get_animal(
         HTTPException: Si el animal no se encuentra, se lanza un error 404 Not Found.
 
     """
-    animal = db.get(Register, animal_id)
+    animal = await db.get(Register, animal_id)
     if not animal:
         raise HTTPException(status_code=404, detail="Animal not found")
     return AnimalResponse.from_orm(animal)
@@ -115,7 +129,7 @@ async def get_animal(
 async def update_animal(
     animal_id: int,
     animal_update: AnimalUpdate,
-    db: DbSession,
+    db: AsyncDbSession,
 ) -> AnimalResponse:
     """Actualiza los detalles de un animal específico.
 
@@ -125,7 +139,7 @@ async def update_animal(
     Args:
         animal_id (int): El ID del animal a actualizar.
         animal_update (AnimalUpdate): Los datos actualizados del animal.
-        db (DbSession): Sesión de base de datos inyectada por FastAPI.
+        db (AsyncDbSession): Sesión de base de datos inyectada por FastAPI.
 
     Returns:
         AnimalResponse: La respuesta que contiene los detalles actualizados del animal.
@@ -134,7 +148,7 @@ async def update_animal(
         HTTPException: Si el animal no se encuentra, se lanza un error 404 Not Found.
 
     """
-    animal = db.get(Register, animal_id)
+    animal = await db.get(Register, animal_id)
     if not animal:
         raise HTTPException(status_code=404, detail="Animal not found")
 
@@ -142,15 +156,15 @@ async def update_animal(
         setattr(animal, key, value)
 
     db.add(animal)
-    db.commit()
-    db.refresh(animal)
+    await db.commit()
+    await db.refresh(animal)
     return AnimalResponse.from_orm(animal)
 
 
 @api_router.delete("/{animal_id}", tags=["Animales"], status_code=status.HTTP_204_NO_CONTENT)
 async def delete_animal(
     animal_id: int,
-    db: DbSession,
+    db: AsyncDbSession,
 ):
     """Elimina el registro de un animal específico.
 
@@ -159,16 +173,16 @@ async def delete_animal(
 
     Args:
         animal_id (int): El ID del animal a eliminar.
-        db (DbSession): Sesión de base de datos inyectada por FastAPI.
+        db (AsyncDbSession): Sesión de base de datos inyectada por FastAPI.
 
     Raises:
         HTTPException: Si el animal no se encuentra, se lanza un error 404 Not Found.
 
     """
-    animal = db.get(Register, animal_id)
+    animal = await db.get(Register, animal_id)
     if not animal:
         raise HTTPException(status_code=404, detail="Animal not found")
 
-    db.delete(animal)
-    db.commit()
+    await db.delete(animal)
+    await db.commit()
     return {"detail": "Animal eliminado correctamente"}
@@ -25,9 +25,10 @@ Dependencies:
 
 
 from fastapi import APIRouter, HTTPException, status
-from sqlmodel import select
 
-from app.db import DbSession
+from app.caching import conditional
+from app.db import DbReadSession, DbSession
+from app.pagination import Pagination
 
 from .models import Transaction
 from .schemas import Eliminado
@@ -57,27 +58,28 @@ def create_estudiantes(estudiante: Transaction, db: DbSession) -> Transaction:
     return estudiante
 
 
-@api_router.get("/", tags=["Estudiantes"])
-def get_estudiantes(db: DbSession) -> list[Transaction]:
+@api_router.get("/", tags=["Estudiantes"], dependencies=[conditional(Transaction)])
+def get_estudiantes(db: DbReadSession, page: Pagination) -> list[Transaction]:
     """Obtener la lista de todos los estudiantes.
 
     Args:
-        db (DbSession): Sesión de base de datos.
+        db (DbReadSession): Sesión de base de datos.
+        page (Pagination): Parámetros de paginación (`limit`, `after_id`, `cursor`).
 
     Returns:
         list[Transaction]: Lista de estudiantes en la base de datos.
 
     """
-    return db.exec(select(Transaction)).all()
+    return page.fetch(db, Transaction)
 
 
-@api_router.get("/{Estudiante_id}", tags=["Estudiantes"])
-def get_estudiante(Estudiante_id: int, db: DbSession) -> Transaction:
+@api_router.get("/{Estudiante_id}", tags=["Estudiantes"], dependencies=[conditional(Transaction)])
+def get_estudiante(Estudiante_id: int, db: DbReadSession) -> Transaction:
     """Obtener un estudiante por su ID.
 
     Args:
         Estudiante_id (int): ID del estudiante.
-        db (DbSession): Sesión de base de datos.
+        db (DbReadSession): Sesión de base de datos.
 
     Returns:
         Transaction: El estudiante correspondiente al ID.
@@ -2,6 +2,7 @@
 
 Routes:
     - POST /productos: Create a new product.
+    - POST /productos/bulk: Create many products in one request.
     - GET /productos: Retrieve the list of all products.
     - GET /productos/{producto_id}: Retrieve a product by its ID.
     - PUT /productos/{producto_id}: Update an existing product.
@@ -9,6 +10,7 @@ Routes:
 
 Functions:
     - create_producto: Create a new product.
+    - create_productos: Create many products in one request.
     - get_productos: Retrieve the list of all products.
     - get_producto: Retrieve a product by its ID.
     - update_producto: Update an existing product.
@@ -23,10 +25,14 @@ Dependencies:
     - .models: Module containing the Producto model.
 """
 
+from typing import Annotated
+
 from fastapi import APIRouter, HTTPException, status
-from sqlmodel import select
 
-from app.db import DbSession
+from app.bulk import BulkCreated, bulk_body, bulk_insert
+from app.caching import conditional
+from app.db import DbReadSession, DbSession
+from app.pagination import Pagination
 from app.proyectos.dramos.schemas import ProductoBase, ProductoCreate, ProductoRead  # noqa: F401
 
 from .models import Producto
@@ -56,27 +62,34 @@ def create_producto(producto: Producto, db: DbSession) -> Producto:
     return producto
 
 
-@api_router.get("/", tags=["Productos"])
-def get_productos(db: DbSession) -> list[Producto]: # type: ignore
+@api_router.post("/bulk", tags=["Productos"], status_code=status.HTTP_201_CREATED)
+def create_productos(productos: Annotated[list[Producto], bulk_body(Producto)], db: DbSession) -> BulkCreated:
+    """Crear varios productos nuevos en la base de datos."""
+    return bulk_insert(db, Producto, productos)
+
+
+@api_router.get("/", tags=["Productos"], dependencies=[conditional(Producto)])
+def get_productos(db: DbReadSession, page: Pagination) -> list[Producto]: # type: ignore
     """Obtener la lista de todos los productos.
 
     Args:
-        db (DbSession): Sesión de base de datos.
+        db (DbReadSession): Sesión de base de datos.
+        page (Pagination): Parámetros de paginación (`limit`, `after_id`, `cursor`).
 
     Returns:
         list[Producto]: Lista de productos en la base de datos.
 
     """
-    return db.exec(select(Producto)).all()
+    return page.fetch(db, Producto, response_model=list[Producto])
 
 
-@api_router.get("/{producto_id}", tags=["Productos"])
-def get_producto(producto_id: int, db: DbSession) -> Producto: # type: ignore
+@api_router.get("/{producto_id}", tags=["Productos"], dependencies=[conditional(Producto)])
+def get_producto(producto_id: int, db: DbReadSession) -> Producto: # type: ignore
     """Obtener un producto por su ID.
 
     Args:
         producto_id (int): ID del producto.
-        db (DbSession): Sesión de base de datos.
+        db (DbReadSession): Sesión de base de datos.
 
     Returns:
         Producto: El producto correspondiente al ID.
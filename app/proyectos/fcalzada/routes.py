@@ -6,21 +6,24 @@ from fastapi import APIRouter, Depends, HTTPException, status
 from sqlalchemy import func
 from sqlmodel import select
 
-from app.db import DbSession
+from app.caching import cached_aggregate, conditional
+from app.db import AsyncDbSession, DbReadSession
+from app.pagination import Pagination
 
 from .models import Car
 from .schemas import CarroCreate, CarroResponse, CarroResult
 
 
-async def calcular_inventario(db: DbSession) -> int:
+@cached_aggregate(Car)
+async def calcular_inventario(db: AsyncDbSession) -> int:
     """Calcula el inventario total sumando las cantidades de todos los registros de carros en la base de datos."""
-    result = db.exec(select(func.coalesce(func.sum(Car.quantity), 0)))
+    result = await db.exec(select(func.coalesce(func.sum(Car.quantity), 0)))
     return result.one_or_none()
 """Esta función realiza una consulta a la base de datos utilizando SQLAlchemy para obtener la suma total de la 
     cantidad de carros en el inventario, devolviendo el valor como un entero.
     
     Args:
-        db (DbSession): La sesión de base de datos para realizar la consulta.
+        db (AsyncDbSession): La sesión de base de datos para realizar la consulta.
     
     Returns:
         int: El total de carros en el inventario.
@@ -34,15 +37,15 @@ api_router = APIRouter(
 
 ##########################################################
 ##########################################################
-@api_router.get("/carros", tags=["Registro de Carros"])
-def listar_carros(db: DbSession) -> list[Car]:
+@api_router.get("/carros", tags=["Registro de Carros"], dependencies=[conditional(Car)])
+def listar_carros(db: DbReadSession, page: Pagination) -> list[Car]:
     """Recupera la lista de todos los registros de carros en **Registro de Carros**."""
-    return db.exec(select(Car)).all()
+    return page.fetch(db, Car)
 
 """Este endpoint obtiene todos los carros registrados en el sistema y los devuelve como una lista de objetos `Car`.
 
     Args:
-        db (DbSession): La sesión de base de datos para realizar la consulta.
+        db (DbReadSession): La sesión de base de datos para realizar la consulta.
     
     Returns:
         list[Car]: Una lista con todos los carros registrados.
@@ -55,7 +58,7 @@ def listar_carros(db: DbSession) -> list[Car]:
 async def registrar_carro(
     tipo:str,
     request:CarroCreate,
-    db: DbSession,
+    db: AsyncDbSession,
     inventario: Annotated[int, Depends(calcular_inventario)],
 ) -> CarroResponse:
     """Crea un nuevo registro de carro (`entrada` o `salida`) en **Registro de Carros**.
@@ -66,7 +69,7 @@ async def registrar_carro(
     Args:
         tipo (str): El tipo de operación, "entrada" para agregar un carro o "salida" para eliminar uno.
         request (CarroCreate): Datos del carro a registrar, incluyendo marca, modelo, año, y color.
-        db (DbSession): La sesión de base de datos para realizar la operación.
+        db (AsyncDbSession): La sesión de base de datos para realizar la operación.
         inventario (int): El inventario actual, obtenido a través de la dependencia `calcular_inventario`.
     
     Returns:
@@ -92,7 +95,7 @@ async def registrar_carro(
     # Operación: +1 para entrada, -1 para salida
     op = 1 if tipo == "entrada" else -1
     db.add(Car(quantity=cantidad * op, marca=request.marca, modelo=request.modelo, año=request.año, color=request.color))  # Se añade 'color' aquí
-    db.commit()
+    await db.commit()
 
     nuevo_inventario = await calcular_inventario(db)
 
@@ -106,7 +109,7 @@ async def registrar_carro(
 ###################################################################################
 ###################################################################################
 @api_router.put("/actualizar/{id}", tags=["Registro de Carros"], status_code=status.HTTP_200_OK)
-async def actualizar_carro(id: int, marca: str, modelo: str, año: int, color: str, db: DbSession) -> CarroResponse:  # noqa: A002
+async def actualizar_carro(id: int, marca: str, modelo: str, año: int, color: str, db: AsyncDbSession) -> CarroResponse:  # noqa: A002
     """Actualiza un carro existente por ID.
 
     Este endpoint permite actualizar un carro registrado en el sistema, cambiando sus atributos como marca, modelo, año y color.
@@ -117,7 +120,7 @@ async def actualizar_carro(id: int, marca: str, modelo: str, año: int, color: s
         modelo (str): El nuevo modelo del carro.
         año (int): El nuevo año del carro.
         color (str): El nuevo color del carro.
-        db (DbSession): La sesión de base de datos para realizar la operación.
+        db (AsyncDbSession): La sesión de base de datos para realizar la operación.
 
     Returns:
         CarroResponse: Respuesta con el estado de la operación y el inventario actualizado.
@@ -126,7 +129,7 @@ async def actualizar_carro(id: int, marca: str, modelo: str, año: int, color: s
         HTTPException: Si no se encuentra el carro con el ID proporcionado.
     
     """
-    carro = db.get(Car, id)
+    carro = await db.get(Car, id)
 
     if not carro:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=f"No se encontró el carro con ID {id}")
@@ -138,7 +141,7 @@ async def actualizar_carro(id: int, marca: str, modelo: str, año: int, color: s
     carro.color = color
 
     db.add(carro)
-    db.commit()
+    await db.commit()
 
     nuevo_inventario = await calcular_inventario(db)
 
@@ -146,24 +149,24 @@ async def actualizar_carro(id: int, marca: str, modelo: str, año: int, color: s
 
 
 @api_router.delete("/eliminar/{id}", tags=["Registro de Carros"], status_code=status.HTTP_200_OK)
-async def eliminar_carro(id: int, db: DbSession) -> dict:  # noqa: A002
+async def eliminar_carro(id: int, db: AsyncDbSession) -> dict:  # noqa: A002
     """Elimina un carro por ID.
 
     Este endpoint elimina un carro registrado en el sistema por su ID.
 
     Args: id (int): El ID del carro que se desea eliminar.
-        db (DbSession): La sesión de base de datos para realizar la operación.
+        db (AsyncDbSession): La sesión de base de datos para realizar la operación.
 
     Returns: dict: Un mensaje indicando que el carro fue eliminado exitosamente.
     
     Raises: HTTPException: Si no se encuentra el carro con el ID proporcionado.
     """
-    carro = db.get(Car, id)
+    carro = await db.get(Car, id)
 
     if not carro:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=f"No se encontró el carro con ID {id}")
 
-    db.delete(carro)
-    db.commit()
+    await db.delete(carro)
+    await db.commit()
 
     return {"message": f"Carro con ID {id} eliminado exitosamente"}
@@ -2,6 +2,7 @@
 
 Rutas:
     - `POST /eventos`: Crear un nuevo evento.
+    - `POST /eventos/bulk`: Crear muchos eventos en una sola petición.
     - `GET /eventos`: Obtener la lista de todos los eventos.
     - `GET /eventos/{event_id}`: Obtener un evento específico por su ID.
     - `PUT /eventos/{event_id}`: Actualizar un evento existente.
@@ -9,6 +10,7 @@ Rutas:
 
 Funciones:
     - `create_event`: Crear un nuevo evento en la base de datos.
+    - `create_events`: Crear muchos eventos en una sola transacción.
     - `get_events`: Obtener todos los eventos almacenados.
     - `get_event`: Obtener un evento específico por su ID.
     - `update_event`: Actualizar los datos de un evento.
@@ -22,10 +24,14 @@ Dependencias:
     - `.schemas`: Módulo que contiene los esquemas de respuesta (`EventCreate`, `EventRead`).
 """
 
+from typing import Annotated
+
 from fastapi import APIRouter, HTTPException, status
-from sqlmodel import select
 
-from app.db import DbSession
+from app.bulk import BulkCreated, bulk_body, bulk_insert
+from app.caching import conditional
+from app.db import DbReadSession, DbSession
+from app.pagination import Pagination
 
 from .models import Event
 from .schemas import EventCreate, EventRead
@@ -55,8 +61,13 @@ def create_event(event: EventCreate, db: DbSession) -> Event:
     db.refresh(db_event)
     return db_event
 
-@api_router.get("/", response_model=list[EventRead])
-def get_events(db: DbSession) -> list[Event]:
+@api_router.post("/bulk", status_code=status.HTTP_201_CREATED)
+def create_events(eventos: Annotated[list[EventCreate], bulk_body(EventCreate)], db: DbSession) -> BulkCreated:
+    """Crear varios eventos nuevos en la base de datos."""
+    return bulk_insert(db, Event, eventos)
+
+@api_router.get("/", response_model=list[EventRead], dependencies=[conditional(Event)])
+def get_events(db: DbReadSession, page: Pagination) -> list[Event]:
     """Obtener la lista de todos los eventos.
 
     Esta ruta devuelve todos los eventos almacenados en la base de datos.
@@ -65,10 +76,10 @@ def get_events(db: DbSession) -> list[Event]:
     - **Salida**:
         - `list[EventRead]`: Lista de eventos.
     """
-    return db.exec(select(Event)).all()
+    return page.fetch(db, Event, response_model=list[EventRead])
 
-@api_router.get("/{event_id}", response_model=EventRead)
-def get_event(event_id: int, db: DbSession) -> Event:
+@api_router.get("/{event_id}", response_model=EventRead, dependencies=[conditional(Event)])
+def get_event(event_id: int, db: DbReadSession) -> Event:
     """Obtener un evento por su ID.
 
     Esta ruta permite obtener un evento específico por su identificador único.
@@ -0,0 +1,15 @@
+"""Index the full name of the clients, used by the search, update and delete routes."""
+
+from app.migrations import create_index
+
+online = True
+
+
+def upgrade(connection):
+    """Create `ix_hotel_operacion_full_name`."""
+    create_index(
+        connection,
+        "ix_hotel_operacion_full_name",
+        "hotel_operacion",
+        ["first_name", "middle_name", "last_name"],
+    )
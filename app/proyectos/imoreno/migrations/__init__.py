@@ -0,0 +1 @@
+"""Migraciones del esquema de **Hotel**, ver `app.migrations`."""
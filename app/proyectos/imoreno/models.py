@@ -2,7 +2,7 @@
 from datetime import UTC, datetime
 
 from pydantic import EmailStr
-from sqlmodel import Field, SQLModel
+from sqlmodel import Field, Index, SQLModel
 
 
 def now_utc():
@@ -19,6 +19,8 @@ class Operation(SQLModel, table=True):
     """Model to register operations in the database."""
 
     __tablename__ = "hotel_operacion"
+    # Clients are searched by their full name (see `routes.search_client_by_name`)
+    __table_args__ = (Index("ix_hotel_operacion_full_name", "first_name", "middle_name", "last_name"),)
     client_id: int | None = Field(default=None, primary_key=True, nullable=True)
     first_name: str = Field(title="First Name", nullable=False)
     middle_name: str = Field(title="Middle Name", nullable=False)
@@ -8,7 +8,9 @@ from fastapi import APIRouter, HTTPException
 from sqlalchemy import func
 from sqlmodel import select
 
-from app.db import DbSession
+from app.caching import cached_aggregate, conditional
+from app.db import AsyncDbReadSession, AsyncDbSession, DbReadSession, DbSession
+from app.pagination import Pagination
 
 from .models import Operation
 from .schemas import ClientUpdate, OperationResponse, OperationResult, OperationType
@@ -19,22 +21,23 @@ api_router = APIRouter(
     responses={404: {"description": "Not found"}},
 )
 
-async def getTotalClients(db: DbSession) -> int:
+@cached_aggregate(Operation)
+async def getTotalClients(db: AsyncDbSession) -> int:
     """Compute the total clients by counting the clients in the database.
     
     Args:
-        db (Session): The database session used to execute the query.
+        db (AsyncDbSession): The database session used to execute the query.
 
     Returns:
     int: The total clients computed from the count of all clients. 
     Returns 0 if there are no clients.
 
     """
-    result = db.exec(select(func.coalesce(func.count(Operation.client_id), 0)))
+    result = await db.exec(select(func.coalesce(func.count(Operation.client_id), 0)))
     return result.one_or_none()
 
 async def search_client_by_name(
-        db: DbSession,
+        db: AsyncDbSession,
         first_name: str | None = None,
         middle_name: str | None = None,
         last_name: str | None = None,
@@ -42,7 +45,7 @@ async def search_client_by_name(
     """Search for a client in the database by their full name.
 
     Args:
-        db (Session): The database session used to execute the query.
+        db (AsyncDbSession): The database session used to execute the query.
         first_name (str): The first name of the client.
         middle_name (str): The middle name of the client.
         last_name (str): The last name of the client.
@@ -60,18 +63,19 @@ async def search_client_by_name(
         conditions.append(Operation.last_name == last_name)
     
     statement = select(Operation).where(*conditions)
-    return db.exec(statement).first()
+    return (await db.exec(statement)).first()
 
-@api_router.get("/operations", tags=["hotel"])
+@api_router.get("/operations", tags=["hotel"], dependencies=[conditional(Operation)])
 def operations_list(
-    db: DbSession,
+    db: DbReadSession,
+    page: Pagination,
 ) -> list[Operation]:
     """Retrieve the list of all operations in **HotelOperations**.
 
     This endpoint returns all operations recorded in the hotel application.
     - **Returns**: `list[Operation]`: A list of all operations in the database.
     """
-    return db.exec(select(Operation)).all()
+    return page.fetch(db, Operation)
 
 @api_router.post("/operations/{opType}", status_code=201)
 def add_client(client_update: ClientUpdate, db: DbSession, opType: OperationType):
@@ -100,12 +104,12 @@ def add_client(client_update: ClientUpdate, db: DbSession, opType: OperationType
     )
 
 @api_router.put("/operations/{opType}", status_code=200)
-async def update_client(client_update: ClientUpdate, db: DbSession, opType: OperationType) -> OperationResponse:
+async def update_client(client_update: ClientUpdate, db: AsyncDbSession, opType: OperationType) -> OperationResponse:
     """Update a client's information in the hotel database by searching for their name.
 
     Args:
         client_update (ClientUpdate): The new data for the client.
-        db (DbSession): The database session used to execute the query.
+        db (AsyncDbSession): The database session used to execute the query.
         opType (OperationType): The type of operation to perform.
 
     Returns:
@@ -134,8 +138,8 @@ async def update_client(client_update: ClientUpdate, db: DbSession, opType: Oper
         setattr(client, key, value)
     
     db.add(client)
-    db.commit()
-    db.refresh(client)
+    await db.commit()
+    await db.refresh(client)
 
     return OperationResponse(
         result = OperationResult.success if client else OperationResult.failed,
@@ -145,7 +149,7 @@ async def update_client(client_update: ClientUpdate, db: DbSession, opType: Oper
 
 @api_router.delete("/operations/{opType}", status_code=200)
 async def delete_client(opType: OperationType,
-    db: DbSession,
+    db: AsyncDbSession,
     first_name: str | None = None,
     middle_name: str | None = None,
     last_name: str | None = None,
@@ -154,7 +158,7 @@ async def delete_client(opType: OperationType,
 
     Args:
         opType (OperationType): The type of operation to perform.
-        db (DbSession): The database session used to execute the query.
+        db (AsyncDbSession): The database session used to execute the query.
         first_name (str, optional): The client's first name. Defaults to None.
         middle_name (str, optional): The client's middle name. Defaults to None.
         last_name (str, optional): The client's last name. Defaults to None
@@ -175,8 +179,8 @@ async def delete_client(opType: OperationType,
     )
     if not client:
         raise HTTPException(status_code=404, detail="Client not found")
-    db.delete(client)
-    db.commit()
+    await db.delete(client)
+    await db.commit()
 
     return OperationResponse(
         result=OperationResult.success if client else OperationResult.failed,
@@ -184,10 +188,10 @@ async def delete_client(opType: OperationType,
         data=None,
     )
 
-@api_router.get("/operations/{opType}", status_code=200)
+@api_router.get("/operations/{opType}", status_code=200, dependencies=[conditional(Operation)])
 async def search_client(
     opType: OperationType,
-    db: DbSession,
+    db: AsyncDbReadSession,
     first_name: str | None = None,
     middle_name: str | None = None,
     last_name: str | None = None,
@@ -199,7 +203,7 @@ async def search_client(
         first_name (str, optional): The client's first name. Defaults to None.
         middle_name (str, optional): The client's middle name. Defaults to None.
         last_name (str, optional): The client's last name. Defaults to None.
-        db (DbSession): The database session used to execute the query.
+        db (AsyncDbReadSession): The database session used to execute the query.
 
     Returns:
         OperationResponse: The result of the search operation.
@@ -2,6 +2,7 @@
 
 Routes:
     - `POST /cursos`: Create a new course.
+    - `POST /cursos/bulk`: Create many courses in one request.
     - `GET /cursos`: Retrieve the list of all courses.
     - `GET /cursos/{curso_id}`: Retrieve a course by its ID.
     - `PUT /cursos/{curso_id}`: Update an existing course.
@@ -9,6 +10,7 @@ Routes:
 
 Functions:
     - `create_curso`: Create a new course.
+    - `create_cursos`: Create many courses in one request.
     - `get_cursos`: Retrieve the list of all courses.
     - `get_curso`: Retrieve a course by its ID.
     - `update_curso`: Update an existing course.
@@ -24,10 +26,14 @@ Dependencies:
     - `.schemas`: Module containing the response schemas (`CourseResponse`, `CourseUpdate`).
 """
 
+from typing import Annotated
+
 from fastapi import APIRouter, HTTPException, status
-from sqlmodel import select
 
-from app.db import DbSession
+from app.bulk import BulkCreated, bulk_body, bulk_insert
+from app.caching import conditional
+from app.db import AsyncDbReadSession, AsyncDbSession, DbReadSession
+from app.pagination import Pagination
 
 from .models import Register
 from .schemas import CourseCreate, CourseResponse, CourseUpdate
@@ -39,23 +45,28 @@ api_router = APIRouter(
 )
 
 @api_router.post("/", tags=["Cursos"], status_code=status.HTTP_201_CREATED)
-async def create_curso(curso: CourseCreate, db: DbSession) -> CourseResponse:
+async def create_curso(curso: CourseCreate, db: AsyncDbSession) -> CourseResponse:
     """Crear un nuevo curso en la base de datos."""
     new_curso = Register(**curso.dict())
     db.add(new_curso)
-    db.commit()
-    db.refresh(new_curso)
+    await db.commit()
+    await db.refresh(new_curso)
     return CourseResponse.from_orm(new_curso)
 
-@api_router.get("/", tags=["Cursos"])
-def get_cursos(db: DbSession) -> list[Register]:
+@api_router.post("/bulk", tags=["Cursos"], status_code=status.HTTP_201_CREATED)
+async def create_cursos(cursos: Annotated[list[CourseCreate], bulk_body(CourseCreate)], db: AsyncDbSession) -> BulkCreated:
+    """Crear varios cursos nuevos en la base de datos."""
+    return await db.run_sync(bulk_insert, Register, cursos)
+
+@api_router.get("/", tags=["Cursos"], dependencies=[conditional(Register)])
+def get_cursos(db: DbReadSession, page: Pagination) -> list[Register]:
     """Obtener la lista de todos los cursos."""
-    return db.exec(select(Register)).all()
+    return page.fetch(db, Register)
 
-@api_router.get("/{curso_id}", tags=["Cursos"])
-async def get_curso(curso_id: int, db: DbSession) -> CourseResponse:
+@api_router.get("/{curso_id}", tags=["Cursos"], dependencies=[conditional(Register)])
+async def get_curso(curso_id: int, db: AsyncDbReadSession) -> CourseResponse:
     """Obtener un curso por su ID."""
-    curso = db.get(Register, curso_id)
+    curso = await db.get(Register, curso_id)
     if not curso:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -64,9 +75,9 @@ async def get_curso(curso_id: int, db: DbSession) -> CourseResponse:
     return CourseResponse.from_orm(curso)
 
 @api_router.put("/{curso_id}", tags=["Cursos"])
-async def update_curso(curso_id: int, curso_update: CourseUpdate, db: DbSession) -> CourseResponse:
+async def update_curso(curso_id: int, curso_update: CourseUpdate, db: AsyncDbSession) -> CourseResponse:
     """Actualizar un curso existente."""
-    curso = db.get(Register, curso_id)
+    curso = await db.get(Register, curso_id)
     if not curso:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -75,19 +86,19 @@ async def update_curso(curso_id: int, curso_update: CourseUpdate, db: DbSession)
     for key, value in curso_update.dict(exclude_unset=True).items():
         setattr(curso, key, value)
     db.add(curso)
-    db.commit()
-    db.refresh(curso)
+    await db.commit()
+    await db.refresh(curso)
     return CourseResponse.from_orm(curso)
 
 @api_router.delete("/{curso_id}", tags=["Cursos"], status_code=status.HTTP_204_NO_CONTENT)
-async def delete_curso(curso_id: int, db: DbSession):
+async def delete_curso(curso_id: int, db: AsyncDbSession):
     """Eliminar un curso por su ID."""
-    curso = db.get(Register, curso_id)
+    curso = await db.get(Register, curso_id)
     if not curso:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Curso no encontrado",
         )
-    db.delete(curso)
-    db.commit()
+    await db.delete(curso)
+    await db.commit()
     return {"detail": "Curso eliminado con éxito."}
\ No newline at end of file
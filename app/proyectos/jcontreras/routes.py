@@ -2,6 +2,7 @@
 
 Routes:
     - POST /ventas: Create a new sale.
+    - POST /ventas/bulk: Create many sales in one request.
     - GET /ventas: Retrieve the list of all sales.
     - GET /ventas/{venta_id}: Retrieve a sale by its ID.
     - PUT /ventas/{venta_id}: Update an existing sale.
@@ -9,6 +10,7 @@ Routes:
 
 Functions:
     - create_venta: Create a new sale.
+    - create_ventas: Create many sales in one request.
     - get_ventas: Retrieve the list of all sales.
     - get_venta: Retrieve a sale by its ID.
     - update_venta: Update an existing sale.
@@ -24,10 +26,15 @@ Dependencies:
 """
 
 
+from typing import Annotated
+
 from fastapi import APIRouter, HTTPException, status
 from sqlmodel import select
 
-from app.db import DbSession
+from app.bulk import BulkCreated, bulk_body, bulk_insert
+from app.caching import conditional
+from app.db import DbReadSession, DbSession
+from app.pagination import Pagination
 
 from .models import Sale
 from .schemas import SaleCreate
@@ -50,13 +57,18 @@ def create_venta(venta: SaleCreate, db: DbSession) -> Sale:
     db.refresh(new_venta)
     return new_venta
 
-@api_router.get("/")
-def get_ventas(db: DbSession) -> list[Sale]:
+@api_router.post("/bulk", status_code=status.HTTP_201_CREATED)
+def create_ventas(ventas: Annotated[list[SaleCreate], bulk_body(SaleCreate)], db: DbSession) -> BulkCreated:
+    """Crear muchas ventas nuevas en la base de datos."""
+    return bulk_insert(db, Sale, ventas)
+
+@api_router.get("/", dependencies=[conditional(Sale)])
+def get_ventas(db: DbReadSession, page: Pagination) -> list[Sale]:
     """Obtener la lista de todas las ventas."""
-    return db.exec(select(Sale)).all()
+    return page.fetch(db, Sale)
 
-@api_router.get("/{venta_id}")
-def get_venta(venta_id: int, db: DbSession) -> Sale:
+@api_router.get("/{venta_id}", dependencies=[conditional(Sale)])
+def get_venta(venta_id: int, db: DbReadSession) -> Sale:
     """Obtener una venta por su ID."""
     new_venta = db.exec(select(Sale).where(Sale.id == venta_id)).first()
     if not new_venta:
@@ -6,8 +6,9 @@ from fastapi import APIRouter, Depends, HTTPException, status
 from sqlalchemy import func
 from sqlmodel import select
 
-# Assuming DbSession is correctly typed Session from app.db
-from app.db import DbSession
+from app.caching import cached_aggregate, conditional
+from app.db import AsyncDbReadSession, AsyncDbSession, DbReadSession
+from app.pagination import Pagination
 
 from .models import City
 from .schemas import (
@@ -20,17 +21,18 @@ from .schemas import (
 )
 
 
-async def calcular_poblacion_total(db: DbSession) -> int:
+@cached_aggregate(City)
+async def calcular_poblacion_total(db: AsyncDbSession) -> int:
     """Calcula la población total sumando las poblaciones de todas las ciudades registradas.
 
     Args:
-        db (DbSession): Sesión de la base de datos.
+        db (AsyncDbSession): Sesión de la base de datos.
 
     Returns:
         int: La población total calculada.
 
     """
-    population_sum = db.query(func.sum(City.population)).scalar()  # Obtener directamente el valor entero
+    population_sum = (await db.exec(select(func.sum(City.population)))).one()  # Obtener directamente el valor entero
     return population_sum if population_sum is not None else 0  # Retornar 0 si es None
 
 
@@ -41,18 +43,19 @@ api_router = APIRouter(
 )
 
 
-@api_router.get("/ciudades", tags=["Registro de Ciudades"])
-def listar_ciudades(db: DbSession) -> list[City]:
+@api_router.get("/ciudades", tags=["Registro de Ciudades"], dependencies=[conditional(City)])
+def listar_ciudades(db: DbReadSession, page: Pagination) -> list[City]:
     """Retorna una lista de todas las ciudades registradas en el sistema.
 
     Args:
-        db (DbSession): Sesión de la base de datos.
+        db (DbReadSession): Sesión de la base de datos.
+        page (Pagination): Parámetros de paginación (`limit`, `after_id`, `cursor`).
 
     Returns:
         list[City]: Lista de objetos City registrados.
 
     """
-    return db.exec(select(City)).all()
+    return page.fetch(db, City)
 
 
 @api_router.post(
@@ -63,7 +66,7 @@ def listar_ciudades(db: DbSession) -> list[City]:
 async def registrar_ciudad(
     tipo: CityType,
     request: CityCreate,
-    db: DbSession,
+    db: AsyncDbSession,
     poblacion_total: Annotated[int, Depends(calcular_poblacion_total)],
 ) -> CityResponse:
     """Crea un nuevo registro de ciudad, ya sea de 'entrada' o 'salida'.
@@ -71,7 +74,7 @@ async def registrar_ciudad(
     Args:
         tipo (CityType): Tipo de registro ('entrada' o 'salida').
         request (CityCreate): Datos de la ciudad a registrar.
-        db (DbSession): Sesión de la base de datos.
+        db (AsyncDbSession): Sesión de la base de datos.
         poblacion_total (int): Población total calculada.
 
     Returns:
@@ -99,8 +102,8 @@ async def registrar_ciudad(
         region=request.region,
     )
     db.add(nueva_ciudad)
-    db.commit()
-    db.refresh(nueva_ciudad)
+    await db.commit()
+    await db.refresh(nueva_ciudad)
 
     nueva_poblacion_total = await calcular_poblacion_total(db)
 
@@ -118,13 +121,13 @@ async def registrar_ciudad(
 )
 async def crear_ciudad(
     request: CityCreate,
-    db: DbSession,
+    db: AsyncDbSession,
 ) -> dict:
     """Crea una nueva ciudad en la base de datos.
 
     Args:
         request (CityCreate): Datos de la ciudad a crear.
-        db (DbSession): Sesión de la base de datos.
+        db (AsyncDbSession): Sesión de la base de datos.
 
     Returns:
         dict: Datos de la ciudad creada.
@@ -149,8 +152,8 @@ async def crear_ciudad(
         region=request.region,
     )
     db.add(nueva_ciudad)
-    db.commit()
-    db.refresh(nueva_ciudad)
+    await db.commit()
+    await db.refresh(nueva_ciudad)
 
     return {
         "id": nueva_ciudad.id,
@@ -169,20 +172,20 @@ async def crear_ciudad(
 async def actualizar_ciudad(
     city_id: int,
     request: CityUpdate,
-    db: DbSession,
+    db: AsyncDbSession,
 ) -> dict:
     """Actualiza los datos de una ciudad existente por su ID.
 
     Args:
         city_id (int): Identificador de la ciudad a actualizar.
         request (CityUpdate): Datos actualizados de la ciudad.
-        db (DbSession): Sesión de la base de datos.
+        db (AsyncDbSession): Sesión de la base de datos.
 
     Returns:
         dict: Datos de la ciudad actualizada.
 
     """
-    ciudad = db.get(City, city_id)
+    ciudad = await db.get(City, city_id)
     if not ciudad:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -194,8 +197,8 @@ async def actualizar_ciudad(
         setattr(ciudad, key, value)
 
     db.add(ciudad)
-    db.commit()
-    db.refresh(ciudad)
+    await db.commit()
+    await db.refresh(ciudad)
 
     return {
         "id": ciudad.id,
@@ -211,22 +214,23 @@ async def actualizar_ciudad(
     "/ciudades/{city_id}",
     tags=["Registro de Ciudades"],
     status_code=status.HTTP_200_OK,
+    dependencies=[conditional(City)],
 )
 async def obtener_ciudad(
     city_id: int,
-    db: DbSession,
+    db: AsyncDbReadSession,
 ) -> dict:
     """Obtiene los datos de una ciudad específica por su identificador.
 
     Args:
         city_id (int): Identificador de la ciudad.
-        db (DbSession): Sesión de la base de datos.
+        db (AsyncDbReadSession): Sesión de la base de datos.
 
     Returns:
         dict: Datos de la ciudad encontrada.
 
     """
-    ciudad = db.get(City, city_id)
+    ciudad = await db.get(City, city_id)
     if not ciudad:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -249,27 +253,27 @@ async def obtener_ciudad(
 )
 async def eliminar_ciudad(
     city_id: int,
-    db: DbSession,
+    db: AsyncDbSession,
 ) -> DeleteResponse:
     """Elimina una ciudad de la base de datos a partir de su identificador.
 
     Args:
         city_id (int): Identificador de la ciudad a eliminar.
-        db (DbSession): Sesión de la base de datos.
+        db (AsyncDbSession): Sesión de la base de datos.
 
     Returns:
         DeleteResponse: Mensaje de confirmación de eliminación.
 
     """
-    ciudad = db.get(City, city_id)
+    ciudad = await db.get(City, city_id)
     if not ciudad:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail=f"No se encontró la ciudad con identificador {city_id}",
         )
 
-    db.delete(ciudad)
-    db.commit()
+    await db.delete(ciudad)
+    await db.commit()
 
     return DeleteResponse(
         message=f"La ciudad con ID {city_id} ha sido eliminada exitosamente.",
@@ -2,6 +2,7 @@
 
 Routes:
     - `POST /libros`: Create a new book.
+    - `POST /libros/bulk`: Create many books in one request.
     - `GET /libros`: Retrieve the list of all books.
     - `GET /libros/{libro_id}`: Retrieve a book by its ID.
     - `PUT /libros/{libro_id}`: Update an existing book.
@@ -9,6 +10,7 @@ Routes:
 
 Functions:
     - `create_libro`: Create a new book.
+    - `create_libros`: Create many books in one request.
     - `get_libros`: Retrieve the list of all books.
     - `get_libro`: Retrieve a book by its ID.
     - `update_libro`: Update an existing book.
@@ -23,10 +25,14 @@ Dependencies:
     - `.models`: Module containing the Book model.
 """
 
+from typing import Annotated
+
 from fastapi import APIRouter, HTTPException, status
-from sqlmodel import select
 
-from app.db import DbSession
+from app.bulk import BulkCreated, bulk_body, bulk_insert
+from app.caching import conditional
+from app.db import DbReadSession, DbSession
+from app.pagination import Pagination
 
 from .models import Book
 from .schemas import BookCreate, BookRead
@@ -61,27 +67,34 @@ def create_libro(libro: BookCreate, db: DbSession) -> BookRead:
     return new_libro
 
 
-@api_router.get("/", tags=["Libros"])
-def get_libros(db: DbSession) -> list[BookRead]:
+@api_router.post("/bulk", tags=["Libros"], status_code=status.HTTP_201_CREATED)
+def create_libros(libros: Annotated[list[BookCreate], bulk_body(BookCreate)], db: DbSession) -> BulkCreated:
+    """Crear varios libros nuevos en la base de datos."""
+    return bulk_insert(db, Book, libros)
+
+
+@api_router.get("/", tags=["Libros"], dependencies=[conditional(Book)])
+def get_libros(db: DbReadSession, page: Pagination) -> list[BookRead]:
     """Obtener la lista de todos los libros.
 
     Args:
-        db (DbSession): Sesión de base de datos.
+        db (DbReadSession): Sesión de base de datos.
+        page (Pagination): Parámetros de paginación (`limit`, `after_id`, `cursor`).
 
     Returns:
         list[BookRead]: Lista de libros en la base de datos.
 
     """
-    return db.exec(select(Book)).all()
+    return page.fetch(db, Book, response_model=list[BookRead])
 
 
-@api_router.get("/{libro_id}", tags=["Libros"])
-def get_libro(libro_id: int, db: DbSession) -> BookRead:
+@api_router.get("/{libro_id}", tags=["Libros"], dependencies=[conditional(Book)])
+def get_libro(libro_id: int, db: DbReadSession) -> BookRead:
     """Obtener un libro por su ID.
 
     Args:
         libro_id (int): ID del libro.
-        db (DbSession): Sesión de base de datos.
+        db (DbReadSession): Sesión de base de datos.
 
     Returns:
         BookRead: El libro correspondiente al ID.
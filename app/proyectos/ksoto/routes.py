@@ -22,10 +22,12 @@ Dependencias:
     - `.schemas`: Módulo que contiene los esquemas de respuesta (`ConfirmResponse`, `RequestType`, `ReturnMovie`, `changeDataBodyJSON`, `identifyMovie`).
 """
 
-from fastapi import APIRouter
+from fastapi import APIRouter, Response
 from sqlmodel import select
 
-from app.db import DbSession
+from app.caching import conditional
+from app.db import DbReadSession, DbSession
+from app.pagination import Pagination
 from app.proyectos.ksoto.schemas import (
     ConfirmResponse,
     RequestType,
@@ -47,10 +49,10 @@ api_router = APIRouter(
 
 
 
-@api_router.get("/movie/{id_movie}/{name}", tags=["Pelicula"])
-def devolverPelicula(id_movie:int, name:str, db:DbSession) -> ConfirmResponse:
+@api_router.get("/movie/{id_movie}/{name}", tags=["Pelicula"], dependencies=[conditional(Peliculas)])
+def devolverPelicula(id_movie:int, name:str, db:DbReadSession) -> ConfirmResponse:
     """Metodo para buscar y encontrar una pelicula en particular."""
-    movie = db.exec(select(Peliculas).where(Peliculas.id == id_movie and Peliculas.name == name)).first()
+    movie = db.exec(select(Peliculas).where(Peliculas.id == id_movie, Peliculas.name == name)).first()
 
     if movie is None:
         recibido = identifyMovie(id=id_movie,name=name)
@@ -65,17 +67,19 @@ def devolverPelicula(id_movie:int, name:str, db:DbSession) -> ConfirmResponse:
 
 
 
-@api_router.get("/movies", tags=["Pelicula"])
-def devolverPeliculas(db: DbSession) -> ConfirmResponse:
+@api_router.get("/movies", tags=["Pelicula"], dependencies=[conditional(Peliculas)])
+def devolverPeliculas(db: DbReadSession, page: Pagination) -> ConfirmResponse:
     """Metodo para devolver todas las peliculas."""
-    listPeliculas =  db.exec(select(Peliculas)).all()
-
-    listRP = []
-
     # crear un arreglo de tipo ReturnMovie, el cual es mucho mas limpio
-    for pelicula in listPeliculas:
-        listRP.append(ReturnMovie(name=pelicula.name,  director=pelicula.director,  release=pelicula.release))
-    
+    listRP = page.fetch(
+        db,
+        Peliculas,
+        transform=lambda pelicula: ReturnMovie(name=pelicula.name, director=pelicula.director, release=pelicula.release),
+    )
+    if isinstance(listRP, Response):
+        # El cliente pidió NDJSON, las peliculas se envian una por linea
+        return listRP
+
     return ConfirmResponse(type=RequestType.get,status=StatusType.succes, comment="Here the list of all data your requested",  returnJson=listRP)
     
 
@@ -107,7 +111,7 @@ def ModificarDatosDePelicula(db:DbSession, request: changeDataBodyJSON) -> Confi
     """Metodo para modificar un dato de la pelicula."""
     # Seleccionar si el id coincide con el de alguna pelicula
 
-    movie = db.exec(select(Peliculas).where(Peliculas.id == request.identificador.id and Peliculas.name == request.identificador.name)).first()
+    movie = db.exec(select(Peliculas).where(Peliculas.id == request.identificador.id, Peliculas.name == request.identificador.name)).first()
 
     if movie is None:
         return ConfirmResponse(type=RequestType.put, status=StatusType.fail, comment=f"The movie with the id:{request.identificador.id} and with the name:{request.identificador.name} does not exist!!",returnJson=request)
@@ -147,7 +151,7 @@ def eliminarUnaPelicula(id_pelicula:int, name:str, db: DbSession) -> ConfirmResp
     # Crear un request
     request = identifyMovie(id=id_pelicula,name=name)
 
-    movie = db.exec(select(Peliculas).where(Peliculas.id == id_pelicula and Peliculas.name == name)).first()
+    movie = db.exec(select(Peliculas).where(Peliculas.id == id_pelicula, Peliculas.name == name)).first()
    
     if movie is None:
         return ConfirmResponse(type=RequestType.delete, status=StatusType.fail, comment=f"The movie with the id:{id_pelicula} and with the name:{name} doesn't exist!!",returnJson=request)
@@ -0,0 +1,38 @@
+"""Command line tools for **Alcancia**.
+
+Commands:
+    - `soa nnieto rebuild-balance`: Recompute the running balance from the transactions ledger.
+    - `soa nnieto verify-balance`: Check that the running balance matches the transactions ledger.
+"""
+
+import typer
+
+from app.db import initialize_database, new_session
+
+from .ledger import rebuild_balance, verify_balance
+
+cli = typer.Typer(help="Comandos de la Alcancía.", no_args_is_help=True)
+
+
+@cli.command("rebuild-balance")
+def rebuild_balance_command():
+    """Recompute the running balance from the transactions ledger."""
+    initialize_database()
+    with new_session() as db:
+        snapshot = rebuild_balance(db)
+        db.commit()
+        typer.echo(f"Saldo reconstruido: {snapshot.balance} ({snapshot.transactions} movimientos)")
+
+
+@cli.command("verify-balance")
+def verify_balance_command():
+    """Check that the running balance matches the transactions ledger.
+
+    Exits with status 1 if they differ.
+    """
+    with new_session() as db:
+        check = verify_balance(db)
+    if not check.ok:
+        typer.echo(f"El saldo materializado ({check.snapshot}) no coincide con el historial ({check.ledger})", err=True)
+        raise typer.Exit(code=1)
+    typer.echo(f"Saldo correcto: {check.ledger}")
@@ -0,0 +1,174 @@
+"""Running balance of the **Alcancia** ledger.
+
+The balance used to be computed with `SUM(amount)` over the whole `alcancia_transaction` table on every
+request, so its cost grew with the history. This module keeps a materialized total in the
+`alcancia_balance` table instead:
+
+- `record_transaction` inserts a movement and moves the running total in the same database transaction,
+  rejecting withdrawals larger than the balance atomically.
+- `read_balance` reads the running total with a primary key lookup.
+- `rebuild_balance` and `verify_balance` recompute the total from the ledger. They are exposed in the
+  command line as `soa nnieto rebuild-balance` and `soa nnieto verify-balance`.
+"""
+
+from typing import NamedTuple
+
+from sqlalchemy import func, update
+from sqlalchemy.exc import IntegrityError
+from sqlmodel import Session, select
+
+from .models import BALANCE_SNAPSHOT_ID, BalanceSnapshot, Transaction, now_utc
+
+
+class InsufficientFundsError(Exception):
+    """Raised when a withdrawal is larger than the balance."""
+
+    def __init__(self, balance: int):
+        super().__init__(f"Insufficient funds, the balance is {balance}")
+        self.balance = balance
+        """The balance when the withdrawal was rejected."""
+
+
+class LedgerTotals(NamedTuple):
+    """Totals computed by scanning the ledger."""
+
+    balance: int
+    transactions: int
+    last_transaction_id: int | None
+
+
+class BalanceCheck(NamedTuple):
+    """Result of comparing the running total with the ledger."""
+
+    snapshot: int | None
+    """Balance stored in `alcancia_balance`, or None if there is no snapshot yet."""
+    ledger: int
+    """Balance computed from `alcancia_transaction`."""
+
+    @property
+    def ok(self) -> bool:
+        """Whether the snapshot matches the ledger."""
+        return self.snapshot == self.ledger
+
+
+def ledger_totals(db: Session) -> LedgerTotals:
+    """Compute balance, number of movements and last id by scanning the whole ledger.
+
+    Args:
+        db (Session): The database session used to execute the query.
+
+    Returns:
+        LedgerTotals: The totals of the ledger.
+
+    """
+    statement = select(
+        func.coalesce(func.sum(Transaction.amount), 0),
+        func.count(Transaction.id),
+        func.max(Transaction.id),
+    )
+    return LedgerTotals(*db.exec(statement).one())
+
+
+def rebuild_balance(db: Session) -> BalanceSnapshot:
+    """Recompute the running total from the ledger and store it.
+
+    The change is flushed but not committed, the caller owns the transaction.
+
+    Args:
+        db (Session): The database session used to execute the queries.
+
+    Returns:
+        BalanceSnapshot: The rebuilt snapshot.
+
+    """
+    totals = ledger_totals(db)
+    snapshot = db.get(BalanceSnapshot, BALANCE_SNAPSHOT_ID) or BalanceSnapshot(id=BALANCE_SNAPSHOT_ID)
+    snapshot.balance = totals.balance
+    snapshot.transactions = totals.transactions
+    snapshot.last_transaction_id = totals.last_transaction_id
+    snapshot.updated_at = now_utc()
+    db.add(snapshot)
+    db.flush()
+    return snapshot
+
+
+def verify_balance(db: Session) -> BalanceCheck:
+    """Compare the running total with the balance computed from the ledger.
+
+    Args:
+        db (Session): The database session used to execute the queries.
+
+    Returns:
+        BalanceCheck: Both balances.
+
+    """
+    snapshot = db.exec(select(BalanceSnapshot.balance).where(BalanceSnapshot.id == BALANCE_SNAPSHOT_ID)).one_or_none()
+    return BalanceCheck(snapshot=snapshot, ledger=ledger_totals(db).balance)
+
+
+def read_balance(db: Session) -> int:
+    """Read the current balance from the running total.
+
+    If there is no snapshot yet (for example, a database created before this table existed),
+    it is rebuilt from the ledger and committed once.
+
+    Args:
+        db (Session): The database session used to execute the query.
+
+    Returns:
+        int: The current balance.
+
+    """
+    statement = select(BalanceSnapshot.balance).where(BalanceSnapshot.id == BALANCE_SNAPSHOT_ID)
+    balance = db.exec(statement).one_or_none()
+    if balance is None:
+        try:
+            balance = rebuild_balance(db).balance
+            db.commit()
+        except IntegrityError:
+            # Another worker created the snapshot first
+            db.rollback()
+            balance = db.exec(statement).one()
+    return balance
+
+
+def record_transaction(db: Session, amount: int) -> tuple[int, int]:
+    """Insert a movement in the ledger and update the running total in the same transaction.
+
+    Withdrawals are only applied if the balance covers them. The check and the update are a single
+    conditional `UPDATE ... WHERE balance >= :quantity`, evaluated while the database holds the write
+    lock (SQLite) or the row lock (other databases), so concurrent withdrawals cannot overdraw the
+    alcancía even with several workers.
+
+    The changes are flushed but not committed, the caller owns the transaction and must roll it
+    back if `InsufficientFundsError` is raised.
+
+    Args:
+        db (Session): The database session used to execute the queries.
+        amount (int): The amount of the movement, negative for withdrawals.
+
+    Returns:
+        tuple[int, int]: The balance before and after the movement.
+
+    Raises:
+        InsufficientFundsError: If the movement is a withdrawal larger than the balance.
+
+    """
+    read_balance(db)
+    txn = Transaction(amount=amount)
+    db.add(txn)
+    db.flush()
+    statement = update(BalanceSnapshot).where(BalanceSnapshot.id == BALANCE_SNAPSHOT_ID)
+    if amount < 0:
+        statement = statement.where(BalanceSnapshot.balance >= -amount)
+    statement = statement.values(
+        balance=BalanceSnapshot.balance + amount,
+        transactions=BalanceSnapshot.transactions + 1,
+        last_transaction_id=txn.id,
+        updated_at=now_utc(),
+    ).returning(BalanceSnapshot.balance)
+    new_balance = db.exec(statement).scalar_one_or_none()
+    if new_balance is None:
+        current = db.exec(select(BalanceSnapshot.balance).where(BalanceSnapshot.id == BALANCE_SNAPSHOT_ID)).one()
+        raise InsufficientFundsError(current)
+    return new_balance - amount, new_balance
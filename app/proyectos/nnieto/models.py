@@ -38,3 +38,27 @@ class Transaction(SQLModel, table=True):
             ],
         },
     }
+
+
+class BalanceSnapshot(SQLModel, table=True):
+    """Saldo materializado de la alcancía.
+
+    Es un total acumulado de la tabla `alcancia_transaction` que se actualiza en la misma
+    transacción que cada movimiento, así consultar el saldo no tiene que sumar todo el historial.
+    Sólo existe un renglón, con `id` igual a `BALANCE_SNAPSHOT_ID`.
+    """
+
+    __tablename__ = "alcancia_balance"
+    id: int | None = Field(default=None, primary_key=True)
+    balance: int = Field(title="Saldo", default=0, nullable=False)
+    transactions: int = Field(title="Movimientos incluidos", default=0, nullable=False)
+    last_transaction_id: int | None = Field(title="Último movimiento incluido", default=None, nullable=True)
+    updated_at: datetime = Field(
+        title="Updated At",
+        default_factory=now_utc,
+        nullable=False,
+    )
+
+
+BALANCE_SNAPSHOT_ID = 1
+"""Primary key of the only row of `alcancia_balance`."""
@@ -5,7 +5,6 @@ Routes:
     - `PUT /alcancia/transaction/{txn_type}/{quantity}`: Create a new transaction (deposit or withdraw).
 
 Functions:
-    - `compute_balance`: Compute the balance by summing up the amounts of all transactions in the database.
     - `transactions_list`: Retrieve the list of all transactions.
     - `create_transaction`: Create a new transaction (Deposit/Withdraw)
 
@@ -15,37 +14,21 @@ Dependencies:
     - [sqlalchemy](https://www.sqlalchemy.org/): SQL toolkit and Object-Relational Mapping (ORM) library.
     - [sqlmodel](https://sqlmodel.tiangolo.com/): SQL databases in Python, designed to be compatible with FastAPI.
     - `app.main`: Main application module containing the database session.
+    - `.ledger`: Module that keeps the running balance in sync with the transactions.
     - `.models`: Module containing the Transaction model.
     - `.schemas`: Module containing the response schemas (`TransactionResponse`, `TransactionResult`, Transaction`Type).
 """
-from typing import Annotated
-
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, HTTPException, status
 from pydantic import PositiveInt
-from sqlalchemy import func
-from sqlmodel import select
 
-from app.db import DbSession
+from app.caching import conditional
+from app.db import AsyncDbSession, DbReadSession
+from app.pagination import Pagination
 
+from .ledger import InsufficientFundsError, record_transaction
 from .models import Transaction
 from .schemas import TransactionResponse, TransactionResult, TransactionType
 
-
-async def compute_balance(db: DbSession) -> int:
-    """Compute the balance by summing up the amounts of all transactions in the database.
-
-    Args:
-        db (Session): The database session used to execute the query.
-
-    Returns:
-        int: The total balance computed from the sum of all transaction amounts. 
-             Returns 0 if there are no transactions.
-
-    """
-    result = db.exec(select(func.coalesce(func.sum(Transaction.amount), 0)))
-    return result.one_or_none()
-
-
 api_router = APIRouter(
     prefix="/alcancia",
     tags=["Alcancia"],
@@ -53,9 +36,10 @@ api_router = APIRouter(
 )
 
 
-@api_router.get("/transactions", tags=["Alcancia"])
+@api_router.get("/transactions", tags=["Alcancia"], dependencies=[conditional(Transaction)])
 def transactions_list(
-    db: DbSession,
+    db: DbReadSession,
+    page: Pagination,
 ) -> list[Transaction]:
     """Retrieve the list of all transactions in **Alcancia**.
 
@@ -63,15 +47,14 @@ def transactions_list(
     
     - **Returns**: `list[Transaction]`: A list of all transactions in the database.
     """
-    return db.exec(select(Transaction)).all()
+    return page.fetch(db, Transaction)
 
 
 @api_router.put("/transaction/{txn_type}/{quantity}", tags=["Alcancia"], status_code=status.HTTP_201_CREATED)
 async def create_transaction(
     txn_type: TransactionType,
     quantity: PositiveInt,
-    db: DbSession,
-    balance: Annotated[int, Depends(compute_balance)],
+    db: AsyncDbSession,
 ) -> TransactionResponse:
     """Create a new transaction (`deposit` or `withdraw`) in **Alcancia**.
 
@@ -80,6 +63,9 @@ async def create_transaction(
     `withdraw` and the quantity exceeds the current balance, the transaction is
     rejected.
 
+    The balance check and the insert happen in the same database transaction, so
+    concurrent withdrawals cannot overdraw the alcancía (see `ledger.record_transaction`).
+
     **Args:**
     - `txn_type` (`TransactionType`): The type of transaction (`"deposit"` or `"withdraw"`).
     - `quantity` (`PositiveInt`): The amount for the transaction. *Important*:
@@ -93,22 +79,21 @@ async def create_transaction(
     - `HTTPException`: If the transaction is a withdrawal and the quantity exceeds
       the current balance, a 403 Forbidden error is raised with a rejection response.
     """
-    if txn_type == TransactionType.withdraw and quantity > balance:
+    op = 1 if txn_type== TransactionType.deposit else -1
+    try:
+        balance, new_balance = await db.run_sync(record_transaction, quantity * op)
+    except InsufficientFundsError as e:
+        await db.rollback()
         raise HTTPException(
             status_code=status.HTTP_403_FORBIDDEN,
             detail=TransactionResponse(
                 result=TransactionResult.rejected,
-                previous_balance=balance,
-                balance=balance,
+                previous_balance=e.balance,
+                balance=e.balance,
             ).model_dump(),
-        )
-    op = 1 if txn_type== TransactionType.deposit else -1
-    db.add(Transaction(amount=quantity * op))
-    db.commit()
-    new_balance = await compute_balance(db)
+        ) from e
+    await db.commit()
     return TransactionResponse(
         result=TransactionResult.settled,
         previous_balance=balance, balance=new_balance,
     )
-
-
@@ -31,7 +31,9 @@ from fastapi import APIRouter, HTTPException, status
 from fastapi.responses import JSONResponse
 from sqlmodel import select
 
-from app.db import DbSession
+from app.caching import conditional
+from app.db import AsyncDbReadSession, AsyncDbSession, DbReadSession
+from app.pagination import Pagination
 from app.proyectos.rgarcia.schemas import RecipeResponse, RecipeResult
 
 from .models import Receta
@@ -42,9 +44,10 @@ api_router = APIRouter(
     responses={404: {"description": "Not found"}},
 )
 
-@api_router.get("/todas", tags=["Recetas"])
+@api_router.get("/todas", tags=["Recetas"], dependencies=[conditional(Receta)])
 def recipes_list(
-    db: DbSession,
+    db: DbReadSession,
+    page: Pagination,
 ) -> list[Receta]:
     """Retrieve the list of all recipees in **Recetas**.
 
@@ -52,17 +55,17 @@ def recipes_list(
     
     - **Returns**: `list[Receta]`: A list of all recipes in the database.
     """
-    return db.exec(select(Receta)).all()
+    return page.fetch(db, Receta)
 
 
-@api_router.get("/receta", tags=["Recetas"], status_code=status.HTTP_200_OK)
+@api_router.get("/receta", tags=["Recetas"], status_code=status.HTTP_200_OK, dependencies=[conditional(Receta)])
 async def get_receta(
     receta_id: int,  
-    db: DbSession,  
+    db: AsyncDbReadSession,  
 ):
     """Get the existent recipe by its id."""
     # Retrieve the existant recipe
-    receta_db = db.exec(select(Receta).where(Receta.id == receta_id)).first()
+    receta_db = (await db.exec(select(Receta).where(Receta.id == receta_id))).first()
 
     # If the recipe does not exist, return a non_existant response
     if not receta_db:
@@ -77,7 +80,7 @@ async def get_receta(
 @api_router.post("/alta", tags=["Recetas"], status_code=status.HTTP_201_CREATED)
 async def upload_receta(
     receta: Receta,
-    db: DbSession,
+    db: AsyncDbSession,
 ):
     """Upload a new receta and its ingredientes."""
     receta_db = Receta(
@@ -89,8 +92,8 @@ async def upload_receta(
     )
 
     db.add(receta_db)
-    db.commit()
-    db.refresh(receta_db)  # Refresh to get the auto-generated id
+    await db.commit()
+    await db.refresh(receta_db)  # Refresh to get the auto-generated id
 
     receta_json = json.loads(receta_db.model_dump_json())
 
@@ -100,11 +103,11 @@ async def upload_receta(
 @api_router.put("/modificar", tags=["Recetas"], status_code=status.HTTP_204_NO_CONTENT)
 async def update_receta(
     receta: Receta,  
-    db: DbSession,   
+    db: AsyncDbSession,   
 ):
     """Update an existing receta based on the receta.id."""
     # Retrieves the existant recipe
-    receta_db = db.exec(select(Receta).where(Receta.id == receta.id)).first()
+    receta_db = (await db.exec(select(Receta).where(Receta.id == receta.id))).first()
 
     # If the recipe does not exist, return a non_existant response
     if not receta_db:
@@ -119,7 +122,7 @@ async def update_receta(
     receta_db.ingredientes = receta.ingredientes
     receta_db.metodo_preparacion = receta.metodo_preparacion
 
-    db.commit()
+    await db.commit()
 
     return RecipeResponse(result=RecipeResult.successful)
 
@@ -127,11 +130,11 @@ async def update_receta(
 @api_router.delete("/eliminar", tags=["Recetas"], status_code=status.HTTP_200_OK)
 async def delete_receta(
     receta_id: int,  
-    db: DbSession,  
+    db: AsyncDbSession,  
 ):
     """Delete an existing receta based on the receta.id."""
     # Retrieve the existant recipe
-    receta_db = db.exec(select(Receta).where(Receta.id == receta_id)).first()
+    receta_db = (await db.exec(select(Receta).where(Receta.id == receta_id))).first()
 
     # If the recipe does not exist, return a non_existant response
     if not receta_db:
@@ -140,7 +143,7 @@ async def delete_receta(
             detail=f"Recipe with ID {receta_id} not found",
         )
 
-    db.delete(receta_db)
-    db.commit()
+    await db.delete(receta_db)
+    await db.commit()
 
     return RecipeResponse(result=RecipeResult.successful)
\ No newline at end of file
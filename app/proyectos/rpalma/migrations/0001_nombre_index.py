@@ -0,0 +1,10 @@
+"""Indexa el nombre de los contactos, usado por la búsqueda de contactos."""
+
+from app.migrations import create_index
+
+online = True
+
+
+def upgrade(connection):
+    """Crea `ix_contactos_agenda_nombre`."""
+    create_index(connection, "ix_contactos_agenda_nombre", "contactos_agenda", ["nombre"])
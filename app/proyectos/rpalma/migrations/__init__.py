@@ -0,0 +1 @@
+"""Migraciones del esquema de **Contactos**, ver `app.migrations`."""
@@ -11,7 +11,7 @@ class Agenda(SQLModel, table=True):
 
     Atributos:
         - **id (int | None)**: Identificador único del contacto. Es la clave primaria de la tabla.
-        - **nombre (str)**: Nombre del contacto. Este campo es obligatorio.
+        - **nombre (str)**: Nombre del contacto. Este campo es obligatorio e indexado para las búsquedas.
         - **telefono (str)**: Número de teléfono del contacto. Este campo es obligatorio.
         - **correo (str | None)**: Dirección de correo electrónico del contacto. Este campo es opcional.
 
@@ -26,7 +26,7 @@ class Agenda(SQLModel, table=True):
 
     __tablename__ = "contactos_agenda"
     id: int | None = Field(default=None, primary_key=True)
-    nombre: str = Field(title="Nombre", nullable=False)
+    nombre: str = Field(title="Nombre", nullable=False, index=True)
     telefono: str = Field(title="Telefono", nullable=False)
     correo: str | None = Field(title="Correo", nullable=True)
 
@@ -26,7 +26,9 @@ Dependencies:
 from fastapi import APIRouter, status
 from sqlmodel import select
 
-from app.db import DbSession
+from app.caching import conditional
+from app.db import AsyncDbReadSession, AsyncDbSession, DbReadSession
+from app.pagination import Pagination
 
 from .models import Agenda
 from .schemas import ContactoDB, ContactoResponse
@@ -38,9 +40,10 @@ api_router = APIRouter(
 )
 
 
-@api_router.get("/agenda", tags=["Contactos"])
+@api_router.get("/agenda", tags=["Contactos"], dependencies=[conditional(Agenda)])
 def agenda_list(
-    db: DbSession,
+    db: DbReadSession,
+    page: Pagination,
 ) -> list[Agenda]:
     """Retrieve the list of all contactos in **Agenda**.
 
@@ -48,12 +51,12 @@ def agenda_list(
     
     - **Returns**: `list[Agenda]`: A list of all contactos in the database.
     """
-    return db.exec(select(Agenda)).all()
+    return page.fetch(db, Agenda)
 
 @api_router.post("/create", tags=["Contactos"], status_code=status.HTTP_201_CREATED)
 async def crear_contacto(
     contacto: ContactoDB,  # Pydantic schema for validation
-    db: DbSession,
+    db: AsyncDbSession,
 ) -> ContactoResponse:
     """Create a new contacto in the **Agenda**.
 
@@ -71,11 +74,11 @@ async def crear_contacto(
 
     # Add the new contacto to the database
     db.add(nuevo_contacto)
-    db.commit()
-    db.refresh(nuevo_contacto)  # Refresh to get the updated instance with the ID
+    await db.commit()
+    await db.refresh(nuevo_contacto)  # Refresh to get the updated instance with the ID
 
     # Retrieve the updated agenda
-    agenda_actualizada = db.exec(select(Agenda)).all()
+    agenda_actualizada = (await db.exec(select(Agenda))).all()
 
     # Return the response object directly
     return ContactoResponse(
@@ -89,7 +92,7 @@ async def crear_contacto(
 async def editar_contacto(
     contacto_id: int,
     contacto: ContactoDB,
-    db: DbSession,
+    db: AsyncDbSession,
 ) -> ContactoResponse:
     """Edit an existing contacto in the **Agenda**.
 
@@ -100,7 +103,7 @@ async def editar_contacto(
     - **Returns**: `ContactoResponse`: The result of the operation and the updated agenda.
     """
     # Retrieve the existing contacto from the database
-    contacto_existente = db.get(Agenda, contacto_id)
+    contacto_existente = await db.get(Agenda, contacto_id)
 
     if not contacto_existente:
         return ContactoResponse(
@@ -119,11 +122,11 @@ async def editar_contacto(
         contacto_existente.correo = contacto.correo
 
     # Commit the changes to the database
-    db.commit()
-    db.refresh(contacto_existente)
+    await db.commit()
+    await db.refresh(contacto_existente)
 
     # Retrieve the updated agenda
-    agenda_actualizada = db.exec(select(Agenda)).all()
+    agenda_actualizada = (await db.exec(select(Agenda))).all()
 
     # Return the response object directly
     return ContactoResponse(
@@ -136,7 +139,7 @@ async def editar_contacto(
 @api_router.delete("/delete/{contacto_id}", tags=["Contactos"])
 async def eliminar_contacto(
     contacto_id: int,
-    db: DbSession,
+    db: AsyncDbSession,
 ) -> ContactoResponse:
     """Delete a contacto from the **Agenda**.
 
@@ -146,7 +149,7 @@ async def eliminar_contacto(
     - **Returns**: `ContactoResponse`: The result of the operation and the updated agenda.
     """
     # Retrieve the existing contacto from the database
-    contacto_existente = db.get(Agenda, contacto_id)
+    contacto_existente = await db.get(Agenda, contacto_id)
 
     if not contacto_existente:
          return ContactoResponse(
@@ -157,11 +160,11 @@ async def eliminar_contacto(
     )
 
     # Delete the contacto from the database
-    db.delete(contacto_existente)
-    db.commit()
+    await db.delete(contacto_existente)
+    await db.commit()
 
     # Retrieve the updated agenda
-    agenda_actualizada = db.exec(select(Agenda)).all()
+    agenda_actualizada = (await db.exec(select(Agenda))).all()
     
     # Return the response object directly
     return ContactoResponse(
@@ -171,10 +174,10 @@ async def eliminar_contacto(
         agenda=agenda_actualizada,
     )
 
-@api_router.get("/search/{nombre}", tags=["Contactos"])
+@api_router.get("/search/{nombre}", tags=["Contactos"], dependencies=[conditional(Agenda)])
 async def buscar_contacto(
     nombre: str,
-    db: DbSession,
+    db: AsyncDbReadSession,
 ) -> ContactoResponse:
     """Search for a contacto in the **Agenda** by name.
 
@@ -184,7 +187,7 @@ async def buscar_contacto(
     - **Returns**: `ContactoResponse`: The result of the operation and matching results.
     """
     # Search for contactos with the provided name
-    contactos = db.exec(select(Agenda).where(Agenda.nombre == nombre)).all()
+    contactos = (await db.exec(select(Agenda).where(Agenda.nombre == nombre))).all()
 
     if not contactos:
         return ContactoResponse(
@@ -0,0 +1,158 @@
+"""Fast JSON serialization of the responses.
+
+When a route returns a list of rows, FastAPI validates every row against the `response_model`,
+converts the result to Python primitives with `jsonable_encoder` and then encodes it with `json.dumps`.
+For big tables that costs more than the query.
+
+`FastJSONResponse` skips those steps: the rows go straight to bytes through the Rust serializer of
+`pydantic-core`, with a `TypeAdapter` built once per response model (`type_adapter`). Rows that already
+are instances of the response model (a `SQLModel` table listed as itself) are not validated at all.
+ORM rows listed as a read schema with the same fields are not validated either, only the fields of the
+schema are serialized (see `projection`). Any other rows are validated once, from their attributes.
+
+How to use it in your routes:
+```python
+    @api_router.get("/", response_model=list[BookRead])
+    def get_libros(db: DbSession, page: Pagination) -> list[BookRead]:
+        return page.fetch(db, Book, response_model=list[BookRead])
+```
+
+or, without pagination:
+```python
+    return FastJSONResponse(rows, response_model=list[Producto])
+```
+
+A router can also use it for every route, with `APIRouter(default_response_class=FastJSONResponse)`.
+FastAPI still validates the content in that case, only the encoding to bytes is faster.
+"""
+
+from collections.abc import Mapping
+from functools import lru_cache
+from typing import Any, get_args, get_origin
+
+from fastapi.responses import JSONResponse
+from pydantic import BaseModel, TypeAdapter
+from pydantic_core import to_json
+from starlette.background import BackgroundTask
+
+SEQUENCE_TYPES = (list, tuple, set, frozenset)
+
+
+@lru_cache(maxsize=256)
+def type_adapter(response_model: Any) -> TypeAdapter:
+    """Return the `TypeAdapter` of a response model, building it only the first time."""
+    return TypeAdapter(response_model)
+
+
+def _item(content: Any, response_model: Any) -> tuple[Any, Any, bool]:
+    """Return the model of the items of `response_model`, a sample item and whether it is a list."""
+    if get_origin(response_model) in SEQUENCE_TYPES:
+        return get_args(response_model)[0], next(iter(content), None), True
+    return response_model, content, False
+
+
+def needs_validation(content: Any, response_model: Any) -> bool:
+    """Return whether `content` must be validated before it is serialized as `response_model`.
+
+    Only the first item of a list is checked: the rows of a query all have the same type.
+    """
+    model, sample, _ = _item(content, response_model)
+    if not isinstance(model, type) or not issubclass(model, BaseModel) or sample is None:
+        return False
+    return not isinstance(sample, model)
+
+
+def _has_custom_behavior(model: type[BaseModel]) -> bool:
+    decorators = model.__pydantic_decorators__
+    return any(
+        (
+            decorators.validators,
+            decorators.field_validators,
+            decorators.root_validators,
+            decorators.field_serializers,
+            decorators.model_serializers,
+            decorators.model_validators,
+            decorators.computed_fields,
+        ),
+    )
+
+
+@lru_cache(maxsize=256)
+def projection(row_type: type, model: type[BaseModel]) -> frozenset[str] | None:
+    """Return the fields of `model` if rows of `row_type` can be serialized as `model` without validation.
+
+    That is the case of an ORM row listed as its read schema, like `Event` as `EventRead`: `row_type` is a
+    Pydantic model (a `SQLModel` table) with every field of `model`, with the same type (a nullable column,
+    like a primary key, is accepted for a required field), and neither model has aliases, validators or
+    serializers. The rows are then serialized as `row_type`, keeping only the fields of `model`.
+
+    Returns:
+        frozenset[str] | None: The fields to keep, or `None` if the rows must be validated.
+
+    """
+    if not issubclass(row_type, BaseModel) or _has_custom_behavior(model) or _has_custom_behavior(row_type):
+        return None
+    row_fields = row_type.model_fields
+    for name, field in model.model_fields.items():
+        row_field = row_fields.get(name)
+        if row_field is None or field.alias or field.serialization_alias or row_field.serialization_alias:
+            return None
+        if row_field.annotation not in (field.annotation, field.annotation | None):
+            return None
+    return frozenset(model.model_fields)
+
+
+def dump_json(content: Any, response_model: Any = None) -> bytes:
+    """Serialize `content` to JSON bytes.
+
+    Args:
+        content (Any): The value to serialize: models, ORM rows, lists, dictionaries, ...
+        response_model (Any): The type of the response, for example `list[BookRead]`. Without it, the
+            content is serialized as it is.
+
+    Returns:
+        bytes: The JSON document.
+
+    """
+    if response_model is None:
+        return to_json(content)
+    if not needs_validation(content, response_model):
+        return type_adapter(response_model).dump_json(content)
+    model, sample, is_list = _item(content, response_model)
+    fields = projection(type(sample), model)
+    if fields is None:
+        adapter = type_adapter(response_model)
+        return adapter.dump_json(adapter.validate_python(content, from_attributes=True))
+    if is_list:
+        return type_adapter(list[type(sample)]).dump_json(content, include={"__all__": set(fields)})
+    return type_adapter(type(sample)).dump_json(content, include=set(fields))
+
+
+class FastJSONResponse(JSONResponse):
+    """A JSON response encoded by `pydantic-core` directly to bytes (see the module documentation).
+
+    Args:
+        content (Any): The value to serialize.
+        response_model (Any): The type of the response, for example `list[Producto]`.
+        status_code (int): The status code of the response.
+        headers (Mapping[str, str] | None): Extra headers, for example the pagination cursor.
+        media_type (str | None): The media type, `application/json` by default.
+        background (BackgroundTask | None): A task to run after the response is sent.
+
+    """
+
+    def __init__(
+        self,
+        content: Any,
+        response_model: Any = None,
+        status_code: int = 200,
+        headers: Mapping[str, str] | None = None,
+        media_type: str | None = None,
+        background: BackgroundTask | None = None,
+    ):
+        self.response_model = response_model
+        super().__init__(content, status_code, headers, media_type, background)
+
+    def render(self, content: Any) -> bytes:
+        """Encode the content with the `TypeAdapter` of `response_model`."""
+        return dump_json(content, self.response_model)
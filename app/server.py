@@ -0,0 +1,266 @@
+"""Production server: several uvicorn worker processes that share one listening socket.
+
+Run `serve --help` (or `soa serve --help`) to see the options:
+
+```
+serve --workers 4 --host 0.0.0.0 --port 8000
+serve --reload
+```
+
+How it works:
+    - **Preload**: the main process imports `app.main`, writes the discovery manifest (see `app.discovery`),
+      creates the tables, applies the migrations and installs the routes, once. Then it forks the workers:
+      they start with all of that already in memory (copy-on-write), and their lifespan skips it (see
+      `app.main.lifespan_cycle`). The connections of the main process are closed before forking.
+    - **Event loop and HTTP parser**: `auto` picks uvloop and httptools when they are installed (they come
+      with `fastapi[standard]`), and the asyncio loop and h11 when they are not.
+    - **Thread pool**: the `def` routes run in the AnyIO thread pool of each worker, with
+      `Settings.thread_pool_size` threads, through the bulkhead of their project (see `app.threadpool`).
+    - **Signals**: `SIGTERM` or `Ctrl+C` stop the workers gracefully: each one stops accepting connections
+      and waits up to `--graceful-timeout` seconds for the requests in progress. `SIGHUP` replaces the
+      workers one by one (a graceful restart, the socket is never closed), and a worker that dies is
+      replaced too. The workers are forked from the preloaded main process, so to load new code restart
+      the main process; `--reload` is for development: a single process that restarts when a file changes.
+
+The workers need `os.fork`, so with more than one worker it only runs on Unix.
+"""
+
+import asyncio
+import contextlib
+import importlib.util
+import logging
+import os
+import signal
+import time
+from enum import StrEnum
+from typing import Annotated
+
+import typer
+import uvicorn
+from fastapi import FastAPI
+
+from app.config import settings
+from app.log_utils import logger, setup_logging
+
+
+class Loop(StrEnum):
+    """Event loops of the workers."""
+
+    auto = "auto"
+    asyncio = "asyncio"
+    uvloop = "uvloop"
+
+
+class Http(StrEnum):
+    """HTTP parsers of the workers."""
+
+    auto = "auto"
+    h11 = "h11"
+    httptools = "httptools"
+
+
+cli = typer.Typer(help="Servidor de producción de la aplicación.")
+
+
+def resolve_loop(loop: Loop | str) -> str:
+    """Return the event loop that `auto` means: uvloop if it is installed, asyncio if not."""
+    if loop == Loop.auto:
+        return Loop.uvloop.value if importlib.util.find_spec("uvloop") else Loop.asyncio.value
+    return Loop(loop).value
+
+
+def resolve_http(http: Http | str) -> str:
+    """Return the HTTP parser that `auto` means: httptools if it is installed, h11 if not."""
+    if http == Http.auto:
+        return Http.httptools.value if importlib.util.find_spec("httptools") else Http.h11.value
+    return Http(http).value
+
+
+def preload() -> FastAPI:
+    """Import the application and do its startup work, before forking the workers.
+
+    Returns:
+        FastAPI: The application, with its routes installed and `app.state.preloaded` set.
+
+    """
+    from app.db import dispose_engines, initialize_database
+    from app.main import app, load_routes
+    from app.migrations import run_migrations
+
+    initialize_database()
+    if settings.migrate_on_startup:
+        run_migrations()
+    load_routes(app)
+    app.state.preloaded = True
+    # The pools cannot be shared with the workers, each one opens its own connections
+    asyncio.run(dispose_engines())
+    return app
+
+
+class Supervisor:
+    """Fork the workers, keep `workers` of them running, and stop them on `SIGTERM`.
+
+    Attributes:
+        config (uvicorn.Config): The configuration of the workers.
+        workers (int): Number of worker processes.
+        pids (set[int]): The running workers.
+        retiring (set[int]): The workers that were asked to stop by `restart`, they are not replaced.
+
+    """
+
+    def __init__(self, config: uvicorn.Config, workers: int):
+        self.config = config
+        self.workers = workers
+        self.pids: set[int] = set()
+        self.retiring: set[int] = set()
+        self.signals: list[int] = []
+        self.socket = None
+
+    def handle_signal(self, sig: int, frame):  # noqa: ARG002
+        """Queue a signal for the main loop, see `run`."""
+        self.signals.append(sig)
+
+    def spawn(self) -> int:
+        """Fork a worker that serves the application on the shared socket.
+
+        Returns:
+            int: The process id of the worker.
+
+        """
+        pid = os.fork()
+        if pid:
+            self.pids.add(pid)
+            return pid
+        # Worker process. In its own process group, so `Ctrl+C` reaches only the main process, which
+        # stops the workers with a single SIGTERM (a second signal would cancel the requests in progress).
+        os.setpgid(0, 0)
+        for sig in (signal.SIGINT, signal.SIGTERM, signal.SIGHUP):
+            signal.signal(sig, signal.SIG_IGN)
+        # The log thread of the `json` format is not copied by `fork`
+        setup_logging(
+            level=logging.DEBUG if settings.verbose else logging.INFO,
+            log_format=settings.log_format,
+            sample_rate=settings.log_sample_rate,
+        )
+        code = 1
+        try:
+            uvicorn.Server(self.config).run(sockets=[self.socket])
+            code = 0
+        except Exception:  # noqa: BLE001
+            logger.exception(f"El worker {os.getpid()} terminó con un error")
+        finally:
+            # Log and exit, never go back to the loop of the main process
+            os._exit(code)
+
+    def stop(self, pid: int, sig: int = signal.SIGTERM):
+        """Send a signal to a worker, if it is still running."""
+        with contextlib.suppress(ProcessLookupError):
+            os.kill(pid, sig)
+
+    def reap(self) -> set[int]:
+        """Return the workers that exited since the last call, without waiting."""
+        exited = set()
+        while self.pids:
+            try:
+                pid, _ = os.waitpid(-1, os.WNOHANG)
+            except ChildProcessError:
+                exited |= self.pids
+                break
+            if not pid:
+                break
+            exited.add(pid)
+        self.pids -= exited
+        return exited
+
+    def restart(self):
+        """Replace the workers one by one, so some of them are always accepting connections."""
+        logger.info("Reiniciando los workers")
+        for old in list(self.pids):
+            self.spawn()
+            self.retiring.add(old)
+            self.stop(old)
+
+    def shutdown(self):
+        """Stop the workers gracefully, and kill the ones that are still running after the graceful timeout."""
+        logger.info(f"Deteniendo {len(self.pids)} workers")
+        for pid in self.pids:
+            self.stop(pid)
+        deadline = time.monotonic() + (self.config.timeout_graceful_shutdown or 0) + 5
+        while self.pids and time.monotonic() < deadline:
+            self.reap()
+            time.sleep(0.1)
+        for pid in self.pids:
+            logger.warning(f"El worker {pid} no se detuvo a tiempo")
+            self.stop(pid, signal.SIGKILL)
+        while self.pids:
+            self.reap()
+            time.sleep(0.1)
+
+    def run(self):
+        """Bind the socket, fork the workers and supervise them until `SIGTERM` or `SIGINT`."""
+        self.socket = self.config.bind_socket()
+        for sig in (signal.SIGINT, signal.SIGTERM, signal.SIGHUP):
+            signal.signal(sig, self.handle_signal)
+        try:
+            for _ in range(self.workers):
+                self.spawn()
+            logger.info(f"{self.workers} workers iniciados, proceso principal {os.getpid()}")
+            while True:
+                while self.signals:
+                    sig = self.signals.pop(0)
+                    if sig == signal.SIGHUP:
+                        self.restart()
+                    else:
+                        self.shutdown()
+                        return
+                for pid in self.reap():
+                    if pid in self.retiring:
+                        self.retiring.discard(pid)
+                        continue
+                    logger.warning(f"El worker {pid} terminó, iniciando otro")
+                    self.spawn()
+                time.sleep(0.2)
+        finally:
+            self.socket.close()
+
+
+@cli.command()
+def serve(
+    host: Annotated[str, typer.Option(help="Dirección en la que escucha el servidor")] = "127.0.0.1",
+    port: Annotated[int, typer.Option(help="Puerto en el que escucha el servidor")] = 8000,
+    workers: Annotated[int, typer.Option(help="Procesos que atienden las peticiones")] = settings.workers,
+    *,
+    loop: Annotated[Loop, typer.Option(help="Event loop de los workers")] = Loop.auto,
+    http: Annotated[Http, typer.Option(help="Parser de HTTP de los workers")] = Http.auto,
+    graceful_timeout: Annotated[
+        float, typer.Option(help="Segundos que se esperan las peticiones en curso al detener un worker"),
+    ] = settings.graceful_timeout,
+    reload: Annotated[bool, typer.Option(help="Reiniciar al cambiar un archivo, sólo para desarrollo")] = False,
+):
+    """Run the application with several worker processes, preloaded before forking."""
+    if reload and workers > 1:
+        typer.echo("--reload sólo funciona con un worker", err=True)
+        raise typer.Exit(code=1)
+    if workers > 1 and not hasattr(os, "fork"):
+        typer.echo("Varios workers requieren os.fork, que no existe en este sistema", err=True)
+        raise typer.Exit(code=1)
+    options = {
+        "host": host,
+        "port": port,
+        "loop": resolve_loop(loop),
+        "http": resolve_http(http),
+        "timeout_graceful_shutdown": graceful_timeout,
+    }
+    logger.info(f"Servidor con {workers} workers, loop {options['loop']} y HTTP {options['http']}")
+    if reload:
+        uvicorn.run("app.main:app", reload=True, **options)
+        return
+    config = uvicorn.Config(preload(), **options)
+    if workers == 1:
+        uvicorn.Server(config).run()
+        return
+    Supervisor(config, workers).run()
+
+
+if __name__ == "__main__":
+    cli()
@@ -0,0 +1,142 @@
+"""Version counters of the tables, incremented by every transaction that writes to them.
+
+The `table_version` table keeps one row per table of the application: a `version` that grows with
+every flush that inserts, updates or deletes rows of the table, and the time of that write (`modified`).
+The row is written in the same transaction as the data, so a reader never sees new data with an old
+version, and every process of the server (and every command) shares the same counters.
+
+The counters are kept by SQLAlchemy session events, so the routes and the projects do not change:
+- `after_flush`: Increments the tables of the objects added, changed or deleted by the flush.
+- `do_orm_execute`: Increments the table of `insert`, `update` and `delete` statements run by a session.
+- `after_commit`: Calls the functions registered with `on_commit` with the names of the written tables.
+
+Writes that do not go through a session (a `Connection`, raw SQL, another program) are not counted.
+
+How to use it:
+```python
+    from app.table_versions import read_versions
+
+    versions = read_versions(db, [Transaction.__table__])
+```
+
+`app.caching` uses these counters to answer conditional requests (`ETag`, `If-None-Match`).
+"""
+
+import time
+from collections.abc import Callable, Iterable, Sequence
+from itertools import chain
+
+from sqlalchemy import Connection, Table, event, inspect, select, update
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.orm import ORMExecuteState, Session, UOWTransaction
+from sqlmodel import Field, SQLModel
+
+TOUCHED_TABLES = "touched_tables"
+"""Key of `Session.info` with the names of the tables written by the current transaction."""
+
+UPSERTS = {
+    "sqlite": sqlite.insert,
+    "postgresql": postgresql.insert,
+}
+"""`INSERT ... ON CONFLICT` constructs of the databases that have one."""
+
+
+class TableVersion(SQLModel, table=True):
+    """Version of the data of a table."""
+
+    __tablename__ = "table_version"
+
+    name: str = Field(primary_key=True)
+    """Name of the table."""
+    version: int = 0
+    """Number of transactions that wrote to the table."""
+    modified: float = 0.0
+    """Time of the last write, as a Unix timestamp."""
+
+
+_commit_listeners: list[Callable[[frozenset[str]], None]] = []
+
+
+def on_commit(listener: Callable[[frozenset[str]], None]) -> Callable[[frozenset[str]], None]:
+    """Call `listener` with the names of the written tables after every commit of this process.
+
+    Can be used as a decorator. The listener runs in the thread that commits, keep it short.
+    """
+    _commit_listeners.append(listener)
+    return listener
+
+
+def bump_versions(connection: Connection, names: Iterable[str]):
+    """Increment the version of the tables `names`, in the transaction of `connection`."""
+    table = TableVersion.__table__
+    now = time.time()
+    rows = [{"name": name, "version": 1, "modified": now} for name in sorted(names)]
+    if not rows:
+        return
+    upsert = UPSERTS.get(connection.dialect.name)
+    if upsert is None:
+        for row in rows:
+            result = connection.execute(
+                update(table).where(table.c.name == row["name"]).values(version=table.c.version + 1, modified=now),
+            )
+            if result.rowcount == 0:
+                connection.execute(table.insert().values(row))
+        return
+    statement = upsert(table)
+    statement = statement.on_conflict_do_update(
+        index_elements=[table.c.name],
+        set_={"version": table.c.version + 1, "modified": statement.excluded.modified},
+    )
+    connection.execute(statement, rows)
+
+
+def read_versions(db: Session, tables: Sequence[Table]) -> list[TableVersion]:
+    """Return the version of each table, from the database where the session keeps that table.
+
+    Tables that were never written have version 0.
+    """
+    versions = []
+    for table in tables:
+        connection = db.connection(bind_arguments={"clause": table})
+        row = connection.execute(select(TableVersion.__table__).where(TableVersion.name == table.name)).first()
+        versions.append(TableVersion.model_validate(row._mapping) if row else TableVersion(name=table.name))
+    return versions
+
+
+def _touched(session: Session) -> set[str]:
+    return session.info.setdefault(TOUCHED_TABLES, set())
+
+
+@event.listens_for(Session, "after_flush")
+def _after_flush(session: Session, flush_context: UOWTransaction):  # noqa: ARG001
+    mappers = {inspect(instance).mapper for instance in chain(session.new, session.dirty, session.deleted)}
+    for mapper in mappers:
+        names = {table.name for table in mapper.tables} - {TableVersion.__tablename__}
+        if names:
+            bump_versions(session.connection(bind_arguments={"mapper": mapper}), names)
+            _touched(session).update(names)
+
+
+@event.listens_for(Session, "do_orm_execute")
+def _after_dml(state: ORMExecuteState):
+    if not (state.is_insert or state.is_update or state.is_delete):
+        return None
+    result = state.invoke_statement()
+    name = state.statement.table.name
+    if name != TableVersion.__tablename__:
+        bump_versions(state.session.connection(bind_arguments={"clause": state.statement}), [name])
+        _touched(state.session).add(name)
+    return result
+
+
+@event.listens_for(Session, "after_commit")
+def _after_commit(session: Session):
+    names = frozenset(session.info.pop(TOUCHED_TABLES, ()))
+    if names:
+        for listener in _commit_listeners:
+            listener(names)
+
+
+@event.listens_for(Session, "after_rollback")
+def _after_rollback(session: Session):
+    session.info.pop(TOUCHED_TABLES, None)
@@ -0,0 +1,186 @@
+"""Thread pool of the `def` routes: its size, a bulkhead per project, and its metrics.
+
+Starlette runs every `def` route and every `def` dependency in the AnyIO default thread pool of the
+worker: `Settings.thread_pool_size` threads (see `configure_thread_pool`), shared by all the projects.
+Without limits, one project with slow `def` routes (a long report, a query waiting on a lock) can hold
+every thread, and the `def` routes of the other projects queue behind it.
+
+`install_bulkheads(routes, project)` runs the `def` endpoints of a project through a `Bulkhead`: a
+`CapacityLimiter` of its own, with `Settings.bulkhead_size` tokens (or the size of the project in
+`Settings.bulkheads`). At most that many requests of the project wait for, or hold, a thread of the pool;
+the rest wait on the bulkhead without taking a thread. `app.main.install_routes` calls it for every project.
+The `async def` routes do not use the pool and are not changed. The `def` dependencies, like `DbSession`,
+still run in the pool directly: they are short, the endpoint is what can be slow.
+
+Metrics, served at `GET /metrics` (see `app.metrics`) and as JSON at `GET /api/v1/_internal/threadpool`:
+
+- `threadpool_queue_wait_seconds`: Time from the call of a `def` endpoint until it starts in a thread,
+  waiting for its bulkhead and then for a thread of the pool, by project.
+- `threadpool_size`, `threadpool_busy`, `threadpool_waiting`: Tokens, tokens in use and calls waiting, of the
+  pool (`pool="default"`) and of each bulkhead (`pool="<project>"`). `busy / size` is the saturation.
+- `threadpool_saturated_total`: Calls that found the pool or their bulkhead full and had to wait.
+"""
+
+import asyncio
+import functools
+import time
+from collections.abc import Callable
+from typing import Any
+
+from anyio import CapacityLimiter, to_thread
+from fastapi.routing import APIRoute
+from starlette.routing import BaseRoute, request_response
+
+from app.config import settings
+from app.metrics import (
+    COLLECTORS,
+    THREADPOOL_BUSY,
+    THREADPOOL_QUEUE_WAIT,
+    THREADPOOL_SATURATED,
+    THREADPOOL_SIZE,
+    THREADPOOL_WAITING,
+)
+
+DEFAULT_POOL = "default"
+"""Label of the AnyIO default thread pool in the metrics."""
+
+_default_limiter: CapacityLimiter | None = None
+"""The default thread limiter of the event loop of the worker, seen by the last call."""
+
+
+def configure_thread_pool(size: int) -> CapacityLimiter:
+    """Set the threads of the AnyIO default thread pool. Call it from the event loop, see `app.main.lifespan_cycle`.
+
+    Returns:
+        CapacityLimiter: The default thread limiter of the running event loop.
+
+    """
+    global _default_limiter
+    _default_limiter = to_thread.current_default_thread_limiter()
+    _default_limiter.total_tokens = size
+    return _default_limiter
+
+
+class Bulkhead:
+    """The limiter of the `def` endpoints of a project, and their statistics.
+
+    Args:
+        name (str): The project.
+        size (int | None): Calls of the project that may wait for or hold a thread of the pool at once.
+            `None` only measures the calls.
+
+    """
+
+    def __init__(self, name: str, size: int | None):
+        self.name = name
+        self.size = size
+        self.limiter = CapacityLimiter(size) if size else None
+
+    async def run_sync(self, func: Callable[[], Any]) -> Any:
+        """Run `func` in a thread of the default pool, after taking a token of the bulkhead."""
+        global _default_limiter
+        pool = _default_limiter = to_thread.current_default_thread_limiter()
+        start = time.perf_counter()
+
+        def timed():
+            THREADPOOL_QUEUE_WAIT.observe(self.name, seconds=time.perf_counter() - start)
+            return func()
+
+        if self.limiter is None:
+            if pool.available_tokens < 1:
+                THREADPOOL_SATURATED.inc(DEFAULT_POOL)
+            return await to_thread.run_sync(timed, limiter=pool)
+        if self.limiter.available_tokens < 1:
+            THREADPOOL_SATURATED.inc(self.name)
+        THREADPOOL_WAITING.inc(self.name)
+        try:
+            await self.limiter.acquire()
+        finally:
+            THREADPOOL_WAITING.dec(self.name)
+        THREADPOOL_BUSY.inc(self.name)
+        try:
+            if pool.available_tokens < 1:
+                THREADPOOL_SATURATED.inc(DEFAULT_POOL)
+            return await to_thread.run_sync(timed, limiter=pool)
+        finally:
+            THREADPOOL_BUSY.dec(self.name)
+            self.limiter.release()
+
+    def wrap(self, call: Callable[..., Any]) -> Callable[..., Any]:
+        """Return an `async` version of a `def` endpoint that runs it through `run_sync`."""
+
+        @functools.wraps(call)
+        async def endpoint(**values):
+            return await self.run_sync(functools.partial(call, **values))
+
+        return endpoint
+
+
+bulkheads: dict[str, Bulkhead] = {}
+"""The bulkhead of every project with `def` endpoints, by project."""
+
+
+def bulkhead_size(project: str) -> int | None:
+    """Return the size of the bulkhead of a project: its entry in `Settings.bulkheads`, or `Settings.bulkhead_size`."""
+    return settings.bulkheads.get(project, settings.bulkhead_size)
+
+
+def install_bulkheads(routes: list[BaseRoute], project: str) -> int:
+    """Run the `def` endpoints among `routes` through the bulkhead of `project`.
+
+    Each endpoint is replaced by an `async` wrapper (see `Bulkhead.wrap`) and the request handler of its
+    route is built again, so FastAPI awaits the wrapper instead of sending the endpoint to the pool itself.
+    The documentation and the validation of the route do not change.
+
+    Args:
+        routes (list[BaseRoute]): The routes of the project, as installed in the application.
+        project (str): The name of the project.
+
+    Returns:
+        int: The number of endpoints that now go through the bulkhead.
+
+    """
+    wrapped = 0
+    for route in routes:
+        if not isinstance(route, APIRoute) or asyncio.iscoroutinefunction(route.dependant.call):
+            continue
+        if project not in bulkheads:
+            bulkheads[project] = Bulkhead(project, bulkhead_size(project))
+        route.dependant.call = bulkheads[project].wrap(route.dependant.call)
+        route.app = request_response(route.get_route_handler())
+        wrapped += 1
+    return wrapped
+
+
+def threadpool_status() -> dict[str, dict[str, Any]]:
+    """Return the size, the tokens in use and the calls waiting of the pool and of each bulkhead."""
+    status = {}
+    if _default_limiter is not None:
+        statistics = _default_limiter.statistics()
+        status[DEFAULT_POOL] = {
+            "size": int(statistics.total_tokens),
+            "busy": statistics.borrowed_tokens,
+            "waiting": statistics.tasks_waiting,
+        }
+    for name, bulkhead in sorted(bulkheads.items()):
+        if bulkhead.size:
+            status[name] = {
+                "size": bulkhead.size,
+                "busy": THREADPOOL_BUSY.value(name),
+                "waiting": THREADPOOL_WAITING.value(name),
+            }
+    for stats in status.values():
+        stats["saturation"] = stats["busy"] / stats["size"] if stats["size"] else 0.0
+    return status
+
+
+def _collect():
+    """Update the sizes for `/metrics`, and the use of the default pool, which `Bulkhead` does not count."""
+    for name, stats in threadpool_status().items():
+        THREADPOOL_SIZE.set(name, value=stats["size"])
+        if name == DEFAULT_POOL:
+            THREADPOOL_BUSY.set(name, value=stats["busy"])
+            THREADPOOL_WAITING.set(name, value=stats["waiting"])
+
+
+COLLECTORS.append(_collect)
@@ -0,0 +1,10 @@
+"""Benchmarks for the REST server.
+
+Each module is a small command line program, run it from the root of the repository:
+
+```
+python -m benchmarks.<module> --help
+```
+
+They are not part of the test suite and are not installed with the package.
+"""
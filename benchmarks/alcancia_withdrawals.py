@@ -0,0 +1,91 @@
+"""Stress the **Alcancia** withdraw path with several concurrent workers.
+
+Every worker opens its own session and withdraws 1 cent at a time, with the same transaction
+boundaries as the `PUT /transaction/withdraw/{quantity}` route, until the alcancía is empty.
+At the end the benchmark checks the invariants (no overdraft, the running balance matches the
+ledger, exactly `--balance` withdrawals settled) and prints the throughput for each number of workers.
+
+```
+python -m benchmarks.alcancia_withdrawals --workers 1,2,4,8 --balance 2000
+```
+"""
+
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Annotated
+
+import typer
+from sqlalchemy import Engine
+from sqlmodel import Session, create_engine
+
+from app.db import initialize_database
+from app.proyectos.nnieto.ledger import InsufficientFundsError, ledger_totals, record_transaction, verify_balance
+
+cli = typer.Typer(help=__doc__.splitlines()[0])
+
+
+def _withdraw_until_empty(engine: Engine) -> tuple[int, int]:
+    settled = rejected = 0
+    with Session(engine) as db:
+        while True:
+            try:
+                record_transaction(db, -1)
+                db.commit()
+                settled += 1
+            except InsufficientFundsError:
+                db.rollback()
+                rejected += 1
+                return settled, rejected
+
+
+def run(database: Path, workers: int, balance: int) -> float:
+    """Empty an alcancía holding `balance` cents with `workers` threads.
+
+    Args:
+        database (Path): The SQLite file to use, it is created if it does not exist.
+        workers (int): Number of concurrent workers.
+        balance (int): Initial balance, in cents.
+
+    Returns:
+        float: The elapsed time, in seconds.
+
+    """
+    engine = create_engine(f"sqlite:///{database}", connect_args={"check_same_thread": False, "timeout": 60})
+    initialize_database(engine)
+    with Session(engine) as db:
+        record_transaction(db, balance)
+        db.commit()
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        results = list(pool.map(_withdraw_until_empty, [engine] * workers))
+    elapsed = time.perf_counter() - start
+
+    settled = sum(s for s, _ in results)
+    with Session(engine) as db:
+        check = verify_balance(db)
+        transactions = ledger_totals(db).transactions
+    engine.dispose()
+    if settled != balance or not check.ok or check.ledger != 0 or transactions != balance + 1:
+        typer.echo(f"Invariant violated: settled={settled} check={check} transactions={transactions}", err=True)
+        raise typer.Exit(1)
+    return elapsed
+
+
+@cli.command()
+def main(
+    workers: Annotated[str, typer.Option(help="Comma separated list of worker counts")] = "1,2,4,8",
+    balance: Annotated[int, typer.Option(help="Initial balance, one withdrawal per cent")] = 2000,
+):
+    """Run the benchmark once per worker count."""
+    typer.echo(f"{'workers':>8} {'seconds':>10} {'withdrawals/s':>14}")
+    for count in (int(w) for w in workers.split(",")):
+        with tempfile.TemporaryDirectory() as tmp:
+            elapsed = run(Path(tmp) / "alcancia.db", count, balance)
+        typer.echo(f"{count:>8} {elapsed:>10.3f} {balance / elapsed:>14.1f}")
+
+
+if __name__ == "__main__":
+    cli()
@@ -0,0 +1,112 @@
+"""Measure the rows per second of the single-row and the bulk create routes of **Ventas** (`jcontreras`).
+
+The same sales are created three ways, through the whole application (routing, validation, database):
+
+- `single`: One `POST /ventas/` per row, one transaction per row.
+- `bulk-json`: `POST /ventas/bulk` with a JSON array of `--batch` rows per request.
+- `bulk-ndjson`: The same, with a newline-delimited JSON body.
+
+Every run uses a new SQLite file, with the pragmas of `app.db`.
+
+```
+python -m benchmarks.bulk_insert --rows 5000 --batch 1000
+```
+"""
+
+import json
+import tempfile
+import time
+from collections.abc import Callable
+from pathlib import Path
+from typing import Annotated
+
+import typer
+from fastapi.testclient import TestClient
+from sqlmodel import Session, SQLModel
+
+from app.db import create_database_engine, get_session
+from app.main import app, load_routes
+from app.proyectos.jcontreras.models import Sale
+from app.table_versions import TableVersion
+
+cli = typer.Typer(help=__doc__.splitlines()[0])
+
+VENTAS = "/api/v1/jcontreras/ventas"
+
+
+def _ventas(rows: int) -> list[dict]:
+    return [{"cliente": f"Cliente {row}", "producto": "Laptop Dell", "cantidad": 1, "precio": 15000.0} for row in range(rows)]
+
+
+def _single(client: TestClient, ventas: list[dict], batch: int):  # noqa: ARG001
+    for venta in ventas:
+        client.post(f"{VENTAS}/", json=venta).raise_for_status()
+
+
+def _bulk_json(client: TestClient, ventas: list[dict], batch: int):
+    for start in range(0, len(ventas), batch):
+        client.post(f"{VENTAS}/bulk", json=ventas[start : start + batch]).raise_for_status()
+
+
+def _bulk_ndjson(client: TestClient, ventas: list[dict], batch: int):
+    for start in range(0, len(ventas), batch):
+        body = "\n".join(json.dumps(venta) for venta in ventas[start : start + batch])
+        client.post(f"{VENTAS}/bulk", content=body, headers={"Content-Type": "application/x-ndjson"}).raise_for_status()
+
+
+PATHS: dict[str, Callable[[TestClient, list[dict], int], None]] = {
+    "single": _single,
+    "bulk-json": _bulk_json,
+    "bulk-ndjson": _bulk_ndjson,
+}
+
+
+def run(database: Path, path: str, rows: int, batch: int) -> float:
+    """Create `rows` sales through one of the `PATHS` and return the seconds it took.
+
+    Args:
+        database (Path): The SQLite file, it is created with the table of the sales.
+        path (str): The name of the path in `PATHS`.
+        rows (int): Number of sales to create.
+        batch (int): Rows per request of the bulk paths.
+
+    Returns:
+        float: The elapsed seconds.
+
+    """
+    db_engine = create_database_engine(f"sqlite:///{database}")
+    SQLModel.metadata.create_all(db_engine, tables=[Sale.__table__, TableVersion.__table__])
+
+    def get_session_override():
+        with Session(db_engine) as session:
+            yield session
+
+    app.dependency_overrides[get_session] = get_session_override
+    load_routes(app)
+    ventas = _ventas(rows)
+    try:
+        with TestClient(app) as client:
+            start = time.perf_counter()
+            PATHS[path](client, ventas, batch)
+            elapsed = time.perf_counter() - start
+    finally:
+        app.dependency_overrides.clear()
+        db_engine.dispose()
+    return elapsed
+
+
+@cli.command()
+def main(
+    rows: Annotated[int, typer.Option(help="Sales created by each path")] = 5000,
+    batch: Annotated[int, typer.Option(help="Rows per request of the bulk paths")] = 1000,
+):
+    """Compare the rows per second of the single-row and the bulk create routes."""
+    typer.echo(f"{'path':>12} {'rows':>8} {'seconds':>8} {'rows/s':>10}")
+    for path in PATHS:
+        with tempfile.TemporaryDirectory() as tmp:
+            elapsed = run(Path(tmp) / "database.db", path, rows, batch)
+        typer.echo(f"{path:>12} {rows:>8} {elapsed:>8.2f} {rows / elapsed:>10.0f}")
+
+
+if __name__ == "__main__":
+    cli()
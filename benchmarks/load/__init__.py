@@ -0,0 +1,18 @@
+"""HTTP load tests of the server, with per-project scenarios.
+
+The tests in `tests/` call the routes through `TestClient`, one request at a time. This package answers
+the other questions: how many deposits per second the **Alcancía** sustains, or what the p99 of creating
+a contact is with 64 clients. It starts the real server (uvicorn, see `harness.serve`) on a new SQLite
+database, sends the requests of a scenario (see `scenarios.SCENARIOS`) from concurrent `httpx` clients,
+and reports the throughput, the latency percentiles and the error rate of every step.
+
+```
+python -m benchmarks.load list
+python -m benchmarks.load run alcancia-deposits --clients 64 --duration 10
+python -m benchmarks.load run nnieto jcontreras --json reports/load.json
+python -m benchmarks.load run ventas-read --url http://127.0.0.1:8000
+```
+
+`run` accepts scenario names or project names (every scenario of the project). With `--url` the load
+goes to a server that is already running instead, and its database is not reset between scenarios.
+"""
@@ -0,0 +1,68 @@
+"""Command line of the load tests, see the documentation of `benchmarks.load`."""
+
+import asyncio
+import contextlib
+import json
+from pathlib import Path
+from typing import Annotated, Any
+
+import typer
+
+from . import __doc__ as package_doc
+from .harness import PERCENTILES, run_scenario, serve, summarize
+from .scenarios import SCENARIOS, get_scenarios
+
+cli = typer.Typer(help=package_doc.splitlines()[0], no_args_is_help=True)
+
+
+@cli.command("list")
+def list_scenarios():
+    """List the scenarios."""
+    typer.echo(f"{'scenario':<20} {'project':<12} {'kind':<6} description")
+    for scenario in SCENARIOS:
+        typer.echo(f"{scenario.name:<20} {scenario.project:<12} {scenario.kind:<6} {scenario.description}")
+
+
+def _echo_summary(report: dict[str, Any]):
+    columns = "".join(f"{f'p{p} ms':>9}" for p in PERCENTILES)
+    typer.echo(f"\n{report['scenario']} ({report['kind']}, {report['clients']} clients, {report['seconds']:.1f} s)")
+    typer.echo(f"  {'step':<14} {'requests':>9} {'req/s':>9}{columns} {'max ms':>9} {'errors':>7}")
+    for name, stats in [*report["steps"].items(), ("total", report["total"])]:
+        percentiles = "".join(f"{stats[f'p{p}_ms']:>9.1f}" for p in PERCENTILES)
+        typer.echo(
+            f"  {name:<14} {stats['requests']:>9} {stats['rps']:>9.1f}{percentiles} "
+            f"{stats['max_ms']:>9.1f} {stats['error_rate']:>7.1%}",
+        )
+
+
+@cli.command("run")
+def run(
+    names: Annotated[list[str], typer.Argument(help="Scenarios or projects to run")],
+    clients: Annotated[int, typer.Option(help="Concurrent clients")] = 16,
+    duration: Annotated[float, typer.Option(help="Seconds of measurement of each scenario")] = 10.0,
+    workers: Annotated[int, typer.Option(help="Worker processes of the server")] = 1,
+    url: Annotated[str | None, typer.Option(help="Use a running server instead of starting one")] = None,
+    json_path: Annotated[Path | None, typer.Option("--json", help="Write the reports to this file")] = None,
+):
+    """Run scenarios against a new server each, and print their reports."""
+    try:
+        scenarios = get_scenarios(names)
+    except KeyError as e:
+        typer.echo(f"Unknown scenario or project: {e.args[0]}. See `python -m benchmarks.load list`", err=True)
+        raise typer.Exit(code=1) from e
+    reports = []
+    for scenario in scenarios:
+        server = contextlib.nullcontext(url) if url else serve(workers=workers)
+        with server as base_url:
+            samples, elapsed = asyncio.run(run_scenario(base_url, scenario, clients, duration))
+        report = summarize(scenario, samples, elapsed, clients)
+        reports.append(report)
+        _echo_summary(report)
+    if json_path is not None:
+        json_path.parent.mkdir(parents=True, exist_ok=True)
+        json_path.write_text(json.dumps(reports, indent=2))
+        typer.echo(f"\nReports written to {json_path}")
+
+
+if __name__ == "__main__":
+    cli()
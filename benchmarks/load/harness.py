@@ -0,0 +1,205 @@
+"""Boot the server and run the load of a scenario against it.
+
+- `serve` starts `uvicorn app.main:app` in its own process, with a new SQLite database in a temporary
+  directory, and waits until it answers. The output of the server goes to `server.log` in that directory.
+- `run_scenario` opens `clients` concurrent `httpx.AsyncClient` connections. Each client sends the steps
+  of the scenario, picked at random by weight, one after the other until the time is up, and records the
+  status and the latency of every request.
+- `summarize` turns the samples into the report: requests per second, latency percentiles and error
+  rate, for the whole scenario and for each step.
+"""
+
+import asyncio
+import contextlib
+import itertools
+import math
+import os
+import random
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+from collections import Counter, defaultdict
+from collections.abc import Iterator
+from pathlib import Path
+from typing import Any
+
+import httpx
+
+from .scenarios import Scenario, Step
+
+READY_TIMEOUT = 30.0
+"""Seconds to wait for the server to answer after starting it."""
+
+PERCENTILES = (50, 90, 99)
+
+
+def free_port() -> int:
+    """Return a TCP port that nothing listens on."""
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+@contextlib.contextmanager
+def serve(workers: int = 1, env: dict[str, str] | None = None) -> Iterator[str]:
+    """Run the server with a new database until the end of the `with` block.
+
+    Args:
+        workers (int): Worker processes of uvicorn.
+        env (dict[str, str] | None): More environment variables for the server, for example settings.
+
+    Yields:
+        str: The base URL of the server.
+
+    Raises:
+        RuntimeError: If the server exits or does not answer within `READY_TIMEOUT` seconds.
+
+    """
+    port = free_port()
+    with tempfile.TemporaryDirectory() as tmp:
+        server_env = {
+            **os.environ,
+            "DATABASE_URL": f"sqlite:///{Path(tmp) / 'database.db'}",
+            "VERBOSE": "false",
+            **(env or {}),
+        }
+        command = [sys.executable, "-m", "uvicorn", "app.main:app", "--host", "127.0.0.1", "--port", str(port)]
+        command += ["--workers", str(workers), "--log-level", "warning", "--no-access-log"]
+        log_path = Path(tmp) / "server.log"
+        with log_path.open("w") as log:
+            server = subprocess.Popen(command, env=server_env, stdout=log, stderr=subprocess.STDOUT)  # noqa: S603
+        base_url = f"http://127.0.0.1:{port}"
+        try:
+            _wait_until_ready(server, base_url, log_path)
+            yield base_url
+        finally:
+            server.terminate()
+            server.wait(timeout=READY_TIMEOUT)
+
+
+def _wait_until_ready(server: subprocess.Popen, base_url: str, log_path: Path):
+    deadline = time.monotonic() + READY_TIMEOUT
+    while time.monotonic() < deadline:
+        if server.poll() is not None:
+            break
+        with contextlib.suppress(httpx.TransportError):
+            if httpx.get(f"{base_url}/metrics").status_code == httpx.codes.OK:
+                return
+        time.sleep(0.1)
+    log = "\n".join(log_path.read_text().splitlines()[-20:])
+    raise RuntimeError(f"The server did not start (status {server.poll()}):\n{log}")
+
+
+def _request(step: Step, n: int, rows: int) -> dict[str, Any]:
+    request: dict[str, Any] = {
+        "method": step.method,
+        "url": step.path.format(n=n, row=random.randint(1, max(rows, 1))),  # noqa: S311
+    }
+    if step.body is not None:
+        request["json"] = step.body(n)
+    return request
+
+
+async def seed(client: httpx.AsyncClient, scenario: Scenario):
+    """Send the seed requests of a scenario, in order.
+
+    Raises:
+        RuntimeError: If a seed request fails.
+
+    """
+    for n, step in enumerate(scenario.seed, start=1):
+        response = await client.request(**_request(step, n, scenario.seed_rows))
+        if response.status_code not in step.expect:
+            raise RuntimeError(f"Seed {step.path} failed: {response.status_code} {response.text[:200]}")
+
+
+async def run_scenario(
+    base_url: str,
+    scenario: Scenario,
+    clients: int,
+    duration: float,
+) -> tuple[list[tuple[str, int, float]], float]:
+    """Run the load of a scenario.
+
+    Args:
+        base_url (str): The URL of the server.
+        scenario (Scenario): The scenario.
+        clients (int): Concurrent clients, each one waits for its response before sending the next request.
+        duration (float): Seconds of measurement, after the seed.
+
+    Returns:
+        tuple[list[tuple[str, int, float]], float]: The `(step, status, seconds)` of every request, and the
+        elapsed seconds. A request that did not get a response has the status `0`.
+
+    """
+    limits = httpx.Limits(max_connections=clients, max_keepalive_connections=clients)
+    async with httpx.AsyncClient(base_url=base_url, limits=limits, timeout=60.0) as client:
+        await seed(client, scenario)
+        steps = list(scenario.steps)
+        weights = [step.weight for step in steps]
+        counter = itertools.count(1)
+        samples: list[tuple[str, int, float]] = []
+
+        async def worker(deadline: float):
+            while time.perf_counter() < deadline:
+                step = random.choices(steps, weights)[0]  # noqa: S311
+                request = _request(step, next(counter), scenario.seed_rows)
+                start = time.perf_counter()
+                try:
+                    status = (await client.request(**request)).status_code
+                except httpx.HTTPError:
+                    status = 0
+                samples.append((step.name, status, time.perf_counter() - start))
+
+        start = time.perf_counter()
+        await asyncio.gather(*(worker(start + duration) for _ in range(clients)))
+        return samples, time.perf_counter() - start
+
+
+def _percentile(latencies: list[float], percentile: int) -> float:
+    """Return a percentile of sorted latencies, by the nearest-rank method."""
+    if not latencies:
+        return 0.0
+    rank = max(math.ceil(percentile / 100 * len(latencies)), 1)
+    return latencies[rank - 1]
+
+
+def _stats(samples: list[tuple[bool, float]], elapsed: float) -> dict[str, Any]:
+    """Return the totals of `(ok, seconds)` samples."""
+    latencies = sorted(latency for _, latency in samples)
+    errors = sum(not ok for ok, _ in samples)
+    return {
+        "requests": len(samples),
+        "errors": errors,
+        "error_rate": errors / len(samples) if samples else 0.0,
+        "rps": len(samples) / elapsed if elapsed else 0.0,
+        **{f"p{p}_ms": _percentile(latencies, p) * 1000 for p in PERCENTILES},
+        "max_ms": latencies[-1] * 1000 if latencies else 0.0,
+    }
+
+
+def summarize(
+    scenario: Scenario,
+    samples: list[tuple[str, int, float]],
+    elapsed: float,
+    clients: int,
+) -> dict[str, Any]:
+    """Build the report of a run: the totals of the scenario and of each of its steps."""
+    expect = {step.name: step.expect for step in scenario.steps}
+    by_step: dict[str, list[tuple[bool, float]]] = defaultdict(list)
+    status_codes: Counter[int] = Counter()
+    for step, status, latency in samples:
+        by_step[step].append((status in expect[step], latency))
+        status_codes[status] += 1
+    return {
+        "scenario": scenario.name,
+        "project": scenario.project,
+        "kind": scenario.kind,
+        "clients": clients,
+        "seconds": elapsed,
+        "total": _stats([sample for step in scenario.steps for sample in by_step[step.name]], elapsed),
+        "steps": {step.name: _stats(by_step[step.name], elapsed) for step in scenario.steps},
+        "status_codes": {str(status): count for status, count in sorted(status_codes.items())},
+    }
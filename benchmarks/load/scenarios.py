@@ -0,0 +1,157 @@
+"""Declarative load scenarios, per project.
+
+A `Scenario` is a weighted list of `Step` requests that every client repeats until the end of the run,
+plus `seed` requests sent once before the measurement starts. Paths and bodies are built from the
+number of the request, `n`, so the writes do not collide, and reads pick a seeded row with `{row}`.
+
+Add a scenario by appending it to `SCENARIOS`:
+
+```python
+    Scenario(
+        name="ventas-read",
+        project="jcontreras",
+        kind="read",
+        description="Pages and single sales",
+        seed=(Step("seed", "POST", "/api/v1/jcontreras/ventas/bulk", body=lambda n: [...]),),
+        seed_rows=1000,
+        steps=(
+            Step("list", "GET", "/api/v1/jcontreras/ventas/?limit=50", weight=3),
+            Step("get", "GET", "/api/v1/jcontreras/ventas/{row}"),
+        ),
+    )
+```
+"""
+
+from collections.abc import Callable
+from typing import Any, Literal, NamedTuple
+
+Kind = Literal["read", "write", "mixed"]
+
+
+class Step(NamedTuple):
+    """One kind of request of a scenario."""
+
+    name: str
+    method: str
+    path: str
+    """Path of the request. `{n}` is replaced with the number of the request, `{row}` with a seeded row id."""
+    weight: int = 1
+    """Relative frequency of the step in the scenario."""
+    body: Callable[[int], Any] | None = None
+    """Builds the JSON body from the number of the request."""
+    expect: tuple[int, ...] = (200, 201)
+    """Status codes that count as a success."""
+
+
+class Scenario(NamedTuple):
+    """A load scenario of a project."""
+
+    name: str
+    project: str
+    kind: Kind
+    description: str
+    steps: tuple[Step, ...]
+    seed: tuple[Step, ...] = ()
+    """Requests sent once, in order, before the measurement."""
+    seed_rows: int = 0
+    """Rows created by `seed`, the range of `{row}` in the paths of the steps."""
+
+
+ALCANCIA = "/api/v1/nnieto/alcancia"
+CONTACTOS = "/api/v1/rpalma/contactos"
+VENTAS = "/api/v1/jcontreras/ventas"
+
+
+def _contacto(n: int) -> dict[str, Any]:
+    return {"nombre": f"Contacto {n}", "telefono": f"66{n:08d}", "correo": f"contacto{n}@example.com"}
+
+
+def _venta(n: int) -> dict[str, Any]:
+    return {"cliente": f"Cliente {n}", "producto": "Monitor LG", "cantidad": 1 + n % 5, "precio": 5000.0}
+
+
+def _seed_ventas(rows: int) -> Step:
+    return Step("seed", "POST", f"{VENTAS}/bulk", body=lambda _: [_venta(n) for n in range(rows)])
+
+
+SCENARIOS: list[Scenario] = [
+    Scenario(
+        name="alcancia-deposits",
+        project="nnieto",
+        kind="write",
+        description="Deposits only, each one updates the running balance",
+        steps=(Step("deposit", "PUT", f"{ALCANCIA}/transaction/deposit/{{n}}"),),
+    ),
+    Scenario(
+        name="alcancia-mixed",
+        project="nnieto",
+        kind="mixed",
+        description="Pages of the ledger, with one deposit for every four reads",
+        seed=tuple(Step("seed", "PUT", f"{ALCANCIA}/transaction/deposit/{n + 1}") for n in range(100)),
+        steps=(
+            Step("transactions", "GET", f"{ALCANCIA}/transactions?limit=50", weight=4),
+            Step("deposit", "PUT", f"{ALCANCIA}/transaction/deposit/{{n}}"),
+        ),
+    ),
+    Scenario(
+        name="contactos-create",
+        project="rpalma",
+        kind="write",
+        description="New contacts, each response lists the whole agenda",
+        steps=(Step("create", "POST", f"{CONTACTOS}/create", body=_contacto),),
+    ),
+    Scenario(
+        name="contactos-read",
+        project="rpalma",
+        kind="read",
+        description="The agenda and searches by name",
+        seed=tuple(Step("seed", "POST", f"{CONTACTOS}/create", body=lambda _, n=n: _contacto(n + 1)) for n in range(200)),
+        seed_rows=200,
+        steps=(
+            Step("agenda", "GET", f"{CONTACTOS}/agenda?limit=50", weight=3),
+            Step("search", "GET", f"{CONTACTOS}/search/Contacto {{row}}"),
+        ),
+    ),
+    Scenario(
+        name="ventas-read",
+        project="jcontreras",
+        kind="read",
+        description="Pages of sales and sales by id",
+        seed=(_seed_ventas(10_000),),
+        seed_rows=10_000,
+        steps=(
+            Step("list", "GET", f"{VENTAS}/?limit=50", weight=3),
+            Step("get", "GET", f"{VENTAS}/{{row}}", weight=3),
+        ),
+    ),
+    Scenario(
+        name="ventas-mixed",
+        project="jcontreras",
+        kind="mixed",
+        description="Reads of sales, with one new sale for every four reads",
+        seed=(_seed_ventas(10_000),),
+        seed_rows=10_000,
+        steps=(
+            Step("list", "GET", f"{VENTAS}/?limit=50", weight=2),
+            Step("get", "GET", f"{VENTAS}/{{row}}", weight=2),
+            Step("create", "POST", f"{VENTAS}/", body=_venta),
+        ),
+    ),
+]
+"""Every scenario, see `python -m benchmarks.load list`."""
+
+
+def get_scenarios(names: list[str]) -> list[Scenario]:
+    """Return the scenarios with those names, or the scenarios of the projects with those names.
+
+    Raises:
+        KeyError: If a name is neither a scenario nor a project with scenarios.
+
+    """
+    selected = []
+    for name in names:
+        matches = [s for s in SCENARIOS if name in (s.name, s.project)]
+        if not matches:
+            raise KeyError(name)
+        selected.extend(s for s in matches if s not in selected)
+    return selected
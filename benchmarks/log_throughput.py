@@ -0,0 +1,66 @@
+"""Compare the cost of logging on the thread that handles the request.
+
+Each "request" logs the same messages as a typical handler of `app.proyectos`: a few `INFO`
+lines and one `DEBUG` line with arguments. The time is measured on the logging thread, which is the
+time the request waits; for the `json` format the `QueueListener` still writes every line in the background.
+
+- `rich`: The development format, `RichHandler` writing synchronously.
+- `json`: JSON lines through a `QueueHandler` and a `QueueListener`.
+- `json-sampled`: The same, keeping 1 of every 10 repeated `DEBUG`/`INFO` messages.
+
+```
+python -m benchmarks.log_throughput --requests 5000
+```
+"""
+
+import logging
+import os
+import time
+from typing import Annotated
+
+import typer
+
+from app.log_utils import setup_logging
+
+cli = typer.Typer(help=__doc__.splitlines()[0])
+
+PROFILES: dict[str, dict] = {
+    "rich": {"log_format": "rich"},
+    "json": {"log_format": "json"},
+    "json-sampled": {"log_format": "json", "sample_rate": 0.1},
+}
+
+
+def handle_request(logger: logging.Logger, i: int):
+    """Log like a handler that records a transaction."""
+    logger.info("Creando transacción")
+    logger.debug("Saldo anterior %d, cantidad %d", i * 100, i)
+    logger.info("Transacción %d registrada", i)
+
+
+def run(profile: str, requests: int) -> float:
+    """Log `requests` requests with `profile` and return the elapsed time in seconds."""
+    name = f"benchmark.{profile}"
+    with open(os.devnull, "w") as devnull:  # noqa: PTH123
+        listener = setup_logging(logging.DEBUG, name=name, stream=devnull, **PROFILES[profile])
+        logger = logging.getLogger(name)
+        start = time.perf_counter()
+        for i in range(requests):
+            handle_request(logger, i)
+        elapsed = time.perf_counter() - start
+        if listener is not None:
+            listener.stop()
+    return elapsed
+
+
+@cli.command()
+def main(requests: Annotated[int, typer.Option(help="Number of simulated requests per profile")] = 5000):
+    """Report the logging time per request of each profile."""
+    typer.echo(f"{'profile':<14} {'requests/s':>12} {'µs/request':>12}")
+    for profile in PROFILES:
+        elapsed = run(profile, requests)
+        typer.echo(f"{profile:<14} {requests / elapsed:>12.0f} {elapsed / requests * 1e6:>12.1f}")
+
+
+if __name__ == "__main__":
+    cli()
@@ -0,0 +1,320 @@
+"""Micro-benchmarks of the hot paths, with stored baselines to catch regressions.
+
+Each case times one small piece of the server in isolation, on synthetic data, with `timeit`:
+
+- `read_balance`: The balance of the **Alcancia**, read from its running total, with 10k and 1M
+  transactions. `ledger_totals` is the full scan it replaced.
+- `search_client_by_name`: The search of the hotel of `imoreno`, on 10k clients.
+- `OperationResponse` and `CarroResponse`: Building and serializing the response models.
+- `moneyfmt`: The money formatter of `frontend.nnieto.utils`.
+- `load_routes`: Installing the routers of every project in a new application.
+
+Each case runs `--repeat` times, and the times are per call. `save` stores them in
+`benchmarks/baselines/micro.json`; `compare` runs the cases again and exits with status 1 if one of them
+is slower than its baseline by more than `--threshold`. It compares the fastest run of each case, the one
+least disturbed by the rest of the machine, but the cases of a few microseconds still move by 20% or more
+on a busy machine. Baselines are only comparable on the same machine, save your own before changing the code.
+
+```
+python -m benchmarks.micro run
+python -m benchmarks.micro run --filter read_balance
+python -m benchmarks.micro save
+python -m benchmarks.micro compare --threshold 0.25
+```
+"""
+
+import asyncio
+import contextlib
+import fnmatch
+import json
+import logging
+import platform
+import statistics
+import sys
+import tempfile
+import timeit
+from collections.abc import Callable
+from datetime import UTC, datetime
+from decimal import Decimal
+from pathlib import Path
+from typing import Annotated, Any, NamedTuple
+
+import typer
+from fastapi import FastAPI
+from sqlalchemy import Engine, insert
+from sqlalchemy.ext.asyncio import AsyncEngine
+from sqlmodel import Session, SQLModel
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+from app.db import create_async_database_engine, create_database_engine
+
+cli = typer.Typer(help=__doc__.splitlines()[0], no_args_is_help=True)
+
+BASELINE = Path(__file__).parent / "baselines" / "micro.json"
+SEED_CHUNK = 100_000
+
+
+class Case(NamedTuple):
+    """A micro-benchmark: `setup` prepares the data and returns the function to time."""
+
+    name: str
+    setup: Callable[["Fixtures"], Callable[[], Any]]
+
+
+CASES: list[Case] = []
+
+
+def case(name: str) -> Callable:
+    """Register a case, see `Case`."""
+
+    def register(setup: Callable[["Fixtures"], Callable[[], Any]]) -> Callable:
+        CASES.append(Case(name, setup))
+        return setup
+
+    return register
+
+
+class Fixtures:
+    """Synthetic databases, created once per run and shared by the cases that need them."""
+
+    def __init__(self, directory: Path):
+        self.directory = directory
+        self.loop = asyncio.new_event_loop()
+        self._databases: dict[tuple[str, int], tuple[Engine, AsyncEngine]] = {}
+
+    def database(self, name: str, rows: int, fill: Callable[[Session, int], None]) -> tuple[Engine, AsyncEngine]:
+        """Return the engines of a database with every table, filled once by `fill(db, rows)`."""
+        key = (name, rows)
+        if key not in self._databases:
+            url = f"sqlite:///{self.directory / f'{name}-{rows}.db'}"
+            engine = create_database_engine(url)
+            SQLModel.metadata.create_all(engine)
+            with Session(engine) as db:
+                fill(db, rows)
+                db.commit()
+            self._databases[key] = (engine, create_async_database_engine(url))
+        return self._databases[key]
+
+    def run_async(self, function: Callable[[], Any]) -> Callable[[], Any]:
+        """Return a function that runs the coroutine function `function` to completion."""
+        return lambda: self.loop.run_until_complete(function())
+
+    def close(self):
+        """Dispose of the engines and close the event loop."""
+        for engine, async_engine in self._databases.values():
+            engine.dispose()
+            self.loop.run_until_complete(async_engine.dispose())
+        self.loop.close()
+
+
+def _seed(db: Session, table: Any, row: Callable[[int], dict[str, Any]], rows: int):
+    """Insert `rows` rows in chunks, with one `executemany` each."""
+    for start in range(0, rows, SEED_CHUNK):
+        db.execute(insert(table), [row(n) for n in range(start, min(start + SEED_CHUNK, rows))])
+
+
+def _alcancia(db: Session, rows: int):
+    from app.proyectos.nnieto.ledger import rebuild_balance
+    from app.proyectos.nnieto.models import Transaction
+
+    now = datetime.now(UTC)
+    _seed(db, Transaction.__table__, lambda n: {"amount": 100 if n % 3 else -50, "created_at": now}, rows)
+    rebuild_balance(db)
+
+
+def _hotel(db: Session, rows: int):
+    from app.proyectos.imoreno.models import Operation
+
+    now = datetime.now(UTC)
+    _seed(
+        db,
+        Operation.__table__,
+        lambda n: {
+            "first_name": f"Nombre{n}",
+            "middle_name": f"Segundo{n % 100}",
+            "last_name": f"Apellido{n % 1000}",
+            "email": f"cliente{n}@example.com",
+            "room": n % 500,
+            "check_in": now,
+        },
+        rows,
+    )
+
+
+def _read_balance(rows: int) -> Callable[[Fixtures], Callable[[], Any]]:
+    def setup(fixtures: Fixtures) -> Callable[[], Any]:
+        from app.proyectos.nnieto.ledger import read_balance
+
+        engine, _ = fixtures.database("alcancia", rows, _alcancia)
+
+        def balance():
+            with Session(engine) as db:
+                return read_balance(db)
+
+        return balance
+
+    return setup
+
+
+def _ledger_totals(rows: int) -> Callable[[Fixtures], Callable[[], Any]]:
+    def setup(fixtures: Fixtures) -> Callable[[], Any]:
+        from app.proyectos.nnieto.ledger import ledger_totals
+
+        engine, _ = fixtures.database("alcancia", rows, _alcancia)
+
+        def totals():
+            with Session(engine) as db:
+                return ledger_totals(db)
+
+        return totals
+
+    return setup
+
+
+for _rows, _label in ((10_000, "10k"), (1_000_000, "1M")):
+    case(f"read_balance[{_label}]")(_read_balance(_rows))
+    case(f"ledger_totals[{_label}]")(_ledger_totals(_rows))
+
+
+@case("search_client_by_name[10k]")
+def _search_client_by_name(fixtures: Fixtures) -> Callable[[], Any]:
+    from app.proyectos.imoreno.routes import search_client_by_name
+
+    _, async_engine = fixtures.database("hotel", 10_000, _hotel)
+
+    async def search():
+        async with AsyncSession(async_engine, expire_on_commit=False) as db:
+            return await search_client_by_name(db, "Nombre9876", "Segundo76", "Apellido876")
+
+    return fixtures.run_async(search)
+
+
+@case("OperationResponse")
+def _operation_response(fixtures: Fixtures) -> Callable[[], Any]:  # noqa: ARG001
+    from app.proyectos.imoreno.schemas import OperationResponse, OperationResult
+
+    client = {"client_id": 1, "first_name": "Isai", "middle_name": "Moreno", "last_name": "Mendoza", "room": 101}
+    return lambda: OperationResponse(
+        result=OperationResult.success,
+        previous_data=None,
+        data=client,
+    ).model_dump_json()
+
+
+@case("CarroResponse")
+def _carro_response(fixtures: Fixtures) -> Callable[[], Any]:  # noqa: ARG001
+    from app.proyectos.fcalzada.schemas import CarroResponse
+
+    return lambda: CarroResponse.model_validate(
+        {"result": "registrado", "previous_inventory": 5, "inventory": 6},
+    ).model_dump_json()
+
+
+@case("moneyfmt")
+def _moneyfmt(fixtures: Fixtures) -> Callable[[], Any]:  # noqa: ARG001
+    from frontend.nnieto.utils import moneyfmt
+
+    value = Decimal("-1234567.8901")
+    return lambda: moneyfmt(value, curr="$", neg="(", trailneg=")")
+
+
+@case("load_routes")
+def _load_routes(fixtures: Fixtures) -> Callable[[], Any]:  # noqa: ARG001
+    from app.main import load_routes
+
+    def load():
+        fastapi_app = FastAPI()
+        fastapi_app.state.lazy_routes = {}
+        load_routes(fastapi_app)
+
+    return load
+
+
+def measure(function: Callable[[], Any], repeat: int) -> dict[str, float]:
+    """Time a function: the median and the minimum of `repeat` runs, in microseconds per call."""
+    timer = timeit.Timer(function)
+    number, _ = timer.autorange()
+    times = [total / number * 1e6 for total in timer.repeat(repeat=repeat, number=number)]
+    return {"median_us": statistics.median(times), "min_us": min(times), "loops": number}
+
+
+def run_cases(pattern: str, repeat: int) -> dict[str, dict[str, float]]:
+    """Run the cases whose name matches the glob `pattern`, and return their times by name."""
+    selected = [c for c in CASES if fnmatch.fnmatch(c.name, pattern)]
+    results = {}
+    # The log lines would be measured too
+    logging.disable(logging.INFO)
+    with tempfile.TemporaryDirectory() as tmp, contextlib.closing(Fixtures(Path(tmp))) as fixtures:
+        for benchmark in selected:
+            results[benchmark.name] = measure(benchmark.setup(fixtures), repeat)
+            typer.echo(f"{benchmark.name:<28} {results[benchmark.name]['median_us']:>12.2f} µs", err=True)
+    logging.disable(logging.NOTSET)
+    return results
+
+
+def _machine() -> dict[str, str]:
+    return {"python": sys.version.split()[0], "platform": platform.platform(), "processor": platform.machine()}
+
+
+@cli.command()
+def run(
+    pattern: Annotated[str, typer.Option("--filter", help="Only the cases that match this glob")] = "*",
+    repeat: Annotated[int, typer.Option(help="Runs of each case, the median is reported")] = 5,
+):
+    """Run the cases and print their times."""
+    results = run_cases(pattern, repeat)
+    typer.echo(f"{'case':<28} {'median µs':>12} {'min µs':>12} {'loops':>8}")
+    for name, result in results.items():
+        typer.echo(f"{name:<28} {result['median_us']:>12.2f} {result['min_us']:>12.2f} {result['loops']:>8}")
+
+
+@cli.command()
+def save(
+    pattern: Annotated[str, typer.Option("--filter", help="Only the cases that match this glob")] = "*",
+    repeat: Annotated[int, typer.Option(help="Runs of each case")] = 5,
+    baseline: Annotated[Path, typer.Option(help="File of the baselines")] = BASELINE,
+):
+    """Run the cases and store their times as the baselines (the other cases keep theirs)."""
+    stored = json.loads(baseline.read_text()) if baseline.exists() else {"cases": {}}
+    stored["cases"] |= run_cases(pattern, repeat)
+    stored["machine"] = _machine()
+    baseline.parent.mkdir(parents=True, exist_ok=True)
+    baseline.write_text(json.dumps(stored, indent=2, sort_keys=True) + "\n")
+    typer.echo(f"Baselines saved in {baseline}")
+
+
+@cli.command()
+def compare(
+    pattern: Annotated[str, typer.Option("--filter", help="Only the cases that match this glob")] = "*",
+    repeat: Annotated[int, typer.Option(help="Runs of each case, the fastest is compared")] = 5,
+    threshold: Annotated[float, typer.Option(help="Slowdown that counts as a regression, 0.1 is 10%")] = 0.15,
+    baseline: Annotated[Path, typer.Option(help="File of the baselines")] = BASELINE,
+):
+    """Run the cases and compare them with the baselines. Exits with status 1 on a regression."""
+    if not baseline.exists():
+        typer.echo(f"There are no baselines in {baseline}, run `save` first", err=True)
+        raise typer.Exit(code=1)
+    stored = json.loads(baseline.read_text())
+    if stored.get("machine") != _machine():
+        typer.echo(f"The baselines were saved on another machine: {stored.get('machine')}", err=True)
+    results = run_cases(pattern, repeat)
+    regressions = []
+    typer.echo(f"{'case':<28} {'baseline µs':>12} {'now µs':>12} {'change':>8}  (fastest runs)")
+    for name, result in results.items():
+        before = stored["cases"].get(name)
+        if before is None:
+            typer.echo(f"{name:<28} {'-':>12} {result['min_us']:>12.2f} {'new':>8}")
+            continue
+        change = result["min_us"] / before["min_us"] - 1
+        mark = ""
+        if change > threshold:
+            regressions.append(name)
+            mark = "  REGRESSION"
+        typer.echo(f"{name:<28} {before['min_us']:>12.2f} {result['min_us']:>12.2f} {change:>+8.1%}{mark}")
+    if regressions:
+        typer.echo(f"{len(regressions)} regressions above {threshold:.0%}: {', '.join(regressions)}", err=True)
+        raise typer.Exit(code=1)
+
+
+if __name__ == "__main__":
+    cli()
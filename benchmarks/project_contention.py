@@ -0,0 +1,119 @@
+"""Measure the write contention between two projects sharing one SQLite file.
+
+Writers of the **Alcancia** (`nnieto`, deposits) and of **Ventas** (`jcontreras`, sales) commit one row
+per transaction at the same time. SQLite has a single writer lock per file, so when both projects share
+`database.db` every commit of one project waits for the commits of the other. The benchmark runs the same
+load twice: with a shared file, and with one file per project (see `Settings.project_database_dir`), and
+prints the throughput and the commit latency of each project.
+
+```
+python -m benchmarks.project_contention --writers 4 --rows 500
+```
+"""
+
+import statistics
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Annotated
+
+import typer
+from sqlalchemy import Engine
+from sqlmodel import Session, SQLModel
+
+from app.db import create_database_engine, initialize_database
+from app.proyectos.jcontreras.models import Sale
+from app.proyectos.nnieto.ledger import record_transaction
+from app.table_versions import TableVersion
+
+cli = typer.Typer(help=__doc__.splitlines()[0])
+
+PROJECT_TABLES = {
+    "nnieto": ["alcancia_transaction", "alcancia_balance"],
+    "jcontreras": ["ventas"],
+}
+
+
+def _deposit(db: Session, row: int):
+    record_transaction(db, row + 1)
+
+
+def _sell(db: Session, row: int):
+    db.add(Sale(cliente=f"Cliente {row}", producto="Laptop Dell", cantidad=1, precio=15000.0))
+
+
+WRITES = {"nnieto": _deposit, "jcontreras": _sell}
+
+
+def _writer(project: str, binds: dict, shared: Engine, rows: int) -> list[float]:
+    latencies = []
+    write = WRITES[project]
+    with Session(shared, binds=binds) as db:
+        for row in range(rows):
+            start = time.perf_counter()
+            write(db, row)
+            db.commit()
+            latencies.append(time.perf_counter() - start)
+    return latencies
+
+
+def run(directory: Path, writers: int, rows: int, *, split: bool) -> dict[str, tuple[float, list[float]]]:
+    """Run `writers` threads per project, each committing `rows` rows.
+
+    Args:
+        directory (Path): Where to create the SQLite files.
+        writers (int): Concurrent writers of each project.
+        rows (int): Rows committed by each writer, one per transaction.
+        split (bool): Give each project its own file instead of a shared one.
+
+    Returns:
+        dict[str, tuple[float, list[float]]]: The elapsed time of each project and the latency of its commits.
+
+    """
+    shared = create_database_engine(f"sqlite:///{directory / 'database.db'}")
+    initialize_database(shared)
+    binds = {}
+    engines = [shared]
+    if split:
+        for project, tables in PROJECT_TABLES.items():
+            project_engine = create_database_engine(f"sqlite:///{directory / project}.db")
+            engines.append(project_engine)
+            metadata_tables = [SQLModel.metadata.tables[table] for table in tables]
+            SQLModel.metadata.create_all(project_engine, tables=[*metadata_tables, TableVersion.__table__])
+            binds |= dict.fromkeys(metadata_tables, project_engine)
+
+    def project_load(project: str) -> tuple[float, list[float]]:
+        start = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=writers) as pool:
+            results = pool.map(lambda _: _writer(project, binds, shared, rows), range(writers))
+            latencies = [latency for result in results for latency in result]
+        return time.perf_counter() - start, latencies
+
+    with ThreadPoolExecutor(max_workers=len(WRITES)) as pool:
+        results = dict(zip(WRITES, pool.map(project_load, WRITES), strict=True))
+    for db_engine in engines:
+        db_engine.dispose()
+    return results
+
+
+@cli.command()
+def main(
+    writers: Annotated[int, typer.Option(help="Concurrent writers of each project")] = 4,
+    rows: Annotated[int, typer.Option(help="Rows committed by each writer")] = 500,
+):
+    """Compare a shared database file with one file per project."""
+    typer.echo(f"{'layout':>8} {'project':>11} {'rows/s':>10} {'p50 ms':>8} {'p99 ms':>8}")
+    for layout, split in (("shared", False), ("split", True)):
+        with tempfile.TemporaryDirectory() as tmp:
+            results = run(Path(tmp), writers, rows, split=split)
+        for project, (elapsed, latencies) in results.items():
+            percentiles = statistics.quantiles(latencies, n=100)
+            typer.echo(
+                f"{layout:>8} {project:>11} {len(latencies) / elapsed:>10.1f} "
+                f"{percentiles[49] * 1000:>8.2f} {percentiles[98] * 1000:>8.2f}",
+            )
+
+
+if __name__ == "__main__":
+    cli()
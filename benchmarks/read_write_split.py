@@ -0,0 +1,129 @@
+"""Measure the reads of the list and get-by-id routes while another thread keeps writing.
+
+Reader threads run the queries of `GET /ventas/` (a page of 50 rows) and `GET /ventas/{id}` while writer
+threads insert sales, one per transaction. The same load runs twice:
+
+- `pooled`: Every session uses one pool of read/write connections, as `DbSession` did before.
+- `split`: The writes go through the single writer connection (`DbWriteSession`) and the reads through
+  the read-only pool (`DbReadSession`), see `app.db`.
+
+```
+python -m benchmarks.read_write_split --readers 8 --writers 2 --seconds 5
+```
+"""
+
+import random
+import statistics
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Annotated
+
+import typer
+from sqlalchemy import Engine
+from sqlmodel import Session, SQLModel, create_engine, select
+
+from app.config import settings
+from app.db import create_database_engine, engine_options, set_sqlite_pragmas
+from app.proyectos.jcontreras.models import Sale
+from app.table_versions import TableVersion
+
+cli = typer.Typer(help=__doc__.splitlines()[0])
+
+SEED_ROWS = 10_000
+
+
+def _sale(row: int) -> Sale:
+    return Sale(cliente=f"Cliente {row}", producto="Laptop Dell", cantidad=1, precio=15000.0)
+
+
+def _reader(db_engine: Engine, stop: threading.Event) -> list[float]:
+    latencies = []
+    while not stop.is_set():
+        start = time.perf_counter()
+        with Session(db_engine) as db:
+            db.exec(select(Sale).where(Sale.id > random.randrange(SEED_ROWS)).order_by(Sale.id).limit(50)).all()  # noqa: S311
+            db.get(Sale, random.randrange(1, SEED_ROWS))  # noqa: S311
+        latencies.append(time.perf_counter() - start)
+    return latencies
+
+
+def _writer(db_engine: Engine, stop: threading.Event) -> list[float]:
+    latencies = []
+    while not stop.is_set():
+        start = time.perf_counter()
+        with Session(db_engine) as db:
+            db.add(_sale(len(latencies)))
+            db.commit()
+        latencies.append(time.perf_counter() - start)
+    return latencies
+
+
+def run(database: Path, readers: int, writers: int, seconds: float, *, split: bool) -> dict[str, list[float]]:
+    """Run the readers and the writers for `seconds` and return the latency of each operation.
+
+    Args:
+        database (Path): The SQLite file, it is created and filled with `SEED_ROWS` sales.
+        readers (int): Concurrent reader threads.
+        writers (int): Concurrent writer threads.
+        seconds (float): Duration of the run.
+        split (bool): Use the single writer and the read-only pool instead of one shared pool.
+
+    Returns:
+        dict[str, list[float]]: The latencies of the `read` and `write` operations.
+
+    """
+    url = f"sqlite:///{database}"
+    if split:
+        write_engine = create_database_engine(url)
+        read_engine = create_database_engine(url, read_only=True)
+    else:
+        options = engine_options(url) | {"pool_size": settings.pool_size, "max_overflow": settings.max_overflow}
+        write_engine = read_engine = create_engine(url, connect_args={"check_same_thread": False}, **options)
+        set_sqlite_pragmas(write_engine)
+    SQLModel.metadata.create_all(write_engine, tables=[Sale.__table__, TableVersion.__table__])
+    with Session(write_engine) as db:
+        db.add_all(_sale(row) for row in range(SEED_ROWS))
+        db.commit()
+
+    stop = threading.Event()
+    with ThreadPoolExecutor(max_workers=readers + writers) as pool:
+        read_futures = [pool.submit(_reader, read_engine, stop) for _ in range(readers)]
+        write_futures = [pool.submit(_writer, write_engine, stop) for _ in range(writers)]
+        time.sleep(seconds)
+        stop.set()
+        results = {
+            "read": [latency for future in read_futures for latency in future.result()],
+            "write": [latency for future in write_futures for latency in future.result()],
+        }
+    write_engine.dispose()
+    read_engine.dispose()
+    return results
+
+
+@cli.command()
+def main(
+    readers: Annotated[int, typer.Option(help="Concurrent reader threads")] = 8,
+    writers: Annotated[int, typer.Option(help="Concurrent writer threads")] = 2,
+    seconds: Annotated[float, typer.Option(help="Duration of each run")] = 5.0,
+):
+    """Compare one shared pool with the single writer and the read-only pool."""
+    typer.echo(f"{'layout':>8} {'operation':>10} {'ops/s':>10} {'p50 ms':>8} {'p99 ms':>8}")
+    for layout, split in (("pooled", False), ("split", True)):
+        with tempfile.TemporaryDirectory() as tmp:
+            results = run(Path(tmp) / "database.db", readers, writers, seconds, split=split)
+        for operation, latencies in results.items():
+            if len(latencies) < 2:
+                typer.echo(f"{layout:>8} {operation:>10} {len(latencies) / seconds:>10.1f}")
+                continue
+            percentiles = statistics.quantiles(latencies, n=100)
+            typer.echo(
+                f"{layout:>8} {operation:>10} {len(latencies) / seconds:>10.1f} "
+                f"{percentiles[49] * 1000:>8.2f} {percentiles[98] * 1000:>8.2f}",
+            )
+
+
+if __name__ == "__main__":
+    cli()
@@ -0,0 +1,96 @@
+"""Compare the serialization of a list route through FastAPI and through `FastJSONResponse`.
+
+Each size runs two list routes over the same rows, built in memory so only the serialization is measured:
+
+- `productos`: `Producto` table rows returned as `list[Producto]` (like `dramos.get_productos`).
+- `eventos`: `Event` table rows returned as `list[EventRead]` (like `imayo.get_events`).
+
+`current` returns the rows and lets FastAPI validate them, run `jsonable_encoder` and `json.dumps`.
+`fast` returns them in a `FastJSONResponse` (see `app.serialization`).
+
+```
+python -m benchmarks.serialization --sizes 10000,100000,1000000
+```
+"""
+
+import json
+import time
+from datetime import datetime
+from typing import Annotated, Any
+
+import typer
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from app.proyectos.dramos.models import Producto
+from app.proyectos.imayo.models import Event
+from app.proyectos.imayo.schemas import EventRead
+from app.serialization import FastJSONResponse
+
+cli = typer.Typer(help=__doc__.splitlines()[0])
+
+
+def productos(size: int) -> list[Producto]:
+    """Build `size` products."""
+    return [Producto(id=i, nombre=f"Producto {i}", tipo="Electrónica", precio=i * 1.5) for i in range(1, size + 1)]
+
+
+def eventos(size: int) -> list[Event]:
+    """Build `size` events."""
+    fecha = datetime(2025, 6, 15, 10)
+    return [Event(id=i, nombre=f"Evento {i}", descripcion=None, fecha=fecha) for i in range(1, size + 1)]
+
+
+SCENARIOS = {
+    "productos": (productos, list[Producto]),
+    "eventos": (eventos, list[EventRead]),
+}
+
+
+def build_app(rows: list, response_model: Any) -> FastAPI:
+    """Return an application with a `current` and a `fast` route that list `rows`."""
+    app = FastAPI()
+
+    @app.get("/current", response_model=response_model)
+    def current():
+        return rows
+
+    @app.get("/fast", response_model=response_model)
+    def fast():
+        return FastJSONResponse(rows, response_model)
+
+    return app
+
+
+def measure(client: TestClient, path: str, repeat: int) -> tuple[float, bytes]:
+    """Return the best time of `repeat` requests to `path`, and the last body."""
+    best, body = float("inf"), b""
+    for _ in range(repeat):
+        start = time.perf_counter()
+        response = client.get(path)
+        best = min(best, time.perf_counter() - start)
+        body = response.content
+    return best, body
+
+
+@cli.command()
+def main(
+    sizes: Annotated[str, typer.Option(help="Comma separated numbers of rows")] = "10000,100000,1000000",
+    repeat: Annotated[int, typer.Option(help="Requests per path, the best one is reported")] = 3,
+):
+    """Report the time of the current and the fast serialization for each scenario and size."""
+    typer.echo(f"{'scenario':<10} {'rows':>9} {'current':>10} {'fast':>10} {'speedup':>8}")
+    for name, (build, response_model) in SCENARIOS.items():
+        for size in map(int, sizes.split(",")):
+            rows = build(size)
+            with TestClient(build_app(rows, response_model)) as client:
+                current, expected = measure(client, "/current", repeat)
+                fast, body = measure(client, "/fast", repeat)
+            if json.loads(body) != json.loads(expected):
+                typer.echo(f"{name}: the fast path returned a different document", err=True)
+                raise typer.Exit(1)
+            typer.echo(f"{name:<10} {size:>9} {current:>9.3f}s {fast:>9.3f}s {current / fast:>7.1f}x")
+
+
+if __name__ == "__main__":
+    cli()
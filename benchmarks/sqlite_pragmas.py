@@ -0,0 +1,78 @@
+"""Compare the write throughput of SQLite with and without the tuning pragmas.
+
+Each profile runs on a fresh database file and commits one row per transaction, like the
+routes do: deposits through the **Alcancia** ledger and sales like `POST /api/v1/jcontreras/ventas/`.
+
+- `default`: The SQLite defaults (rollback journal, `synchronous=FULL`).
+- `tuned`: The pragmas of `app.config.Settings` (WAL, `synchronous=NORMAL`, mmap, cache, ...).
+
+```
+python -m benchmarks.sqlite_pragmas --rows 2000
+```
+"""
+
+import tempfile
+import time
+from collections.abc import Callable
+from pathlib import Path
+from typing import Annotated
+
+import typer
+from sqlmodel import Session, create_engine
+
+from app.config import settings
+from app.db import initialize_database, set_sqlite_pragmas
+from app.proyectos.jcontreras.models import Sale
+from app.proyectos.nnieto.ledger import record_transaction
+
+cli = typer.Typer(help=__doc__.splitlines()[0])
+
+PROFILES: dict[str, dict[str, str | int]] = {
+    "default": {},
+    "tuned": settings.sqlite_pragmas,
+}
+
+
+def _deposit(db: Session, i: int):
+    record_transaction(db, i)
+    db.commit()
+
+
+def _sale(db: Session, i: int):
+    db.add(Sale(cliente=f"Cliente {i}", producto="Laptop", cantidad=1, precio=15000.0))
+    db.commit()
+
+
+PATHS: dict[str, Callable[[Session, int], None]] = {
+    "alcancia": _deposit,
+    "ventas": _sale,
+}
+
+
+def run(database: Path, pragmas: dict[str, str | int], insert: Callable[[Session, int], None], rows: int) -> float:
+    """Insert `rows` rows, one transaction each, and return the elapsed time in seconds."""
+    engine = create_engine(f"sqlite:///{database}")
+    set_sqlite_pragmas(engine, pragmas)
+    initialize_database(engine)
+    with Session(engine) as db:
+        start = time.perf_counter()
+        for i in range(1, rows + 1):
+            insert(db, i)
+        elapsed = time.perf_counter() - start
+    engine.dispose()
+    return elapsed
+
+
+@cli.command()
+def main(rows: Annotated[int, typer.Option(help="Rows inserted per path and profile")] = 2000):
+    """Run every insert path with every profile."""
+    typer.echo(f"{'path':<10} {'profile':<8} {'seconds':>10} {'commits/s':>10}")
+    for path, insert in PATHS.items():
+        for profile, pragmas in PROFILES.items():
+            with tempfile.TemporaryDirectory() as tmp:
+                elapsed = run(Path(tmp) / "bench.db", pragmas, insert, rows)
+            typer.echo(f"{path:<10} {profile:<8} {elapsed:>10.3f} {rows / elapsed:>10.1f}")
+
+
+if __name__ == "__main__":
+    cli()
@@ -0,0 +1,106 @@
+"""Measure the startup cost of the server and the import cost of each project.
+
+Every measurement runs in a fresh Python process, so nothing is already in `sys.modules`.
+
+- `projects`: For each project, the time to import its `models.py` and `routes.py` after the
+  shared dependencies (FastAPI, SQLModel, `app.db`) are loaded. The slowest projects are listed first.
+- `startup`: The time to import `app.main` and run `load_routes`, with eager and lazy routes
+  (see `Settings.lazy_routes`), and the time of `discover_projects` with and without a manifest.
+
+```
+python -m benchmarks.startup projects
+python -m benchmarks.startup startup --repeat 5
+```
+"""
+
+import json
+import os
+import statistics
+import subprocess
+import sys
+from typing import Annotated
+
+import typer
+
+from app.discovery import discover_projects, manifest_path
+
+cli = typer.Typer(help=__doc__.splitlines()[0])
+
+IMPORT_PROJECT = """
+import importlib, json, sys, time
+import app.db
+timings = {}
+for module in sys.argv[1:]:
+    start = time.perf_counter()
+    importlib.import_module(module)
+    timings[module.rsplit(".", 1)[-1]] = time.perf_counter() - start
+print(json.dumps(timings))
+"""
+
+LOAD_ROUTES = """
+import json, time
+start = time.perf_counter()
+from fastapi import FastAPI
+import app.main
+imported = time.perf_counter()
+from app.discovery import discover_projects
+discover_projects()
+discovered = time.perf_counter()
+fastapi_app = FastAPI()
+fastapi_app.state.lazy_routes = {}
+app.main.load_routes(fastapi_app)
+end = time.perf_counter()
+print(json.dumps({"import": imported - start, "discover": discovered - imported, "load_routes": end - discovered}))
+"""
+
+
+def measure(script: str, *args: str, env: dict[str, str] | None = None) -> dict[str, float]:
+    """Run `script` in a new interpreter and return the timings it prints as JSON."""
+    result = subprocess.run(  # noqa: S603
+        [sys.executable, "-c", script, *args],
+        capture_output=True,
+        check=True,
+        text=True,
+        env={**os.environ, **(env or {})},
+    )
+    return json.loads(result.stdout.splitlines()[-1])
+
+
+@cli.command()
+def projects():
+    """Report the import cost of every project, slowest first."""
+    rows = []
+    for project in discover_projects().values():
+        modules = [project.module(name) for name in ("models", "routes") if getattr(project, name)]
+        if modules:
+            rows.append((project.name, measure(IMPORT_PROJECT, *modules)))
+    rows.sort(key=lambda row: sum(row[1].values()), reverse=True)
+    typer.echo(f"{'project':<12} {'models':>10} {'routes':>10} {'total':>10}")
+    for name, timings in rows:
+        models, routes = timings.get("models", 0.0), timings.get("routes", 0.0)
+        typer.echo(f"{name:<12} {models * 1000:>8.1f}ms {routes * 1000:>8.1f}ms {(models + routes) * 1000:>8.1f}ms")
+
+
+@cli.command()
+def startup(repeat: Annotated[int, typer.Option(help="Number of runs of each scenario")] = 5):
+    """Report the startup time with eager and lazy routes, with and without a manifest."""
+    scenarios = {
+        "eager, no manifest": ({"LAZY_ROUTES": "false"}, True),
+        "eager": ({"LAZY_ROUTES": "false"}, False),
+        "lazy": ({"LAZY_ROUTES": "true"}, False),
+    }
+    typer.echo(f"{'scenario':<20} {'import':>10} {'discover':>10} {'load_routes':>12}")
+    for scenario, (env, cold) in scenarios.items():
+        runs = []
+        for _ in range(repeat):
+            if cold:
+                manifest_path().unlink(missing_ok=True)
+            runs.append(measure(LOAD_ROUTES, env=env))
+        median = {key: statistics.median(run[key] for run in runs) * 1000 for key in runs[0]}
+        typer.echo(
+            f"{scenario:<20} {median['import']:>8.1f}ms {median['discover']:>8.1f}ms {median['load_routes']:>10.1f}ms",
+        )
+
+
+if __name__ == "__main__":
+    cli()
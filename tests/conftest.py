@@ -1,7 +1,10 @@
 """Fixtures for setting up and testing the FastAPI application.
 
 Fixtures:
-    - `db_engine`: Sets up an in-memory SQLite database for testing.
+    - `db_connection`: The connection to the in-memory SQLite database shared by both engines.
+    - `database`: The engine of that database, with every table created once per test session.
+    - `db_engine`: The engine of the test database, inside a transaction that is rolled back after each test.
+    - `async_db_engine`: An asynchronous engine for the same in-memory database.
     - `app`: Configures the FastAPI application with the test database.
     - `rest_api`: Provides a `TestClient` for making HTTP requests to the FastAPI application.
 
@@ -9,24 +12,118 @@ Note:
     The most important fixture in this module is `rest_api`, as it is the one you will use the most
     for testing API endpoints.
 
+The schema is created once, and every test runs inside a transaction (see `SharedConnection`) that is
+rolled back at the end: each test starts with empty tables, the ids start at 1 again, and the schema
+changes of a test (for example a migration) are undone too.
+
+Running the tests in parallel:
+    With [pytest-xdist](https://pytest-xdist.readthedocs.io/) installed, `pytest -n auto` runs the tests
+    in several worker processes. Every worker opens its own in-memory database, so they never share data.
+
 """
+import asyncio
+import sqlite3
+
+import aiosqlite
 import pytest
 from fastapi import FastAPI
 from fastapi.testclient import TestClient
 from sqlalchemy import Engine
+from sqlalchemy.ext.asyncio import AsyncEngine, create_async_engine
 from sqlmodel import Session, create_engine
+from sqlmodel.ext.asyncio.session import AsyncSession
 from sqlmodel.pool import StaticPool
 
-from app.db import drop_database, get_session, initialize_database
+from app.caching import caches
+from app.db import get_async_read_session, get_async_session, get_read_session, get_session, initialize_database
 from app.log_utils import logger
 
 
-@pytest.fixture
-def db_engine()-> Engine: # type: ignore
-    """Fixture to set up an in-memory SQLite database for testing.
+class SharedConnection(sqlite3.Connection):
+    """SQLite connection that the engines cannot close, and whose commits only last until the end of a test.
+
+    An in-memory database only lives as long as its connection, and both the synchronous and the
+    asynchronous engines must see the same database. The `db_connection` fixture closes it.
 
-    This fixture creates an empty, in-memory SQLite database, initializes it, and ensures
-    proper cleanup after the test.
+    During a test (see `begin_test`) the connection stays inside the `test_case` savepoint. The
+    `commit()` and `rollback()` of the engines work on a nested `work` savepoint instead: a commit keeps
+    the changes in `test_case`, visible to every session, and a rollback undoes the changes since the last
+    commit, as usual. `rollback_test` then undoes everything the test wrote.
+    """
+
+    testing = False
+    autocommit_mode = False
+
+    @property
+    def isolation_level(self) -> str | None:
+        """The `isolation_level` of `sqlite3.Connection`."""
+        return sqlite3.Connection.isolation_level.__get__(self)
+
+    @isolation_level.setter
+    def isolation_level(self, value: str | None):
+        """Keep the transaction of the test when an engine switches to autocommit, for example in migrations.
+
+        Setting `isolation_level` to `None` commits the open transaction, which would end the test. Instead,
+        the statements run in autocommit mode are kept as if they were committed, see `rollback`.
+        """
+        if not self.testing:
+            sqlite3.Connection.isolation_level.__set__(self, value)
+            return
+        if self.autocommit_mode and value is not None:
+            self.commit()
+        self.autocommit_mode = value is None
+
+    def close(self):
+        """Do nothing, see `db_connection`."""
+
+    def begin_test(self):
+        """Open the transaction of a test."""
+        self.execute("SAVEPOINT test_case")
+        self.execute("SAVEPOINT work")
+        self.testing = True
+
+    def rollback_test(self):
+        """Undo everything written since `begin_test`, including the schema changes."""
+        self.testing = self.autocommit_mode = False
+        sqlite3.Connection.rollback(self)
+
+    def commit(self):
+        """Keep the changes until the end of the test."""
+        if not self.testing:
+            sqlite3.Connection.commit(self)
+            return
+        self.execute("RELEASE work")
+        self.execute("SAVEPOINT work")
+
+    def rollback(self):
+        """Undo the changes since the last `commit`."""
+        if not self.testing:
+            sqlite3.Connection.rollback(self)
+            return
+        if self.autocommit_mode:
+            self.commit()
+        else:
+            self.execute("ROLLBACK TO work")
+
+
+@pytest.fixture(scope="session")
+def db_connection() -> sqlite3.Connection: # type: ignore
+    """Fixture to open the in-memory SQLite database shared by `db_engine` and `async_db_engine`.
+
+    It is opened once per test session (once per worker with pytest-xdist).
+
+    Yields:
+        sqlite3.Connection: The connection to the in-memory database.
+
+    """
+    connection = sqlite3.connect(":memory:", check_same_thread=False, factory=SharedConnection)
+    yield connection
+    sqlite3.Connection.close(connection)
+
+
+@pytest.fixture(scope="session")
+def database(db_connection) -> Engine: # type: ignore
+    """Fixture to create the engine of the in-memory database and its tables, once per test session.
 
     Tip: If you are trying to debug database schema issues, temporarily change the database URI to
     `"sqlite:///test.db"`. The database file will be created in the directory where you are running pytest from.
@@ -37,22 +134,59 @@ def db_engine()-> Engine: # type: ignore
     """
     logger.info("Database Fixture: setup")
     engine = create_engine(
-        "sqlite:///:memory:",
-        connect_args={"check_same_thread": False},
+        "sqlite://",
+        creator=lambda: db_connection,
         poolclass=StaticPool,
     )
     initialize_database(engine)
     yield engine
     logger.info("Database Fixture: teardown")
-    drop_database(engine)
+    engine.dispose()
+
+
+@pytest.fixture
+def db_engine(database, db_connection) -> Engine: # type: ignore
+    """Fixture to give a test the in-memory SQLite database, with empty tables.
+
+    The test runs inside a transaction that is rolled back when it ends (see `SharedConnection`).
+    The aggregate caches of `app.caching` are emptied too, since the engine is the same for every test.
+
+    Yields:
+        Engine: The SQLAlchemy engine connected to the in-memory SQLite database.
+
+    """
+    db_connection.begin_test()
+    try:
+        yield database
+    finally:
+        db_connection.rollback_test()
+        for cache in caches.values():
+            cache.invalidate()
 
 
 @pytest.fixture
-def app(db_engine):
+def async_db_engine(db_engine, db_connection) -> AsyncEngine: # type: ignore  # noqa: ARG001
+    """Fixture to set up an asynchronous engine for the in-memory SQLite database of `db_engine`.
+
+    Yields:
+        AsyncEngine: The asynchronous engine, using `aiosqlite` on top of the shared connection.
+
+    """
+    async def connect():
+        return await aiosqlite.Connection(lambda: db_connection, iter_chunk_size=64)
+
+    engine = create_async_engine("sqlite+aiosqlite://", async_creator=connect, poolclass=StaticPool)
+    yield engine
+    # Stops the aiosqlite thread, the connection itself is closed by `db_connection`
+    asyncio.run(engine.dispose())
+
+
+@pytest.fixture
+def app(db_engine, async_db_engine):
     """Fixture to set up the FastAPI application for testing.
 
-    This fixture overrides the `get_session` dependency to use the in-memory SQLite database
-    and loads the application routes.
+    This fixture overrides the `get_session`, `get_read_session`, `get_async_session` and `get_async_read_session`
+    dependencies to use the in-memory SQLite database and loads the application routes.
 
     Note:
         Since this fixture depends on `db_engine`, pytest will ensure that the database
@@ -60,23 +194,30 @@ def app(db_engine):
 
     Args:
         db_engine (Engine): The SQLAlchemy engine connected to the in-memory SQLite database.
+        async_db_engine (AsyncEngine): The asynchronous engine connected to the same database.
 
     Yields:
         FastAPI: The FastAPI application instance configured for testing.
 
     """
     logger.info("App fixture: setup")
-    session = Session(db_engine)
-    def get_session_override() -> Session:
-        return session
+    def get_session_override():
+        with Session(db_engine) as session:
+            yield session
+
+    async def get_async_session_override():
+        async with AsyncSession(async_db_engine, expire_on_commit=False) as session:
+            yield session
 
     from app.main import app, load_routes
     app.dependency_overrides[get_session] = get_session_override
+    app.dependency_overrides[get_read_session] = get_session_override
+    app.dependency_overrides[get_async_session] = get_async_session_override
+    app.dependency_overrides[get_async_read_session] = get_async_session_override
     load_routes(app)
     yield app
     logger.info("App fixture: teardown")
-    session.rollback()
-    session.close()
+    app.dependency_overrides.clear()
 
 
 @pytest.fixture
@@ -0,0 +1,117 @@
+"""# 🧪 Test Suite for `app.bulk`.
+
+This module verifies the bulk create routes:
+- 📦 Rows sent as a JSON array or as NDJSON, inserted in one transaction.
+- 🔢 The generated ids, returned as ranges.
+- ❌ A single invalid row rejects the whole request.
+- 📏 The limits of rows and bytes per request, checked before validating the rows.
+"""
+
+import json
+
+from fastapi import status
+from sqlmodel import Session, select
+
+from app.bulk import id_ranges
+from app.config import settings
+from app.proyectos.imayo.models import Event
+from app.proyectos.jcontreras.models import Sale
+from app.table_versions import read_versions
+
+VENTAS = "/api/v1/jcontreras/ventas"
+
+
+def _ventas(count: int) -> list[dict]:
+    return [{"cliente": f"Cliente {i}", "producto": "Monitor LG", "cantidad": 1, "precio": 5000.0} for i in range(count)]
+
+
+def test_id_ranges():
+    """🔢 Consecutive ids are compressed in inclusive ranges."""
+    assert id_ranges([]) == []
+    assert id_ranges([1, 2, 3, 7, 9, 10]) == [(1, 3), (7, 7), (9, 10)]
+
+
+def test_bulk_json(rest_api, db_engine):
+    """📦 A JSON array is inserted in one go, and the ids come back as ranges."""
+    rest_api.post(f"{VENTAS}/", json=_ventas(1)[0])
+    response = rest_api.post(f"{VENTAS}/bulk", json=_ventas(100))
+    assert response.status_code == status.HTTP_201_CREATED
+    assert response.json() == {"created": 100, "ids": [[2, 101]]}
+
+    with Session(db_engine) as db:
+        assert len(db.exec(select(Sale)).all()) == 101
+        # One commit, one new version of the table
+        assert read_versions(db, [Sale.__table__])[0].version == 2
+
+
+def test_bulk_ndjson(rest_api):
+    """📦 NDJSON bodies are accepted too, blank lines are ignored."""
+    body = "\n".join(json.dumps(venta) for venta in _ventas(3)) + "\n\n"
+    response = rest_api.post(
+        f"{VENTAS}/bulk",
+        content=body,
+        headers={"Content-Type": "application/x-ndjson"},
+    )
+    assert response.status_code == status.HTTP_201_CREATED
+    assert response.json() == {"created": 3, "ids": [[1, 3]]}
+
+
+def test_bulk_defaults(rest_api, db_engine):
+    """📦 The columns missing from the schema get the defaults of the model."""
+    eventos = [{"nombre": f"Evento {i}", "fecha": "2025-05-01T10:00:00"} for i in range(2)]
+    response = rest_api.post("/api/v1/imayo/eventos/bulk", json=eventos)
+    assert response.status_code == status.HTTP_201_CREATED
+    with Session(db_engine) as db:
+        events = db.exec(select(Event)).all()
+    assert [event.nombre for event in events] == ["Evento 0", "Evento 1"]
+    assert all(event.created_at is not None and event.descripcion is None for event in events)
+
+
+def test_bulk_async_route(rest_api):
+    """📦 The routes of the asynchronous projects insert through the same `executemany`."""
+    cursos = [{"nombre": "SOA", "descripcion": "Servicios", "maestro": "Noe Nieto"}] * 5
+    response = rest_api.post("/api/v1/jchaidez/cursos/bulk", json=cursos)
+    assert response.status_code == status.HTTP_201_CREATED
+    assert response.json()["created"] == 5
+    assert len(rest_api.get("/api/v1/jchaidez/cursos/").json()) == 5
+
+
+def test_bulk_invalid_row(rest_api, db_engine):
+    """❌ An invalid row rejects the request, and the error points to its index."""
+    ventas = _ventas(3)
+    ventas[1]["cantidad"] = "muchas"
+    response = rest_api.post(f"{VENTAS}/bulk", json=ventas)
+    assert response.status_code == status.HTTP_422_UNPROCESSABLE_ENTITY
+    assert response.json()["detail"][0]["loc"] == ["body", 1, "cantidad"]
+
+    response = rest_api.post(f"{VENTAS}/bulk", content=b"{not json")
+    assert response.status_code == status.HTTP_422_UNPROCESSABLE_ENTITY
+
+    with Session(db_engine) as db:
+        assert db.exec(select(Sale)).all() == []
+
+
+def test_bulk_limit(rest_api, monkeypatch):
+    """📏 Requests with more than `bulk_max_rows` rows are rejected."""
+    monkeypatch.setattr(settings, "bulk_max_rows", 10)
+    response = rest_api.post(f"{VENTAS}/bulk", json=_ventas(11))
+    assert response.status_code == status.HTTP_413_REQUEST_ENTITY_TOO_LARGE
+    assert rest_api.post(f"{VENTAS}/bulk", json=[]).json() == {"created": 0, "ids": []}
+
+
+def test_bulk_limits_before_validation(rest_api, monkeypatch):
+    """📏 Too many NDJSON lines, or too many bytes, are rejected before any row is validated."""
+    monkeypatch.setattr(settings, "bulk_max_rows", 10)
+    # An invalid row would be a 422, so the row count was checked first
+    lines = ["{not json"] + [json.dumps(venta) for venta in _ventas(10)]
+    response = rest_api.post(f"{VENTAS}/bulk", content="\n".join(lines), headers={"Content-Type": "application/x-ndjson"})
+    assert response.status_code == status.HTTP_413_REQUEST_ENTITY_TOO_LARGE
+
+    monkeypatch.setattr(settings, "bulk_max_bytes", 100)
+    body = json.dumps(_ventas(3)).encode()
+    assert rest_api.post(f"{VENTAS}/bulk", content=body).status_code == status.HTTP_413_REQUEST_ENTITY_TOO_LARGE
+    # Without `Content-Length`, the body is counted while it arrives
+    chunks = (body[i : i + 50] for i in range(0, len(body), 50))
+    response = rest_api.post(f"{VENTAS}/bulk", content=chunks)
+    assert response.status_code == status.HTTP_413_REQUEST_ENTITY_TOO_LARGE
+    assert "bytes" in response.json()["detail"]
@@ -0,0 +1,234 @@
+"""# 🧪 Test Suite for `app.caching`.
+
+This module verifies the conditional requests of the list and detail routes:
+- 🏷️ The `ETag` and `Last-Modified` headers.
+- 💤 `304 Not Modified` while the table does not change, without running the handler.
+- 🔄 A new `ETag` after every write.
+
+And the aggregate caches:
+- 🧠 Results served from memory between writes, and recomputed after a commit.
+- 👥 The commits of the other worker processes, seen through the table versions.
+- 📏 The LRU and TTL bounds.
+- 📊 The hit rate.
+"""
+
+import asyncio
+import time
+from email.utils import formatdate
+
+import pytest
+from fastapi import status
+from sqlmodel import Session, func, select
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+from app.caching import cached_aggregate, caches, entity_tag
+from app.config import settings
+from app.proyectos.jcontreras.models import Sale
+from app.proyectos.nnieto.models import Transaction
+from app.table_versions import TableVersion, bump_versions
+
+ALCANCIA = "/api/v1/nnieto/alcancia"
+AGENDA = "/api/v1/rpalma/contactos/agenda"
+
+
+def test_list_headers(rest_api):
+    """🏷️ The list routes tag their responses with the version of the table."""
+    response = rest_api.get(f"{ALCANCIA}/transactions")
+    assert response.status_code == status.HTTP_200_OK
+    assert response.headers["ETag"] == entity_tag([TableVersion(name="alcancia_transaction")])
+    assert response.headers["Cache-Control"] == "no-cache"
+    # The table was never written
+    assert "Last-Modified" not in response.headers
+
+    rest_api.put(f"{ALCANCIA}/transaction/deposit/100")
+    response = rest_api.get(f"{ALCANCIA}/transactions", params={"limit": 10})
+    assert response.headers["ETag"].startswith('W/"')
+    assert "Last-Modified" in response.headers
+
+
+def test_if_none_match(rest_api):
+    """💤 A client with the current `ETag` gets an empty `304` until the next write."""
+    rest_api.put(f"{ALCANCIA}/transaction/deposit/100")
+    etag = rest_api.get(f"{ALCANCIA}/transactions").headers["ETag"]
+
+    response = rest_api.get(f"{ALCANCIA}/transactions", headers={"If-None-Match": etag})
+    assert response.status_code == status.HTTP_304_NOT_MODIFIED
+    assert response.content == b""
+    assert response.headers["ETag"] == etag
+
+    # Strong comparison is not required, and a list of tags is accepted
+    response = rest_api.get(f"{ALCANCIA}/transactions", headers={"If-None-Match": f'"other", {etag[2:]}'})
+    assert response.status_code == status.HTTP_304_NOT_MODIFIED
+
+    rest_api.put(f"{ALCANCIA}/transaction/deposit/50")
+    response = rest_api.get(f"{ALCANCIA}/transactions", headers={"If-None-Match": etag})
+    assert response.status_code == status.HTTP_200_OK
+    assert response.headers["ETag"] != etag
+    assert len(response.json()) == 2
+
+
+def test_if_modified_since(rest_api):
+    """💤 `If-Modified-Since` is honored when the client has no `ETag`."""
+    contacto = {"nombre": "Ana", "telefono": "6671234567", "correo": "ana@example.com"}
+    rest_api.post("/api/v1/rpalma/contactos/create", json=contacto)
+    last_modified = rest_api.get(AGENDA).headers["Last-Modified"]
+
+    response = rest_api.get(AGENDA, headers={"If-Modified-Since": last_modified})
+    assert response.status_code == status.HTTP_304_NOT_MODIFIED
+
+    response = rest_api.get(AGENDA, headers={"If-Modified-Since": formatdate(0, usegmt=True)})
+    assert response.status_code == status.HTTP_200_OK
+
+    response = rest_api.get(AGENDA, headers={"If-Modified-Since": "not a date"})
+    assert response.status_code == status.HTTP_200_OK
+
+
+def test_detail_routes(rest_api):
+    """🏷️ The detail routes are conditional too, also the ones declared with `async def`."""
+    curso = {"nombre": "SOA", "descripcion": "Arquitectura orientada a servicios", "maestro": "Noe Nieto"}
+    created = rest_api.post("/api/v1/jchaidez/cursos/", json=curso)
+    response = rest_api.get(f"/api/v1/jchaidez/cursos/{created.json()['id']}")
+    assert response.status_code == status.HTTP_200_OK
+    response = rest_api.get(
+        f"/api/v1/jchaidez/cursos/{created.json()['id']}",
+        headers={"If-None-Match": response.headers["ETag"]},
+    )
+    assert response.status_code == status.HTTP_304_NOT_MODIFIED
+
+
+def _sale(cantidad: int = 1) -> Sale:
+    return Sale(cliente="Ana", producto="Monitor LG", cantidad=cantidad, precio=5000.0)
+
+
+@pytest.fixture
+def total_sold():
+    """Provide a cached aggregate of the sales that counts how many times it really runs."""
+    calls = []
+
+    @cached_aggregate(Sale, maxsize=2)
+    def total_sold(db: Session, producto: str | None = None) -> int:
+        calls.append(producto)
+        statement = select(func.coalesce(func.sum(Sale.cantidad), 0))
+        if producto is not None:
+            statement = statement.where(Sale.producto == producto)
+        return db.exec(statement).one()
+
+    total_sold.calls = calls
+    yield total_sold
+    del caches[total_sold.cache.name]
+
+
+def test_aggregate_between_writes(db_engine, total_sold):
+    """🧠 The aggregate is computed once per write to its table."""
+    with Session(db_engine) as db:
+        assert total_sold(db) == 0
+        assert total_sold(db) == 0
+        assert len(total_sold.calls) == 1
+
+        db.add(_sale(3))
+        db.commit()
+        assert total_sold(db) == 3
+        assert len(total_sold.calls) == 2
+
+        # Writes to other tables do not matter
+        db.add(Transaction(amount=100))
+        db.commit()
+        assert total_sold(db) == 3
+        assert len(total_sold.calls) == 2
+
+    stats = total_sold.cache.stats()
+    assert stats["hits"] == 2
+    assert stats["misses"] == 2
+    assert stats["hit_rate"] == 0.5
+    assert stats["invalidations"] == 1
+
+
+def test_aggregate_sees_its_own_writes(db_engine, total_sold):
+    """🧠 A session with uncommitted writes to the table bypasses the cache."""
+    with Session(db_engine) as db:
+        assert total_sold(db) == 0
+        db.add(_sale(2))
+        assert total_sold(db) == 2
+        db.rollback()
+        assert total_sold(db) == 0
+    assert total_sold.calls == [None, None]
+
+
+def test_aggregate_sees_other_workers(db_engine, total_sold):
+    """👥 A commit of another process, which does not reach the listeners of this one, is seen by the next lookup."""
+    with Session(db_engine) as db:
+        assert total_sold(db) == 0
+        db.commit()
+        # Another worker: same database, but its commits do not empty the caches of this process
+        with db_engine.begin() as connection:
+            connection.execute(Sale.__table__.insert().values(cliente="Ana", producto="Monitor LG", cantidad=4, precio=1.0))
+            bump_versions(connection, ["ventas"])
+        assert total_sold(db) == 4
+        assert total_sold(db) == 4
+    assert total_sold.calls == [None, None]
+    assert total_sold.cache.stats()["invalidations"] == 0
+
+
+@pytest.mark.usefixtures("db_engine")
+def test_aggregate_async(async_db_engine):
+    """🧠 `async def` aggregates on an `AsyncSession` are cached too."""
+    calls = []
+
+    @cached_aggregate(Sale)
+    async def count_sales(db: AsyncSession) -> int:
+        calls.append(db)
+        return (await db.exec(select(func.count()).select_from(Sale))).one()
+
+    async def scenario():
+        async with AsyncSession(async_db_engine, expire_on_commit=False) as db:
+            assert await count_sales(db) == 0
+            assert await count_sales(db) == 0
+            db.add(_sale())
+            await db.commit()
+            assert await count_sales(db) == 1
+
+    try:
+        asyncio.run(scenario())
+    finally:
+        del caches[count_sales.cache.name]
+    assert len(calls) == 2
+
+
+def test_aggregate_bounds(db_engine, total_sold, monkeypatch):
+    """📏 The cache keeps `maxsize` results by arguments, for `ttl` seconds."""
+    with Session(db_engine) as db:
+        for producto in ("a", "b", "c", "a"):
+            total_sold(db, producto)
+        # "a" was dropped to keep "b" and "c"
+        assert total_sold.calls == ["a", "b", "c", "a"]
+        assert total_sold.cache.stats()["size"] == 2
+
+        monkeypatch.setattr(total_sold.cache, "ttl", 0.01)
+        time.sleep(0.02)
+        total_sold(db, "a")
+        assert total_sold.calls[-1] == "a"
+
+        monkeypatch.setattr(settings, "aggregate_cache", False)
+        total_sold(db, "a")
+        assert len(total_sold.calls) == 6
+
+
+def test_result_of_a_stale_read_is_not_kept(total_sold):
+    """🧠 A result computed before a commit is not stored after it."""
+    found, _, generation = total_sold.cache.get(("key",))
+    assert not found
+    total_sold.cache.invalidate(frozenset({"ventas"}))
+    total_sold.cache.put(("key",), 1, generation)
+    assert total_sold.cache.get(("key",))[0] is False
+
+
+def test_cache_endpoint(rest_api):
+    """📊 The internal endpoint lists the aggregate caches of the projects."""
+    response = rest_api.get("/api/v1/_internal/cache")
+    assert response.status_code == status.HTTP_200_OK
+    inventario = response.json()["app.proyectos.fcalzada.routes.calcular_inventario"]
+    assert inventario["tables"] == ["registro_carro"]
+    assert 0 <= inventario["hit_rate"] <= 1
+
+    assert rest_api.delete("/api/v1/_internal/cache").status_code == status.HTTP_204_NO_CONTENT
+    assert "cache_hits_total" in rest_api.get("/metrics").text
@@ -0,0 +1,125 @@
+"""# 🧪 Test Suite for `app.data_io` and the `soa data` commands.
+
+This module verifies the import and export of the tables:
+- 🔁 Round trips through CSV and NDJSON, compressed or not.
+- 🧩 Type conversion of CSV values, defaults of the missing columns.
+- 🧱 Chunks of bounded size, and one transaction per file.
+- 💻 The `soa data` commands.
+"""
+
+import gzip
+import json
+
+import pytest
+from sqlalchemy.exc import IntegrityError
+from sqlmodel import Session, select
+from typer.testing import CliRunner
+
+from app.cli import cli
+from app.data_io import export_table, file_format, import_file
+from app.proyectos.imayo.models import Event
+from app.proyectos.jcontreras.models import Sale
+from app.table_versions import read_versions
+
+
+@pytest.fixture
+def sales_db(db_engine, monkeypatch):
+    """Send the queries of `app.data_io` to the test database, with three sales in it."""
+    monkeypatch.setattr("app.db.engine", db_engine)
+    monkeypatch.setattr("app.db.read_engine", db_engine)
+    with Session(db_engine) as db:
+        db.add_all(Sale(cliente=f"Cliente {i}", producto="Monitor LG", cantidad=i, precio=10.5 * i) for i in range(3))
+        db.commit()
+    return db_engine
+
+
+def _sales(db_engine) -> list[tuple]:
+    with Session(db_engine) as db:
+        return [(s.id, s.cliente, s.cantidad, s.precio) for s in db.exec(select(Sale).order_by(Sale.id))]
+
+
+def test_file_format(tmp_path):
+    """🧩 The format comes from the extension, a final `.gz` is ignored."""
+    assert file_format(tmp_path / "ventas.csv.gz") == "csv"
+    assert file_format(tmp_path / "ventas.jsonl") == "ndjson"
+    with pytest.raises(ValueError, match="Formato desconocido"):
+        file_format(tmp_path / "ventas.xlsx")
+
+
+@pytest.mark.parametrize("name", ["ventas.csv", "ventas.csv.gz", "ventas.ndjson", "ventas.ndjson.gz"])
+def test_round_trip(sales_db, tmp_path, name):
+    """🔁 An exported table is imported back with the same rows and ids."""
+    expected = _sales(sales_db)
+    path = tmp_path / name
+    assert export_table("ventas", path) == 3
+    with Session(sales_db) as db:
+        for sale in db.exec(select(Sale)):
+            db.delete(sale)
+        db.commit()
+
+    assert import_file(path) == 3
+    assert _sales(sales_db) == expected
+
+
+@pytest.mark.usefixtures("sales_db")
+def test_export_streams_in_chunks(tmp_path):
+    """🧱 The rows are written in chunks, in the order of the primary key."""
+    chunks = []
+    path = tmp_path / "ventas.ndjson.gz"
+    export_table("ventas", path, chunk_size=2, progress=chunks.append)
+    assert chunks == [2, 3]
+    with gzip.open(path, "rt") as file:
+        assert [json.loads(line)["id"] for line in file] == [1, 2, 3]
+
+
+def test_import_converts_values(sales_db, tmp_path):
+    """🧩 CSV values get the type of their column, empty values are `NULL` and defaults fill the rest."""
+    path = tmp_path / "eventos_event.csv"
+    path.write_text("nombre,descripcion,fecha\nFeria,,2025-05-01 10:00:00\nTaller,Python,2025-06-01T09:30:00\n")
+    progress = []
+    assert import_file(path, chunk_size=1, progress=progress.append) == 2
+    assert progress == [1, 2]
+
+    with Session(sales_db) as db:
+        events = db.exec(select(Event)).all()
+        assert [(e.nombre, e.descripcion, e.fecha.hour) for e in events] == [("Feria", None, 10), ("Taller", "Python", 9)]
+        assert all(e.created_at is not None for e in events)
+        assert read_versions(db, [Event.__table__])[0].version == 1
+
+
+def test_import_is_one_transaction(sales_db, tmp_path):
+    """🧱 A rejected row leaves the table as it was, also the rows of the chunks before it."""
+    before = _sales(sales_db)
+    path = tmp_path / "ventas.ndjson"
+    rows = [{"id": 10, "cliente": "Ana", "producto": "Monitor", "cantidad": 1, "precio": 1.0}, {"id": 1, "cliente": "Luis"}]
+    path.write_text("\n".join(json.dumps(row) for row in rows))
+    with pytest.raises(IntegrityError):
+        import_file(path, chunk_size=1)
+    assert _sales(sales_db) == before
+
+    path.write_text('{"vendedor": "Ana"}\n')
+    with pytest.raises(ValueError, match="vendedor"):
+        import_file(path)
+    with pytest.raises(ValueError, match="no existe"):
+        import_file(path, "facturas")
+
+
+@pytest.mark.usefixtures("sales_db")
+def test_data_commands(tmp_path):
+    """💻 `soa data export` and `soa data import` move the tables through files."""
+    runner = CliRunner()
+    result = runner.invoke(cli, ["data", "tables"])
+    assert "ventas (jcontreras)" in result.output
+
+    result = runner.invoke(cli, ["data", "export", "ventas", "--dir", str(tmp_path), "--format", "csv"])
+    assert result.exit_code == 0
+    assert "ventas: 3 filas" in result.output
+    path = tmp_path / "ventas.csv.gz"
+    assert path.exists()
+
+    result = runner.invoke(cli, ["data", "import", str(path)])
+    assert result.exit_code == 1
+    assert "UNIQUE" in result.output
+
+    result = runner.invoke(cli, ["data", "export", "facturas", "--dir", str(tmp_path)])
+    assert result.exit_code == 1
@@ -0,0 +1,100 @@
+"""# 🧪 Test Suite for the discovery of the projects.
+
+This module verifies `app.discovery`:
+- 🔍 The projects, their modules and their tables are found.
+- 🗂️ The manifest is reused while the projects do not change, and rebuilt when they do.
+- 💤 Lazy mode mounts a project on its first request.
+"""
+
+import pytest
+from fastapi import FastAPI, status
+from fastapi.testclient import TestClient
+from sqlmodel import Session
+
+from app import discovery
+from app.config import settings
+from app.db import get_read_session, get_session
+from app.discovery import LazyRoutesMiddleware, discover_projects
+from app.main import load_routes
+
+
+@pytest.fixture
+def manifest(tmp_path, monkeypatch):
+    """Write the manifest in a temporary directory and start with an empty in-memory cache."""
+    path = tmp_path / "manifest.json"
+    monkeypatch.setattr(discovery, "manifest_path", lambda: path)
+    monkeypatch.setattr(discovery, "_cache", {})
+    return path
+
+
+def test_discover_projects(manifest):  # noqa: ARG001
+    """🔍 The projects are found with their modules and tables."""
+    projects = discover_projects()
+    nnieto = projects["nnieto"]
+    assert nnieto.routes
+    assert nnieto.models
+    assert nnieto.cli
+    assert nnieto.tables == ("alcancia_balance", "alcancia_transaction")
+    assert projects["rpalma"].migrations
+    assert list(projects) == sorted(projects)
+
+
+def test_manifest_is_reused(manifest, monkeypatch):
+    """🗂️ The manifest is written once and read while the fingerprint does not change."""
+    projects = discover_projects()
+    assert manifest.exists()
+
+    def fail():
+        pytest.fail("The projects were scanned again")
+
+    monkeypatch.setattr(discovery, "_cache", {})
+    monkeypatch.setattr(discovery, "scan_projects", fail)
+    assert discover_projects() == projects
+
+
+def test_manifest_is_invalidated(manifest, monkeypatch):  # noqa: ARG001
+    """🗂️ A change in the modification times rebuilds the manifest."""
+    discover_projects()
+    scans = []
+    scan_projects = discovery.scan_projects
+    monkeypatch.setattr(discovery, "scan_projects", lambda: scans.append(1) or scan_projects())
+    stamps = discovery.fingerprint()
+    monkeypatch.setattr(discovery, "fingerprint", lambda: {**stamps, "nnieto/models.py": 0})
+    discover_projects()
+    assert scans == [1]
+
+
+def test_lazy_routes(db_engine, monkeypatch):
+    """💤 In lazy mode, a project is mounted when it receives its first request."""
+    monkeypatch.setattr(settings, "lazy_routes", True)
+    app = FastAPI()
+    app.state.lazy_routes = {}
+    app.add_middleware(LazyRoutesMiddleware)
+
+    def get_session_override():
+        with Session(db_engine) as session:
+            yield session
+
+    app.dependency_overrides[get_session] = get_session_override
+    app.dependency_overrides[get_read_session] = get_session_override
+    load_routes(app)
+    assert not any(route.path.startswith("/api/v1/nnieto") for route in app.routes)
+
+    response = TestClient(app).get("/api/v1/nnieto/alcancia/transactions")
+    assert response.status_code == status.HTTP_200_OK
+    assert response.json() == []
+    assert any(route.path.startswith("/api/v1/nnieto") for route in app.routes)
+    assert "/api/v1/nnieto" not in app.state.lazy_routes
+    assert "/api/v1/rpalma" in app.state.lazy_routes
+
+
+def test_load_routes_is_idempotent():
+    """🔁 Loading the routes again does not add the same routes twice."""
+    app = FastAPI()
+    load_routes(app)
+    paths = [route.path for route in app.routes]
+    assert any(path.startswith("/api/v1/nnieto") for path in paths)
+
+    load_routes(app)
+    assert [route.path for route in app.routes] == paths
+    assert "nnieto" in app.state.installed_routes
@@ -0,0 +1,82 @@
+"""# 🧪 Test Suite for the logging configuration.
+
+This module verifies `app.log_utils`:
+- 🧾 The JSON formatter writes one compact object per line.
+- 🎲 The sampling filter keeps 1 of every N messages of each call site, and every warning.
+- 📬 The `json` format writes the messages from a `QueueListener` thread, and stops it when replaced.
+"""
+
+import io
+import json
+import logging
+
+import pytest
+
+from app import log_utils
+from app.log_utils import JsonFormatter, SamplingFilter, setup_logging
+
+
+def record(msg, *args, level=logging.INFO, name="app.test", lineno=1):
+    """Build a log record, logged from line `lineno` of this file."""
+    return logging.LogRecord(name, level, __file__, lineno, msg, args, None)
+
+
+def test_json_formatter():
+    """🧾 The record is one line of JSON with the message already formatted."""
+    line = JsonFormatter().format(record("Instalando ruta de API en %s", "/api/v1/nnieto"))
+    assert "\n" not in line
+    entry = json.loads(line)
+    assert entry["level"] == "INFO"
+    assert entry["logger"] == "app.test"
+    assert entry["msg"] == "Instalando ruta de API en /api/v1/nnieto"
+    assert entry["ts"].endswith("+00:00")
+
+
+def test_sampling_filter():
+    """🎲 Each repeated message is kept once every N times, warnings are always kept."""
+    sampling = SamplingFilter(0.25)
+    kept = [sampling.filter(record("Ruta %s", i)) for i in range(8)]
+    assert kept == [True, False, False, False, True, False, False, False]
+    assert sampling.filter(record("Otro mensaje", lineno=2))
+    assert all(sampling.filter(record("Cuidado", level=logging.WARNING)) for _ in range(4))
+    with pytest.raises(ValueError, match="entre 0 y 1"):
+        SamplingFilter(0)
+
+
+def test_sampling_by_call_site():
+    """🎲 Messages built with f-strings on one line are sampled together, and the call sites are bounded."""
+    stream = io.StringIO()
+    setup_logging(log_format="rich", sample_rate=0.25, name="app.test_sampling", stream=stream)
+    logger = logging.getLogger("app.test_sampling")
+    for i in range(8):
+        logger.info(f"Petición {i}")
+    assert "Petición 0" in stream.getvalue()
+    assert "Petición 4" in stream.getvalue()
+    assert sum(f"Petición {i}" in stream.getvalue() for i in range(8)) == 2
+
+    sampling = SamplingFilter(0.5, maxsize=2)
+    assert all(sampling.filter(record("Mensaje", lineno=line)) for line in (1, 2, 3))
+    # Line 1 was forgotten to count lines 2 and 3
+    assert sampling.filter(record("Mensaje", lineno=1))
+    assert not sampling.filter(record("Mensaje", lineno=3))
+
+
+def test_json_queue_logging():
+    """📬 The messages go through the queue and are written as JSON lines."""
+    stream = io.StringIO()
+    listener = setup_logging(log_format="json", sample_rate=0.5, name="app.test_queue", stream=stream)
+    logger = logging.getLogger("app.test_queue")
+    for i in range(4):
+        logger.info("Petición %d", i)
+    logger.error("Falló")
+    # Replacing the handler stops the listener, which writes the pending messages
+    replacement = setup_logging(log_format="json", name="app.test_queue", stream=io.StringIO())
+    assert not listener._thread
+    assert log_utils._listeners["app.test_queue"] is replacement
+    entries = [json.loads(line) for line in stream.getvalue().splitlines()]
+    assert [entry["msg"] for entry in entries] == ["Petición 0", "Petición 2", "Falló"]
+    setup_logging(log_format="rich", name="app.test_queue", stream=io.StringIO())
+    assert not replacement._thread
+    assert "app.test_queue" not in log_utils._listeners
+    with pytest.raises(ValueError, match="Formato de log desconocido"):
+        setup_logging(log_format="xml", name="app.test_queue")
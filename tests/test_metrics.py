@@ -0,0 +1,123 @@
+"""# 🧪 Test Suite for the latency histograms of the middleware stack.
+
+This module verifies `app.metrics` and the `/api/v1/_internal/metrics/middleware` endpoint:
+- 🧱 Every middleware is installed once and profiled.
+- ⏱️ The histograms count the observations in the right buckets.
+- 📊 The endpoint reports the layers and the routes of the requests.
+- 📈 `/metrics` reports the requests, errors, requests in progress and SQL statements by route.
+"""
+
+import re
+
+from fastapi import FastAPI, status
+from fastapi.middleware.cors import CORSMiddleware
+from fastapi.testclient import TestClient
+
+from app.main import app as main_app
+from app.metrics import (
+    APP_LAYER,
+    UNMATCHED_ROUTE,
+    LatencyHistogram,
+    MetricsMiddleware,
+    TimedMiddleware,
+    instrument_engine,
+    render_metrics,
+)
+
+TRANSACTION_ROUTE = "/api/v1/nnieto/alcancia/transaction/{txn_type}/{quantity}"
+TRANSACTIONS_ROUTE = "/api/v1/nnieto/alcancia/transactions"
+
+
+def sample(metrics: str, name: str, **labels: str) -> float:
+    """Return the value of a sample in the Prometheus text format, or 0 if it is not there."""
+    rendered = ",".join(f'{key}="{value}"' for key, value in labels.items())
+    match = re.search(rf"^{re.escape(name)}{{{re.escape(rendered)}}} (\S+)$", metrics, re.MULTILINE)
+    return float(match[1]) if match else 0.0
+
+
+def test_middleware_stack():
+    """🧱 Each middleware appears once in the stack, wrapped by `TimedMiddleware`."""
+    middlewares = [args[0] for cls, args, _ in main_app.user_middleware if cls is TimedMiddleware]
+    assert len(middlewares) == len(main_app.user_middleware)
+    assert middlewares.count(CORSMiddleware) == 1
+
+
+def test_latency_histogram():
+    """⏱️ The buckets are cumulative and the slow observations go to `+Inf`."""
+    histogram = LatencyHistogram(buckets=(0.01, 0.1))
+    for seconds in (0.005, 0.01, 0.05, 3):
+        histogram.observe(seconds)
+    result = histogram.as_dict()
+    assert result["buckets"] == {"0.01": 2, "0.1": 3, "+Inf": 4}
+    assert result["count"] == 4
+    assert result["max"] == 3
+    assert result["avg"] == (0.005 + 0.01 + 0.05 + 3) / 4
+
+
+def test_middleware_metrics(rest_api):
+    """📊 The endpoint reports the time of each layer and of each route."""
+    response = rest_api.delete("/api/v1/_internal/metrics/middleware")
+    assert response.status_code == status.HTTP_204_NO_CONTENT
+    response = rest_api.get("/api/v1/nnieto/alcancia/transactions", headers={"Origin": "http://localhost:3000"})
+    assert response.status_code == status.HTTP_200_OK
+
+    response = rest_api.get("/api/v1/_internal/metrics/middleware")
+    assert response.status_code == status.HTTP_200_OK
+    data = response.json()
+    assert {"CORSMiddleware", "LazyRoutesMiddleware", APP_LAYER} <= data["layers"].keys()
+    assert data["layers"][APP_LAYER]["count"] == 2
+    route = data["routes"]["GET /api/v1/nnieto/alcancia/transactions"]
+    assert route["count"] == 1
+    assert route["buckets"]["+Inf"] == 1
+    assert route["sum"] > 0
+
+
+def test_prometheus_metrics(rest_api, db_engine, async_db_engine):
+    """📈 `/metrics` counts the requests and their SQL statements by route template."""
+    instrument_engine(db_engine)
+    instrument_engine(async_db_engine.sync_engine)
+    before = render_metrics()
+    assert rest_api.put("/api/v1/nnieto/alcancia/transaction/deposit/100").status_code == status.HTTP_201_CREATED
+    assert rest_api.get(TRANSACTIONS_ROUTE).status_code == status.HTTP_200_OK
+    assert rest_api.get("/api/v1/nnieto/no-existe").status_code == status.HTTP_404_NOT_FOUND
+
+    response = rest_api.get("/metrics")
+    assert response.status_code == status.HTTP_200_OK
+    assert response.headers["content-type"].startswith("text/plain; version=0.0.4")
+    after = response.text
+
+    def delta(name, **labels):
+        return sample(after, name, **labels) - sample(before, name, **labels)
+
+    put = {"method": "PUT", "route": TRANSACTION_ROUTE}
+    get = {"method": "GET", "route": TRANSACTIONS_ROUTE}
+    assert delta("http_requests_total", **put, status="201") == 1
+    assert delta("http_requests_total", **get, status="200") == 1
+    assert delta("http_requests_total", method="GET", route=UNMATCHED_ROUTE, status="404") == 1
+    assert delta("http_request_duration_seconds_count", **put) == 1
+    assert delta("http_request_duration_seconds_bucket", **put, le="+Inf") == 1
+    # Async routes run their SQL in a greenlet, sync routes in the thread pool
+    assert delta("db_statements_total", **put) > 0
+    assert delta("db_statements_total", **get) > 0
+    assert delta("db_request_duration_seconds_sum", **get) > 0
+    # The request to /metrics is in progress
+    assert sample(after, "http_requests_in_progress", method="GET") == 1
+    assert "# TYPE http_middleware_duration_seconds histogram" in after
+
+
+def test_prometheus_errors():
+    """📈 Requests that fail are counted as errors."""
+    app = FastAPI()
+    app.add_middleware(MetricsMiddleware)
+
+    @app.get("/boom")
+    def boom():
+        raise RuntimeError
+
+    before = render_metrics()
+    response = TestClient(app, raise_server_exceptions=False).get("/boom")
+    assert response.status_code == status.HTTP_500_INTERNAL_SERVER_ERROR
+    after = render_metrics()
+    labels = {"method": "GET", "route": "/boom"}
+    assert sample(after, "http_request_errors_total", **labels) - sample(before, "http_request_errors_total", **labels) == 1
+    assert sample(after, "http_requests_total", **labels, status="500") == 1
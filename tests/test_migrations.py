@@ -0,0 +1,68 @@
+"""# 🧪 Test Suite for the schema migrations.
+
+This module verifies `app.migrations`:
+- 🔍 The migrations of every project are discovered in order.
+- 🗄️ Pending migrations reach a database created before them, and only once.
+- 🧰 The helpers are idempotent.
+- 💻 The `soa db` commands.
+"""
+
+from sqlalchemy import inspect, text
+from typer.testing import CliRunner
+
+from app.cli import cli
+from app.migrations import add_column, create_index, discover_migrations, pending_migrations, run_migrations
+
+
+def _index_names(db_engine, table: str) -> set[str]:
+    return {index["name"] for index in inspect(db_engine).get_indexes(table)}
+
+
+def test_discover_migrations():
+    """🔍 Migrations are found in `app.proyectos.<project>.migrations`."""
+    found = [(m.project, m.version, m.name) for m in discover_migrations()]
+    assert ("imoreno", "0001", "full_name_index") in found
+    assert ("rpalma", "0001", "nombre_index") in found
+    assert found == sorted(found, key=lambda m: (m[0], int(m[1])))
+
+
+def test_migrations_reach_an_existing_database(db_engine):
+    """🗄️ An index added to a model reaches a table created before it."""
+    with db_engine.begin() as connection:
+        connection.execute(text("DROP INDEX ix_contactos_agenda_nombre"))
+    assert "ix_contactos_agenda_nombre" not in _index_names(db_engine, "contactos_agenda")
+
+    applied = run_migrations(db_engine, project="rpalma")
+    assert [(m.project, m.version) for m in applied] == [("rpalma", "0001")]
+    assert "ix_contactos_agenda_nombre" in _index_names(db_engine, "contactos_agenda")
+
+    # Applied migrations are recorded and do not run again
+    assert run_migrations(db_engine, project="rpalma") == []
+    assert all(m.project != "rpalma" for m in pending_migrations(db_engine))
+
+
+def test_helpers_are_idempotent(db_engine):
+    """🧰 `create_index` and `add_column` do nothing if the change is already there."""
+    with db_engine.begin() as connection:
+        for _ in range(2):
+            create_index(connection, "ix_ventas_cliente", "ventas", ["cliente"])
+            add_column(connection, "ventas", "notas VARCHAR")
+    assert "ix_ventas_cliente" in _index_names(db_engine, "ventas")
+    assert "notas" in {c["name"] for c in inspect(db_engine).get_columns("ventas")}
+
+
+def test_db_commands(db_engine, monkeypatch):
+    """💻 `soa db migrate` applies the pending migrations and `soa db status` lists them."""
+    monkeypatch.setattr("app.db.engine", db_engine)
+    runner = CliRunner()
+
+    result = runner.invoke(cli, ["db", "status"])
+    assert result.exit_code == 0
+    assert "[ ] rpalma 0001_nombre_index" in result.output
+
+    result = runner.invoke(cli, ["db", "migrate"])
+    assert result.exit_code == 0
+    assert "Aplicada: rpalma 0001_nombre_index" in result.output
+
+    result = runner.invoke(cli, ["db", "status"])
+    assert "[x] rpalma 0001_nombre_index" in result.output
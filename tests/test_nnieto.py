@@ -5,10 +5,20 @@ This module contains tests for the Alcancia API endpoints. It verifies the follo
 - 💰 Deposit transactions.
 - 💸 Withdrawal transactions.
 - 🔍 Validation of input data for transactions.
+- 🧮 The running balance and its maintenance commands.
+- 🔒 Concurrent withdrawals.
 """
 
+from concurrent.futures import ThreadPoolExecutor
+
 from fastapi import status
+from sqlmodel import Session, create_engine
+from typer.testing import CliRunner
 
+from app.cli import cli
+from app.db import initialize_database
+from app.proyectos.nnieto.ledger import InsufficientFundsError, ledger_totals, record_transaction, verify_balance
+from app.proyectos.nnieto.models import Transaction
 from app.proyectos.nnieto.schemas import TransactionResponse, TransactionResult, TransactionType
 
 BASE_PATH = "/api/v1/nnieto/alcancia"
@@ -131,3 +141,71 @@ def test_transaction_validation(rest_api):
     r = response.json()
     assert r["detail"][0]['msg'] == "Input should be a valid integer, unable to parse string as an integer"
 
+
+def test_running_balance(rest_api, db_engine):
+    """🧮 The running balance follows the transactions ledger."""
+    rest_api.put(f"{BASE_PATH}/transaction/{TransactionType.deposit}/500")
+    response = rest_api.put(f"{BASE_PATH}/transaction/{TransactionType.withdraw}/200")
+    r = TransactionResponse(**response.json())
+    assert r.previous_balance == 500
+    assert r.balance == 300
+
+    with Session(db_engine) as db:
+        check = verify_balance(db)
+    assert check.ok
+    assert check.ledger == 300
+
+
+def test_balance_commands(db_engine, monkeypatch):
+    """🧮 `rebuild-balance` fixes a running balance that drifted from the ledger."""
+    monkeypatch.setattr("app.db.engine", db_engine)
+    with Session(db_engine) as db:
+        db.add(Transaction(amount=700))
+        db.commit()
+
+    runner = CliRunner()
+    result = runner.invoke(cli, ["nnieto", "verify-balance"])
+    assert result.exit_code == 1
+
+    result = runner.invoke(cli, ["nnieto", "rebuild-balance"])
+    assert result.exit_code == 0
+    assert "700" in result.output
+
+    result = runner.invoke(cli, ["nnieto", "verify-balance"])
+    assert result.exit_code == 0
+
+
+def test_concurrent_withdrawals(tmp_path):
+    """💸 Concurrent withdrawals never overdraw the alcancía."""
+    engine = create_engine(
+        f"sqlite:///{tmp_path / 'alcancia.db'}",
+        connect_args={"check_same_thread": False, "timeout": 30},
+    )
+    initialize_database(engine)
+    with Session(engine) as db:
+        record_transaction(db, 50)
+        db.commit()
+
+    def withdraw_until_empty() -> int:
+        settled = 0
+        with Session(engine) as db:
+            for _ in range(20):
+                try:
+                    record_transaction(db, -1)
+                    db.commit()
+                    settled += 1
+                except InsufficientFundsError:
+                    db.rollback()
+        return settled
+
+    with ThreadPoolExecutor(max_workers=8) as pool:
+        settled = sum(pool.map(lambda _: withdraw_until_empty(), range(8)))
+
+    assert settled == 50
+    with Session(engine) as db:
+        check = verify_balance(db)
+        assert check.ok
+        assert check.ledger == 0
+        # Rejected withdrawals leave nothing in the ledger
+        assert ledger_totals(db).transactions == 51
+    engine.dispose()
@@ -0,0 +1,101 @@
+"""# 🧪 Test Suite for the shared pagination layer.
+
+This module uses the Alcancia and Contactos APIs to verify `app.pagination`:
+- 📄 Keyset pages with `limit` and the `X-Next-Cursor` header.
+- 🔖 Resuming from `after_id` or from an opaque cursor.
+- 🌊 NDJSON streaming.
+- 🔍 Validation of the pagination parameters.
+"""
+
+import json
+
+from fastapi import status
+
+from app.pagination import NDJSON_MEDIA_TYPE, NEXT_CURSOR_HEADER, decode_cursor, encode_cursor
+
+BASE_PATH = "/api/v1/nnieto/alcancia"
+
+
+def _deposit(rest_api, times: int):
+    for quantity in range(1, times + 1):
+        response = rest_api.put(f"{BASE_PATH}/transaction/deposit/{quantity}")
+        assert response.status_code == status.HTTP_201_CREATED
+
+
+def test_cursor_roundtrip():
+    """🔖 A cursor decodes to the id it was built from."""
+    assert decode_cursor(encode_cursor(42)) == 42
+
+
+def test_without_limit_returns_everything(rest_api):
+    """📄 Without `limit` the whole table is returned and there is no next cursor."""
+    _deposit(rest_api, 5)
+    response = rest_api.get(f"{BASE_PATH}/transactions")
+    assert response.status_code == status.HTTP_200_OK
+    assert [t["amount"] for t in response.json()] == [1, 2, 3, 4, 5]
+    assert NEXT_CURSOR_HEADER not in response.headers
+
+
+def test_pages_follow_the_cursor(rest_api):
+    """📄 Walking the pages with the cursor returns every row exactly once."""
+    _deposit(rest_api, 5)
+    amounts = []
+    params = {"limit": 2}
+    pages = 0
+    while True:
+        response = rest_api.get(f"{BASE_PATH}/transactions", params=params)
+        assert response.status_code == status.HTTP_200_OK
+        amounts.extend(t["amount"] for t in response.json())
+        pages += 1
+        if NEXT_CURSOR_HEADER not in response.headers:
+            break
+        params = {"limit": 2, "cursor": response.headers[NEXT_CURSOR_HEADER]}
+    assert amounts == [1, 2, 3, 4, 5]
+    assert pages == 3
+
+
+def test_after_id(rest_api):
+    """🔖 `after_id` skips the rows up to that primary key."""
+    _deposit(rest_api, 3)
+    first_id = rest_api.get(f"{BASE_PATH}/transactions").json()[0]["id"]
+    response = rest_api.get(f"{BASE_PATH}/transactions", params={"after_id": first_id})
+    assert [t["amount"] for t in response.json()] == [2, 3]
+
+
+def test_ndjson_stream(rest_api):
+    """🌊 Clients asking for NDJSON get one row per line."""
+    _deposit(rest_api, 3)
+    response = rest_api.get(
+        f"{BASE_PATH}/transactions",
+        params={"limit": 2},
+        headers={"Accept": NDJSON_MEDIA_TYPE},
+    )
+    assert response.status_code == status.HTTP_200_OK
+    assert response.headers["content-type"].startswith(NDJSON_MEDIA_TYPE)
+    rows = [json.loads(line) for line in response.text.splitlines()]
+    assert [r["amount"] for r in rows] == [1, 2]
+
+
+def test_other_projects_are_paginated(rest_api):
+    """📄 Other project routers, including wrapped lists, use the same parameters."""
+    for name in ("Alien", "Brazil"):
+        movie = {"name": name, "director": "Someone", "release": "1985-01-01T00:00:00"}
+        rest_api.post("/api/v1/ksoto/pelicula/movies", json=movie)
+    response = rest_api.get("/api/v1/ksoto/pelicula/movies", params={"limit": 1})
+    assert response.status_code == status.HTTP_200_OK
+    assert [m["name"] for m in response.json()["returnJson"]] == ["Alien"]
+    assert NEXT_CURSOR_HEADER in response.headers
+
+    for nombre in ("Ana", "Beto", "Carla"):
+        rest_api.post("/api/v1/rpalma/contactos/create", json={"nombre": nombre, "telefono": "1234567890"})
+    response = rest_api.get("/api/v1/rpalma/contactos/agenda", params={"limit": 2})
+    assert [c["nombre"] for c in response.json()] == ["Ana", "Beto"]
+    assert NEXT_CURSOR_HEADER in response.headers
+
+
+def test_invalid_parameters(rest_api):
+    """🔍 Invalid pagination parameters are rejected."""
+    response = rest_api.get(f"{BASE_PATH}/transactions", params={"limit": 0})
+    assert response.status_code == status.HTTP_422_UNPROCESSABLE_ENTITY
+    response = rest_api.get(f"{BASE_PATH}/transactions", params={"cursor": "not a cursor"})
+    assert response.status_code == status.HTTP_400_BAD_REQUEST
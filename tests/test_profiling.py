@@ -0,0 +1,74 @@
+"""# 🧪 Test Suite for the on-demand request profiler.
+
+This module verifies `app.profiling.ProfilerMiddleware`:
+- 🐢 Requests without the `X-Profile` header are not profiled.
+- 📄 `X-Profile: text` returns the report, covering the dependencies and the SQL execution.
+- 💾 Other values store the report and return the response as usual.
+"""
+
+import pytest
+from fastapi import FastAPI, status
+from fastapi.testclient import TestClient
+from sqlmodel import Session
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+from app.db import get_async_read_session, get_async_session, get_read_session, get_session
+from app.profiling import PROFILE_HEADER, PROFILE_REPORT_HEADER, ProfilerMiddleware
+from app.proyectos.nnieto.routes import api_router
+
+BASE_PATH = "/api/v1/nnieto/alcancia"
+
+
+@pytest.fixture
+def client(db_engine, async_db_engine, tmp_path):
+    """Application with the **Alcancia** routes and the profiler, storing the reports in `tmp_path`."""
+    app = FastAPI()
+    app.add_middleware(ProfilerMiddleware, directory=tmp_path)
+    app.include_router(api_router, prefix="/api/v1/nnieto")
+
+    def get_session_override():
+        with Session(db_engine) as session:
+            yield session
+
+    async def get_async_session_override():
+        async with AsyncSession(async_db_engine, expire_on_commit=False) as session:
+            yield session
+
+    app.dependency_overrides[get_session] = get_session_override
+    app.dependency_overrides[get_read_session] = get_session_override
+    app.dependency_overrides[get_async_session] = get_async_session_override
+    app.dependency_overrides[get_async_read_session] = get_async_session_override
+    with TestClient(app) as client:
+        yield client
+
+
+def test_without_header(client, tmp_path):
+    """🐢 The requests without the header are not profiled."""
+    response = client.put(f"{BASE_PATH}/transaction/deposit/100")
+    assert response.status_code == status.HTTP_201_CREATED
+    assert PROFILE_REPORT_HEADER not in response.headers
+    assert list(tmp_path.iterdir()) == []
+
+
+def test_text_report(client):
+    """📄 The report replaces the response and covers the handler, the ledger and SQLAlchemy."""
+    response = client.put(f"{BASE_PATH}/transaction/deposit/100", headers={PROFILE_HEADER: "text"})
+    assert response.status_code == status.HTTP_200_OK
+    assert response.headers["content-type"].startswith("text/plain")
+    report = response.text
+    assert report.startswith(f"PUT {BASE_PATH}/transaction/deposit/100 -> 201")
+    assert "create_transaction" in report
+    assert "record_transaction" in report
+    assert "sqlalchemy" in report
+    # The transaction was recorded
+    assert client.get(f"{BASE_PATH}/transactions").json()[0]["amount"] == 100
+
+
+def test_stored_report(client, tmp_path):
+    """💾 The report is stored and the response is returned as usual."""
+    response = client.get(f"{BASE_PATH}/transactions", headers={PROFILE_HEADER: "1"})
+    assert response.status_code == status.HTTP_200_OK
+    assert response.json() == []
+    name = response.headers[PROFILE_REPORT_HEADER]
+    assert (tmp_path / f"{name}.pstats").exists()
+    assert "transactions_list" in (tmp_path / f"{name}.txt").read_text()
@@ -0,0 +1,68 @@
+"""# 🧪 Query plans of the lookup routes.
+
+This module calls every route that looks up rows with a `WHERE` clause, records the SQL it
+runs and asks SQLite for the plan of each statement with `EXPLAIN QUERY PLAN`:
+- 🔎 Lookups must `SEARCH` a table through its primary key or an index.
+- 🚫 A `SCAN` means a full table scan, add an index for the filtered columns.
+
+Listings and aggregates (`SUM`, `COUNT`) read the whole table on purpose and have no `WHERE` clause.
+"""
+
+import re
+
+import pytest
+from sqlalchemy import event
+
+LOOKUPS = [
+    ("GET", "/api/v1/asantelis/animales/1"),
+    ("DELETE", "/api/v1/asantelis/animales/1"),
+    ("GET", "/api/v1/dduenas/estudiantes/1"),
+    ("GET", "/api/v1/dramos/productos/1"),
+    ("DELETE", "/api/v1/fcalzada/registro_carro/eliminar/1"),
+    ("GET", "/api/v1/imayo/eventos/1"),
+    ("GET", "/api/v1/imoreno/hotel/operations/search?first_name=Isa%C3%AD&middle_name=Moreno&last_name=Mendoza"),
+    ("DELETE", "/api/v1/imoreno/hotel/operations/delete?first_name=Isa%C3%AD&middle_name=Moreno&last_name=Mendoza"),
+    ("GET", "/api/v1/jchaidez/cursos/1"),
+    ("GET", "/api/v1/jcontreras/ventas/1"),
+    ("DELETE", "/api/v1/jcontreras/ventas/1"),
+    ("GET", "/api/v1/jparedes/libros/1"),
+    ("GET", "/api/v1/ksoto/pelicula/movie/1/Alien"),
+    ("DELETE", "/api/v1/ksoto/pelicula/movies/1/Alien"),
+    ("GET", "/api/v1/nnieto/alcancia/transactions?after_id=1&limit=10"),
+    ("PUT", "/api/v1/nnieto/alcancia/transaction/withdraw/1"),
+    ("GET", "/api/v1/rgarcia/recetas/receta?receta_id=1"),
+    ("DELETE", "/api/v1/rgarcia/recetas/eliminar?receta_id=1"),
+    ("DELETE", "/api/v1/rpalma/contactos/delete/1"),
+    ("GET", "/api/v1/rpalma/contactos/search/Ana"),
+]
+"""Routes that filter rows. The rows do not need to exist, only the query matters."""
+
+
+@pytest.fixture
+def statements(db_engine, async_db_engine) -> list[tuple[str, tuple]]:
+    """Record the statements (and their parameters) executed by both engines."""
+    recorded = []
+
+    def record(conn, cursor, statement, parameters, context, executemany):  # noqa: ARG001
+        recorded.append((statement, parameters))
+
+    engines = (db_engine, async_db_engine.sync_engine)
+    for engine in engines:
+        event.listen(engine, "before_cursor_execute", record)
+    yield recorded
+    for engine in engines:
+        event.remove(engine, "before_cursor_execute", record)
+
+
+def test_lookups_use_an_index(rest_api, statements, db_engine):
+    """🔎 No lookup route falls back to a full table scan."""
+    for method, url in LOOKUPS:
+        rest_api.request(method, url)
+
+    lookups = {(s, tuple(p)) for s, p in statements if re.search(r"\bWHERE\b", s)}
+    assert lookups, "No lookup statement was executed"
+    with db_engine.connect() as connection:
+        for statement, parameters in sorted(lookups):
+            plan = connection.exec_driver_sql(f"EXPLAIN QUERY PLAN {statement}", parameters).all()
+            scans = [row.detail for row in plan if row.detail.startswith("SCAN")]
+            assert not scans, f"Full table scan in {statement!r}: {scans}"
@@ -0,0 +1,85 @@
+"""# 🧪 Test Suite for the fast JSON serialization of the responses.
+
+This module verifies `app.serialization`:
+- 🧰 The `TypeAdapter` of each response model is built once.
+- ⚡ Table rows are encoded as they are, rows listed as a read schema keep only its fields,
+  and other rows are validated against the response model.
+- 📚 A paginated list route returns the same JSON, and the cursor, through `FastJSONResponse`.
+"""
+
+import json
+from datetime import date, datetime
+
+from fastapi import status
+from pydantic import BaseModel
+from sqlmodel import Session, select
+
+from app.pagination import NEXT_CURSOR_HEADER
+from app.proyectos.dramos.models import Producto
+from app.proyectos.imayo.models import Event
+from app.proyectos.imayo.schemas import EventRead
+from app.serialization import FastJSONResponse, dump_json, needs_validation, projection, type_adapter
+
+
+class EventDay(BaseModel):
+    """A schema whose types differ from the `Event` table."""
+
+    nombre: str
+    fecha: date
+
+
+def test_type_adapter_is_cached():
+    """🧰 The same response model gets the same `TypeAdapter`."""
+    assert type_adapter(list[EventRead]) is type_adapter(list[EventRead])
+
+
+def test_table_rows(db_engine):
+    """⚡ Rows of a table listed as themselves are encoded without validation."""
+    with Session(db_engine) as db:
+        db.add(Producto(nombre="Laptop", tipo="Electrónica", precio=1200.99))
+        db.commit()
+        rows = db.exec(select(Producto)).all()
+        assert not needs_validation(rows, list[Producto])
+        assert json.loads(dump_json(rows, list[Producto])) == [rows[0].model_dump(mode="json")]
+
+
+def test_read_schema_rows(db_engine):
+    """⚡ Rows listed as another schema only send its fields, validating them when the types differ."""
+    with Session(db_engine) as db:
+        db.add(Event(nombre="Conferencia", descripcion="Tecnología", fecha=datetime(2025, 6, 15)))
+        db.commit()
+        rows = db.exec(select(Event)).all()
+        assert needs_validation(rows, list[EventRead])
+        assert projection(Event, EventRead) == set(EventRead.model_fields)
+        expected = [EventRead.model_validate(rows[0], from_attributes=True).model_dump(mode="json")]
+        assert json.loads(dump_json(rows, list[EventRead])) == expected
+
+        assert projection(Event, EventDay) is None
+        assert json.loads(dump_json(rows, list[EventDay])) == [{"nombre": "Conferencia", "fecha": "2025-06-15"}]
+        assert json.loads(dump_json(rows[0], EventDay)) == {"nombre": "Conferencia", "fecha": "2025-06-15"}
+    assert not needs_validation([], list[EventRead])
+
+
+def test_fast_json_response():
+    """⚡ Without a response model the content is encoded as it is."""
+    response = FastJSONResponse({"saldo": 100, "fecha": datetime(2025, 1, 1)}, headers={"X-Test": "1"})
+    assert response.body == b'{"saldo":100,"fecha":"2025-01-01T00:00:00"}'
+    assert response.headers["content-type"] == "application/json"
+    assert response.headers["x-test"] == "1"
+
+
+def test_paginated_list(rest_api):
+    """📚 The list of books keeps its JSON and its cursor."""
+    for isbn in (1, 2):
+        response = rest_api.post("/api/v1/jparedes/libros", json={"isbn": isbn, "titulo": "Libro", "autor": "Autor"})
+        assert response.status_code == status.HTTP_201_CREATED
+
+    response = rest_api.get("/api/v1/jparedes/libros", params={"limit": 1})
+    assert response.status_code == status.HTTP_200_OK
+    assert [book["isbn"] for book in response.json()] == [1]
+    assert set(response.json()[0]) == {"id", "isbn", "titulo", "autor", "created_at"}
+    cursor = response.headers[NEXT_CURSOR_HEADER]
+
+    response = rest_api.get("/api/v1/jparedes/libros", params={"limit": 1, "cursor": cursor})
+    assert [book["isbn"] for book in response.json()] == [2]
+    assert NEXT_CURSOR_HEADER not in response.headers
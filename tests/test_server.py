@@ -0,0 +1,56 @@
+"""# 🧪 Test Suite for the production server.
+
+This module verifies `app.server` and the startup of the workers in `app.main.lifespan_cycle`:
+- ⚡ `auto` picks uvloop and httptools when they are installed.
+- 🧵 The thread pool of the `def` routes has `settings.thread_pool_size` threads.
+- 📦 A preloaded application does not create the tables again in each worker.
+- 🚫 `--reload` cannot run several workers.
+"""
+
+import importlib.util
+
+from anyio import to_thread
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from typer.testing import CliRunner
+
+from app import main
+from app.config import settings
+from app.server import Http, Loop, cli, resolve_http, resolve_loop
+
+
+def test_resolve_loop_and_http(monkeypatch):
+    """⚡ `auto` means uvloop and httptools if they are installed, and the pure Python ones if not."""
+    assert resolve_loop("asyncio") == "asyncio"
+    assert resolve_http("h11") == "h11"
+    assert (resolve_loop(Loop.uvloop), resolve_http(Http.h11)) == ("uvloop", "h11")
+    monkeypatch.setattr(importlib.util, "find_spec", lambda _: object())
+    assert (resolve_loop("auto"), resolve_http("auto")) == ("uvloop", "httptools")
+    monkeypatch.setattr(importlib.util, "find_spec", lambda _: None)
+    assert (resolve_loop("auto"), resolve_http("auto")) == ("asyncio", "h11")
+
+
+def test_preloaded_worker_startup(monkeypatch):
+    """🧵📦 A worker sizes its thread pool and skips the startup work the main process already did."""
+    calls = []
+    monkeypatch.setattr(main, "initialize_database", lambda: calls.append("initialize_database"))
+    monkeypatch.setattr(main, "run_migrations", lambda: calls.append("run_migrations"))
+    monkeypatch.setattr(settings, "thread_pool_size", 7)
+    app = FastAPI(lifespan=main.lifespan_cycle)
+    app.state.lazy_routes = {}
+    app.state.preloaded = True
+
+    @app.get("/threads")
+    async def threads():
+        return to_thread.current_default_thread_limiter().total_tokens
+
+    with TestClient(app) as client:
+        assert client.get("/threads").json() == 7
+    assert calls == []
+
+
+def test_reload_needs_a_single_worker():
+    """🚫 `serve --reload` only works with one worker."""
+    result = CliRunner().invoke(cli, ["--workers", "2", "--reload"])
+    assert result.exit_code == 1
+    assert "--reload" in result.output
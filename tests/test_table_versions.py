@@ -0,0 +1,89 @@
+"""# 🧪 Test Suite for `app.table_versions`.
+
+This module verifies the version counters of the tables:
+- 🔢 Every commit that writes to a table increments its version.
+- ↩️ Rolled back writes do not count.
+- 📣 The commit listeners receive the written tables.
+"""
+
+import asyncio
+
+from sqlmodel import Session, delete, select, update
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+from app.proyectos.jcontreras.models import Sale
+from app.proyectos.nnieto.models import Transaction
+from app.table_versions import _commit_listeners, on_commit, read_versions
+
+
+def _version(db_engine, model) -> int:
+    with Session(db_engine) as db:
+        return read_versions(db, [model.__table__])[0].version
+
+
+def _sale(cliente: str = "Ana") -> Sale:
+    return Sale(cliente=cliente, producto="Monitor LG", cantidad=1, precio=5000.0)
+
+
+def test_versions_follow_the_commits(db_engine):
+    """🔢 Inserts, updates and deletes increment the version of their table only."""
+    assert _version(db_engine, Sale) == 0
+
+    with Session(db_engine) as db:
+        sale = _sale()
+        db.add(sale)
+        db.commit()
+        assert _version(db_engine, Sale) == 1
+
+        sale.cantidad = 3
+        db.commit()
+        assert _version(db_engine, Sale) == 2
+
+        db.exec(update(Sale).values(precio=10.0))
+        db.exec(delete(Sale).where(Sale.cliente == "Nadie"))
+        db.commit()
+        assert _version(db_engine, Sale) == 4
+
+        db.delete(sale)
+        db.commit()
+    assert _version(db_engine, Sale) == 5
+    assert _version(db_engine, Transaction) == 0
+
+    with Session(db_engine) as db:
+        versions = read_versions(db, [Sale.__table__])
+    assert versions[0].name == "ventas"
+    assert versions[0].modified > 0
+
+
+def test_reads_and_rollbacks_do_not_count(db_engine):
+    """↩️ Reading a table or rolling back a write leaves its version alone."""
+    with Session(db_engine) as db:
+        db.exec(select(Sale)).all()
+        db.add(_sale())
+        db.flush()
+        db.rollback()
+    assert _version(db_engine, Sale) == 0
+
+
+def test_commit_listeners(db_engine, async_db_engine):
+    """📣 The listeners get the tables written by each commit, also from asynchronous sessions."""
+    commits = []
+    on_commit(commits.append)
+    try:
+        with Session(db_engine) as db:
+            db.add(_sale())
+            db.add(Transaction(amount=100))
+            db.commit()
+            db.exec(select(Sale)).all()
+            db.commit()
+
+        async def add_sale():
+            async with AsyncSession(async_db_engine) as db:
+                db.add(_sale("Luis"))
+                await db.commit()
+
+        asyncio.run(add_sale())
+    finally:
+        _commit_listeners.remove(commits.append)
+    assert commits == [frozenset({"ventas", "alcancia_transaction"}), frozenset({"ventas"})]
+    assert _version(db_engine, Sale) == 2
@@ -0,0 +1,80 @@
+"""# 🧪 Test Suite for the thread pool of the `def` routes.
+
+This module verifies `app.threadpool`:
+- 🚧 The slow `def` routes of a project wait on its bulkhead and do not starve the other projects.
+- 📈 `/metrics` and `/api/v1/_internal/threadpool` report the queue wait and the saturation.
+"""
+
+import asyncio
+import threading
+
+import httpx
+import pytest
+from fastapi import APIRouter, FastAPI, status
+
+from app import threadpool
+from app.config import settings
+from app.metrics import THREADPOOL_BUSY, THREADPOOL_WAITING
+from tests.test_metrics import sample
+
+
+@pytest.fixture
+def bulkheads(monkeypatch):
+    """Empty registry of bulkheads, and a bulkhead of 2 for the `slow` project."""
+    monkeypatch.setattr(threadpool, "bulkheads", {})
+    monkeypatch.setattr(settings, "bulkheads", {"slow": 2})
+    return threadpool.bulkheads
+
+
+def test_bulkhead_isolates_projects(bulkheads):
+    """🚧 With every request of `slow` blocked, `fast` still gets a thread."""
+    release = threading.Event()
+    slow, fast = APIRouter(), APIRouter()
+
+    @slow.get("/{n}")
+    def blocked(n: int) -> int:
+        release.wait(timeout=5)
+        return n
+
+    @fast.get("/")
+    def quick() -> str:
+        return "ok"
+
+    app = FastAPI()
+    app.include_router(slow, prefix="/slow")
+    assert threadpool.install_bulkheads(app.router.routes, "slow") == 1
+    app.include_router(fast, prefix="/fast")
+
+    async def scenario():
+        threadpool.configure_thread_pool(4)
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+            blocked_requests = [asyncio.create_task(client.get(f"/slow/{n}")) for n in range(6)]
+            async with asyncio.timeout(5):
+                while THREADPOOL_BUSY.value("slow") < 2 or THREADPOOL_WAITING.value("slow") < 4:
+                    await asyncio.sleep(0.01)
+                assert (await client.get("/fast/")).json() == "ok"
+                status_ = threadpool.threadpool_status()
+                assert status_["slow"] == {"size": 2, "busy": 2, "waiting": 4, "saturation": 1.0}
+                assert status_["default"]["size"] == 4
+                release.set()
+                responses = await asyncio.gather(*blocked_requests)
+        assert [response.json() for response in responses] == list(range(6))
+
+    asyncio.run(scenario())
+    assert set(bulkheads) == {"slow"}
+    assert THREADPOOL_BUSY.value("slow") == THREADPOOL_WAITING.value("slow") == 0
+
+
+def test_threadpool_metrics(rest_api):
+    """📈 The queue wait of a `def` route and the size of its bulkhead are reported."""
+    assert rest_api.get("/api/v1/jcontreras/ventas/").status_code == status.HTTP_200_OK
+    metrics = rest_api.get("/metrics").text
+    assert sample(metrics, "threadpool_queue_wait_seconds_count", project="jcontreras") >= 1
+    assert sample(metrics, "threadpool_size", pool="jcontreras") == settings.bulkhead_size
+
+    response = rest_api.get("/api/v1/_internal/threadpool")
+    assert response.status_code == status.HTTP_200_OK
+    pools = response.json()
+    assert pools["jcontreras"]["size"] == settings.bulkhead_size
+    assert "default" in pools